@@ -0,0 +1,112 @@
+"""
+Cache de lecture pour les commandes fréquentes du bot Telegram
+
+- membership actif indexé par telegram_user_id (/status)
+- tokens du bot indexés par leur valeur, avec l'utilisateur préchargé (/start)
+
+Les entrées sont stockées dans le cache Django (partagé entre process si Redis
+est configuré) et invalidées à chaque enregistrement ou suppression d'un
+membre ou d'un token (signaux, accounts/signals.py). Les écritures en masse,
+qui n'envoient pas de signaux, invalident explicitement les lignes touchées :
+réconciliation du canal (bulk_update) et expiration des tokens (sweep_update).
+"""
+from django.core.cache import cache
+from django.utils import timezone
+
+MEMBERSHIP_TTL = 5 * 60
+TOKEN_TTL = 5 * 60
+
+# Marqueur pour mémoriser l'absence de membership (cache négatif)
+NO_MEMBERSHIP = 'none'
+
+
+def _membership_key(telegram_user_id):
+    return f"telegram:membership:{telegram_user_id}"
+
+
+def _token_key(token):
+    return f"telegram:token:{token}"
+
+
+class TelegramLookupCache:
+    """Cache read-through avec compteurs de hits/misses (par process)"""
+
+    def __init__(self, cache_backend=None):
+        self.cache = cache_backend or cache
+        self.hits = 0
+        self.misses = 0
+
+    def _hit(self):
+        self.hits += 1
+
+    def _miss(self):
+        self.misses += 1
+
+    def get_active_membership(self, telegram_user_id):
+        """Membership actif de l'utilisateur Telegram, ou None"""
+        from .models_telegram import TelegramChannelMember
+
+        key = _membership_key(telegram_user_id)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._hit()
+            return None if cached == NO_MEMBERSHIP else cached
+
+        self._miss()
+        membership = TelegramChannelMember.objects.filter(
+            telegram_user_id=telegram_user_id,
+            status='active'
+        ).first()
+        self.cache.set(key, membership or NO_MEMBERSHIP, MEMBERSHIP_TTL)
+        return membership
+
+    def get_token(self, token):
+        """
+        Token du bot avec son utilisateur préchargé.
+        Lève TelegramBotToken.DoesNotExist si le token est inconnu (non mis en cache).
+        """
+        from .models_telegram import TelegramBotToken
+
+        key = _token_key(token)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._hit()
+            return cached
+
+        self._miss()
+        bot_token = TelegramBotToken.objects.select_related('user').get(token=token)
+
+        ttl = TOKEN_TTL
+        if bot_token.status == 'pending':
+            # Ne jamais servir un token pending au-delà de son expiration
+            ttl = min(ttl, int((bot_token.expires_at - timezone.now()).total_seconds()))
+        if ttl > 0:
+            self.cache.set(key, bot_token, ttl)
+        return bot_token
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups * 100, 2) if lookups else 0,
+        }
+
+
+def invalidate_membership(telegram_user_id):
+    cache.delete(_membership_key(telegram_user_id))
+
+
+def invalidate_memberships(telegram_user_ids):
+    cache.delete_many([_membership_key(telegram_user_id) for telegram_user_id in telegram_user_ids])
+
+
+def invalidate_token(token):
+    cache.delete(_token_key(token))
+
+
+def invalidate_tokens(tokens):
+    cache.delete_many([_token_key(token) for token in tokens])
+
+
+telegram_cache = TelegramLookupCache()
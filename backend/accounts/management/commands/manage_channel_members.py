@@ -1,9 +1,15 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from payments.models import Subscription
+from payments.subscriptions import (
+    ENDED_STATUSES, active_at, consume_transitions, expire_due_subscriptions, transition_cursor, transitions_since
+)
 import os
 
 
+# Curseur de ce consommateur dans le journal des transitions d'abonnement
+TRANSITIONS_CONSUMER = 'manage_channel_members'
+
+
 class Command(BaseCommand):
     help = 'Gérer automatiquement l\'ajout/retrait des membres dans les canaux Telegram/Discord'
 
@@ -27,9 +33,7 @@ class Command(BaseCommand):
         self.stdout.write('📥 AJOUT DE NOUVEAUX MEMBRES')
         self.stdout.write('='*60)
         
-        new_subscriptions = Subscription.objects.filter(
-            status='active',
-            end_date__gt=now,
+        new_subscriptions = active_at(now).filter(
             telegram_added=False
         ).select_related('user', 'offer')
         
@@ -75,54 +79,23 @@ class Command(BaseCommand):
                     )
                 )
         
-        # 2. Traiter les abonnements expirés (retirer des canaux)
+        # 2. Traiter les abonnements terminés (retirer des canaux)
         self.stdout.write('\n' + '='*60)
         self.stdout.write('📤 RETRAIT DES MEMBRES EXPIRÉS')
         self.stdout.write('='*60)
         
-        expired_subscriptions = Subscription.objects.filter(
-            status='active',
-            end_date__lte=now
-        ).select_related('user', 'offer')
-        
-        removed_count = 0
-        for subscription in expired_subscriptions:
-            user = subscription.user
-            offer = subscription.offer
-            
-            # Retirer de Telegram
-            if subscription.telegram_added and offer.telegram_channel_id:
-                if not dry_run:
-                    # TODO: Implémenter le retrait réel via l'API Telegram
-                    # bot.kick_chat_member(chat_id=offer.telegram_channel_id, user_id=user.telegram_id)
-                    
-                    subscription.telegram_added = False
-                    subscription.status = 'expired'
-                    subscription.save(update_fields=['telegram_added', 'status'])
-                
-                removed_count += 1
-                self.stdout.write(
-                    self.style.WARNING(
-                        f'⚠️  {user.email} ({user.telegram_username}) '
-                        f'← Retiré du canal Telegram: {offer.name}'
-                    )
-                )
-            
-            # Retirer de Discord
-            if subscription.discord_added and offer.discord_channel_id:
-                if not dry_run:
-                    # TODO: Implémenter le retrait réel via l'API Discord
-                    
-                    subscription.discord_added = False
-                    subscription.status = 'expired'
-                    subscription.save(update_fields=['discord_added', 'status'])
-                
-                self.stdout.write(
-                    self.style.WARNING(
-                        f'⚠️  {user.email} ({user.discord_username}) '
-                        f'← Retiré du canal Discord: {offer.name}'
-                    )
-                )
+        # Les abonnements arrivés à échéance sont d'abord passés en 'expired'
+        # (transitions journalisées), puis seules les transitions vers
+        # 'expired' / 'cancelled' postérieures au curseur sont traitées
+        self.removed_count = 0
+        if dry_run:
+            self.remove_members(
+                list(transitions_since(transition_cursor(TRANSITIONS_CONSUMER), ENDED_STATUSES)), dry_run=True
+            )
+        else:
+            expire_due_subscriptions(now)
+            consume_transitions(TRANSITIONS_CONSUMER, self.remove_members, to_statuses=ENDED_STATUSES)
+        removed_count = self.removed_count
         
         # Résumé
         self.stdout.write('\n' + '='*60)
@@ -164,3 +137,47 @@ class Command(BaseCommand):
             '   */15 * * * * python manage.py manage_channel_members\n'
         )
 
+
+    def remove_members(self, transitions, dry_run=False):
+        """Retirer des canaux les abonnements dont une transition met fin à l'accès"""
+        for transition in transitions:
+            subscription = transition.subscription
+            # Renouvelé ou réactivé depuis : l'accès est conservé
+            if subscription.status not in ENDED_STATUSES:
+                continue
+            user = transition.user
+            offer = subscription.offer
+            removed_fields = []
+            
+            # Retirer de Telegram
+            if subscription.telegram_added:
+                if offer.telegram_channel_id:
+                    # TODO: Implémenter le retrait réel via l'API Telegram
+                    # bot.kick_chat_member(chat_id=offer.telegram_channel_id, user_id=user.telegram_id)
+                    
+                    self.removed_count += 1
+                    self.stdout.write(
+                        self.style.WARNING(
+                            f'⚠️  {user.email} ({user.telegram_username}) '
+                            f'← Retiré du canal Telegram: {offer.name}'
+                        )
+                    )
+                subscription.telegram_added = False
+                removed_fields.append('telegram_added')
+            
+            # Retirer de Discord
+            if subscription.discord_added:
+                if offer.discord_channel_id:
+                    # TODO: Implémenter le retrait réel via l'API Discord
+                    
+                    self.stdout.write(
+                        self.style.WARNING(
+                            f'⚠️  {user.email} ({user.discord_username}) '
+                            f'← Retiré du canal Discord: {offer.name}'
+                        )
+                    )
+                subscription.discord_added = False
+                removed_fields.append('discord_added')
+            
+            if removed_fields and not dry_run:
+                subscription.save(update_fields=removed_fields)
@@ -1,7 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta
-from payments.models import Subscription
+from payments.subscriptions import expiring_within, expired_since, expire_due_subscriptions
 from accounts.models import UserNotification
 
 
@@ -47,12 +47,14 @@ class Command(BaseCommand):
         
         notifications_created = 0
         
-        # Récupérer tous les abonnements actifs
-        active_subscriptions = Subscription.objects.filter(
-            status='active'
+        # Seuls les abonnements dont l'échéance est dans la fenêtre des
+        # notifications (J-7 à J+3) sont concernés
+        subscriptions = (
+            expiring_within(timedelta(days=8), t=now) |
+            expired_since(now - timedelta(days=4), t=now)
         ).select_related('user', 'offer')
         
-        for subscription in active_subscriptions:
+        for subscription in subscriptions:
             for days_offset, notif_key, title_template, message_template in notification_timings:
                 # Calculer la date cible
                 if days_offset < 0:  # Avant expiration
@@ -93,11 +95,8 @@ class Command(BaseCommand):
                             )
                         )
         
-        # Marquer les abonnements expirés
-        expired_count = Subscription.objects.filter(
-            status='active',
-            end_date__lt=now
-        ).update(status='expired')
+        # Marquer les abonnements expirés (transitions journalisées)
+        expired_count = expire_due_subscriptions(now)
         
         self.stdout.write(
             self.style.SUCCESS(
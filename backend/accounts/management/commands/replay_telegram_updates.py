@@ -0,0 +1,83 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+import asyncio
+import json
+
+
+class Command(BaseCommand):
+    help = 'Rejouer des updates Telegram enregistrées contre le webhook (test local du mode webhook)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'file',
+            help='Fichier JSON (liste d\'updates) ou NDJSON (une update par ligne)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=1,
+            help='Nombre de fois où chaque lot est rejoué (vérifie la déduplication)',
+        )
+        parser.add_argument(
+            '--secret',
+            default=None,
+            help='Secret token du webhook (par défaut TELEGRAM_WEBHOOK_SECRET)',
+        )
+        parser.add_argument(
+            '--base-url',
+            default=None,
+            help='URL d\'une API Telegram locale (ex: http://127.0.0.1:8081/bot)',
+        )
+
+    def handle(self, *args, **options):
+        from telegram_bot.bot import CalmnessTradingBot
+        from telegram_bot.webhook import TelegramWebhookApp, replay_updates
+
+        payloads = self._load(options['file'])
+        self.stdout.write(f'📥 {len(payloads)} update(s) chargée(s) depuis {options["file"]}')
+
+        try:
+            app = TelegramWebhookApp(CalmnessTradingBot(base_url=options['base_url']), secret_token=options['secret'])
+        except ImproperlyConfigured as e:
+            raise CommandError(f'{e} (ou passer --secret)')
+
+        async def run():
+            results = []
+            for _ in range(options['repeat']):
+                results += await replay_updates(app, payloads)
+            await app.shutdown()
+            return results
+
+        results = asyncio.run(run())
+
+        processed = duplicates = errors = 0
+        for update_id, status, response in results:
+            if status == 200 and response.get('duplicate'):
+                duplicates += 1
+                self.stdout.write(f'↩️  update {update_id} : doublon ignoré')
+            elif status == 200:
+                processed += 1
+                self.stdout.write(self.style.SUCCESS(f'✅ update {update_id} : traitée'))
+            else:
+                errors += 1
+                self.stdout.write(self.style.ERROR(f'❌ update {update_id} : {status} {response.get("error", "")}'))
+
+        self.stdout.write('\n' + '='*60)
+        self.stdout.write(f'✅ Traitées : {processed}')
+        self.stdout.write(f'↩️  Doublons : {duplicates}')
+        self.stdout.write(f'❌ Erreurs : {errors}')
+        self.stdout.write('='*60)
+
+    def _load(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                raw = f.read().strip()
+        except OSError as e:
+            raise CommandError(f'Impossible de lire {path} : {e}')
+
+        try:
+            if raw.startswith('['):
+                return json.loads(raw)
+            return [json.loads(line) for line in raw.splitlines() if line.strip()]
+        except ValueError as e:
+            raise CommandError(f'JSON invalide : {e}')
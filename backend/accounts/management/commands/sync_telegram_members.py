@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand
+from django.conf import settings
+import asyncio
+import telegram
+
+from accounts.reconcile_telegram import CheckpointStore, reconcile_channel
+
+
+class Command(BaseCommand):
+    help = 'Réconcilier les membres du canal Telegram avec TelegramChannelMember (reprise sur checkpoint)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--channel-id',
+            type=int,
+            default=None,
+            help='ID du canal (par défaut TELEGRAM_CHANNEL_ID)',
+        )
+        parser.add_argument(
+            '--max-pages',
+            type=int,
+            default=None,
+            help='Nombre maximum de pages à traiter dans cette exécution (par défaut : tout le canal)',
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=200,
+            help='Nombre de membres par page',
+        )
+        parser.add_argument(
+            '--enforce',
+            action='store_true',
+            help='Bannir les membres présents dans le canal sans abonnement valide',
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Ignorer le checkpoint et repartir du début',
+        )
+        parser.add_argument(
+            '--base-url',
+            default=None,
+            help='URL d\'une API Telegram locale (ex: python -m telegram_bot.fake_api)',
+        )
+
+    def handle(self, *args, **options):
+        channel_id = options['channel_id'] or settings.TELEGRAM_CHANNEL_ID
+
+        if options['reset']:
+            CheckpointStore().clear(channel_id)
+            self.stdout.write(self.style.WARNING('🔁 Checkpoint supprimé, reprise depuis le début'))
+
+        bot_kwargs = {'token': settings.TELEGRAM_BOT_TOKEN}
+        if options['base_url']:
+            bot_kwargs['base_url'] = options['base_url']
+        bot = telegram.Bot(**bot_kwargs)
+
+        report = asyncio.run(reconcile_channel(
+            bot,
+            channel_id,
+            max_pages=options['max_pages'],
+            page_size=options['page_size'],
+            enforce=options['enforce'],
+        ))
+
+        self.stdout.write('\n' + '='*60)
+        self.stdout.write(f'🔄 RÉCONCILIATION DU CANAL {channel_id}')
+        self.stdout.write('='*60)
+        for field, value in report.as_dict().items():
+            self.stdout.write(f'{field} : {value}')
+
+        if report.completed:
+            self.stdout.write(self.style.SUCCESS('\n✅ Canal entièrement réconcilié'))
+        else:
+            self.stdout.write(self.style.WARNING('\n⏸️  Checkpoint enregistré, relancer la commande pour continuer'))
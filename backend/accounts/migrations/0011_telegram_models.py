@@ -0,0 +1,165 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_supportinvoice_supportinvoiceitem_supportmessage_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TelegramBotToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64, unique=True, verbose_name='Token unique')),
+                ('payment_id', models.IntegerField(blank=True, null=True, verbose_name='ID Paiement')),
+                ('transaction_id', models.CharField(blank=True, max_length=255, verbose_name='ID Transaction')),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('used', 'Utilisé'), ('expired', 'Expiré'), ('revoked', 'Révoqué')], default='pending', max_length=20, verbose_name='Statut')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Créé le')),
+                ('used_at', models.DateTimeField(blank=True, null=True, verbose_name='Utilisé le')),
+                ('expires_at', models.DateTimeField(verbose_name='Expire le')),
+                ('telegram_user_id', models.BigIntegerField(blank=True, null=True, verbose_name='Telegram User ID')),
+                ('telegram_username', models.CharField(blank=True, max_length=255, verbose_name='Telegram Username')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='telegram_tokens', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Token Bot Telegram',
+                'verbose_name_plural': 'Tokens Bot Telegram',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TelegramChannelInvite',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel_id', models.BigIntegerField(verbose_name='ID du canal')),
+                ('channel_name', models.CharField(max_length=255, verbose_name='Nom du canal')),
+                ('invite_link', models.URLField(max_length=500, verbose_name="Lien d'invitation")),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('sent', 'Envoyé'), ('accepted', 'Accepté'), ('expired', 'Expiré'), ('revoked', 'Révoqué')], default='pending', max_length=20, verbose_name='Statut')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Créé le')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Envoyé le')),
+                ('accepted_at', models.DateTimeField(blank=True, null=True, verbose_name='Accepté le')),
+                ('expires_at', models.DateTimeField(verbose_name='Expire le')),
+                ('telegram_user_id', models.BigIntegerField(verbose_name='Telegram User ID')),
+                ('bot_token', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='invites', to='accounts.telegrambottoken', verbose_name='Token Bot')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='telegram_invites', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Invitation Canal Telegram',
+                'verbose_name_plural': 'Invitations Canal Telegram',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TelegramChannelMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel_id', models.BigIntegerField(verbose_name='ID du canal')),
+                ('channel_name', models.CharField(max_length=255, verbose_name='Nom du canal')),
+                ('telegram_user_id', models.BigIntegerField(verbose_name='Telegram User ID')),
+                ('telegram_username', models.CharField(blank=True, max_length=255, verbose_name='Telegram Username')),
+                ('status', models.CharField(choices=[('active', 'Actif'), ('expired', 'Expiré'), ('banned', 'Banni'), ('left', 'Parti')], default='active', max_length=20, verbose_name='Statut')),
+                ('joined_at', models.DateTimeField(auto_now_add=True, verbose_name='Rejoint le')),
+                ('expires_at', models.DateTimeField(verbose_name='Expire le')),
+                ('left_at', models.DateTimeField(blank=True, null=True, verbose_name='Parti le')),
+                ('banned_at', models.DateTimeField(blank=True, null=True, verbose_name='Banni le')),
+                ('subscription_type', models.CharField(max_length=100, verbose_name="Type d'abonnement")),
+                ('subscription_end_date', models.DateTimeField(verbose_name="Fin d'abonnement")),
+                ('invite', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='memberships', to='accounts.telegramchannelinvite', verbose_name='Invitation')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='telegram_memberships', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Membre Canal Telegram',
+                'verbose_name_plural': 'Membres Canal Telegram',
+                'ordering': ['-joined_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TelegramNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification_type', models.CharField(choices=[('payment_pending', 'Paiement en attente'), ('payment_verified', 'Paiement vérifié'), ('invite_sent', 'Invitation envoyée'), ('access_granted', 'Accès accordé'), ('access_expiring', 'Accès bientôt expiré'), ('access_expired', 'Accès expiré'), ('access_revoked', 'Accès révoqué')], max_length=50, verbose_name='Type')),
+                ('title', models.CharField(max_length=255, verbose_name='Titre')),
+                ('message', models.TextField(verbose_name='Message')),
+                ('action_url', models.URLField(blank=True, max_length=500, verbose_name="Lien d'action")),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('sent', 'Envoyé'), ('failed', 'Échec')], default='pending', max_length=20, verbose_name='Statut')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Créé le')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Envoyé le')),
+                ('sent_via_site', models.BooleanField(default=True, verbose_name='Envoyé via site')),
+                ('sent_via_email', models.BooleanField(default=False, verbose_name='Envoyé via email')),
+                ('sent_via_telegram', models.BooleanField(default=False, verbose_name='Envoyé via Telegram')),
+                ('metadata', models.JSONField(blank=True, default=dict, verbose_name='Métadonnées')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='telegram_notifications', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Notification Telegram',
+                'verbose_name_plural': 'Notifications Telegram',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='telegrambottoken',
+            index=models.Index(fields=['token'], name='accounts_te_token_ee4d22_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='telegrambottoken',
+            index=models.Index(fields=['user', 'status'], name='accounts_te_user_id_73ec3f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='telegrambottoken',
+            index=models.Index(fields=['expires_at'], name='accounts_te_expires_6b6222_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='telegrambottoken',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['status', 'expires_at'], name='tg_token_pending_exp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='telegramchannelinvite',
+            index=models.Index(fields=['user', 'status'], name='accounts_te_user_id_84f338_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='telegramchannelinvite',
+            index=models.Index(fields=['telegram_user_id'], name='accounts_te_telegra_1b6a53_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='telegramchannelinvite',
+            index=models.Index(fields=['expires_at'], name='accounts_te_expires_73abab_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='telegramchannelinvite',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'sent'])), fields=['status', 'expires_at'], name='tg_invite_open_exp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='telegramchannelmember',
+            index=models.Index(fields=['telegram_user_id', 'channel_id'], name='accounts_te_telegra_ffb0f5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='telegramchannelmember',
+            index=models.Index(fields=['status', 'expires_at'], name='accounts_te_status_9dae00_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='telegramchannelmember',
+            index=models.Index(fields=['subscription_end_date'], name='accounts_te_subscri_7c4596_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='telegramchannelmember',
+            unique_together={('user', 'channel_id')},
+        ),
+        migrations.AddIndex(
+            model_name='telegramnotification',
+            index=models.Index(fields=['user', 'status'], name='accounts_te_user_id_4ef750_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='telegramnotification',
+            index=models.Index(fields=['notification_type', 'created_at'], name='accounts_te_notific_40ee71_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='telegramnotification',
+            index=models.Index(fields=['created_at'], name='accounts_te_created_35beaa_idx'),
+        ),
+    ]
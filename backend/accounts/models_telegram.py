@@ -41,6 +41,12 @@ class TelegramBotToken(models.Model):
             models.Index(fields=['token']),
             models.Index(fields=['user', 'status']),
             models.Index(fields=['expires_at']),
+            # Index partiel pour le balayage des tokens en attente expirés
+            models.Index(
+                fields=['status', 'expires_at'],
+                condition=models.Q(status='pending'),
+                name='tg_token_pending_exp_idx',
+            ),
         ]
     
     def __str__(self):
@@ -114,6 +120,12 @@ class TelegramChannelInvite(models.Model):
             models.Index(fields=['user', 'status']),
             models.Index(fields=['telegram_user_id']),
             models.Index(fields=['expires_at']),
+            # Index partiel pour le balayage des invitations pending/sent expirées
+            models.Index(
+                fields=['status', 'expires_at'],
+                condition=models.Q(status__in=['pending', 'sent']),
+                name='tg_invite_open_exp_idx',
+            ),
         ]
     
     def __str__(self):
@@ -253,6 +265,7 @@ class TelegramNotification(models.Model):
         indexes = [
             models.Index(fields=['user', 'status']),
             models.Index(fields=['notification_type', 'created_at']),
+            models.Index(fields=['created_at']),
         ]
     
     def __str__(self):
@@ -0,0 +1,253 @@
+"""
+Réconciliation incrémentale entre le canal Telegram et TelegramChannelMember
+
+La Bot API ne permet pas de lister tous les membres d'un canal : on parcourt
+donc les membres connus en base par pages (keyset sur la clé primaire), on
+interroge Telegram pour chacun (getChatMember) et on compare les deux états
+sous forme d'ensembles de tuples (telegram_user_id, présent). Seul le delta
+est écrit, en un bulk_update par page.
+
+Un même compte Telegram peut avoir plusieurs lignes (ancien abonnement
+`left` et abonnement `active`...) : elles sont regroupées par
+telegram_user_id et l'état attendu est celui de l'utilisateur (présent s'il
+a une ligne `active`). Chaque utilisateur est traité une seule fois, sur la
+page qui contient sa première ligne.
+
+Un checkpoint (dernière clé primaire traitée) est conservé dans le cache
+Django : un grand canal est réconcilié en plusieurs exécutions courtes.
+"""
+import asyncio
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.utils import timezone
+from telegram.error import BadRequest
+
+from .cache_telegram import invalidate_memberships
+from .models_telegram import TelegramChannelMember
+from .stats_telegram import invalidate_telegram_stats
+
+logger = logging.getLogger(__name__)
+
+PRESENT_STATUSES = ('creator', 'administrator', 'member', 'restricted')
+CHECKPOINT_TTL = 7 * 24 * 60 * 60
+
+
+class ReconcileReport:
+    """Compteurs cumulés d'une réconciliation (éventuellement sur plusieurs exécutions)"""
+
+    FIELDS = ('checked', 'unchanged', 'marked_left', 'marked_banned', 'reactivated', 'intruders', 'banned_intruders', 'errors', 'pages')
+
+    def __init__(self, data=None):
+        data = data or {}
+        for field in self.FIELDS:
+            setattr(self, field, data.get(field, 0))
+        self.completed = data.get('completed', False)
+        self.remote_member_count = data.get('remote_member_count')
+        self.admin_count = data.get('admin_count')
+        self.duration_ms = data.get('duration_ms', 0)
+
+    def as_dict(self):
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        data.update({
+            'completed': self.completed,
+            'remote_member_count': self.remote_member_count,
+            'admin_count': self.admin_count,
+            'duration_ms': self.duration_ms,
+        })
+        return data
+
+
+class CheckpointStore:
+    """Checkpoint de reprise par canal, stocké dans le cache Django"""
+
+    def __init__(self, cache_backend=None, ttl=CHECKPOINT_TTL):
+        self.cache = cache_backend or cache
+        self.ttl = ttl
+
+    def _key(self, channel_id):
+        return f"telegram:reconcile:{channel_id}"
+
+    def load(self, channel_id):
+        return self.cache.get(self._key(channel_id)) or {'last_pk': 0, 'report': {}}
+
+    def save(self, channel_id, checkpoint):
+        self.cache.set(self._key(channel_id), checkpoint, self.ttl)
+
+    def clear(self, channel_id):
+        self.cache.delete(self._key(channel_id))
+
+
+class ChannelReconciler:
+    """Moteur de réconciliation d'un canal"""
+
+    def __init__(self, bot, channel_id, page_size=200, concurrency=10, enforce=False, checkpoint_store=None):
+        self.bot = bot
+        self.channel_id = channel_id
+        self.page_size = page_size
+        # Nombre d'appels getChatMember simultanés (limites de débit de la Bot API)
+        self.semaphore = asyncio.Semaphore(concurrency)
+        # Bannir les membres présents dans le canal sans abonnement valide
+        self.enforce = enforce
+        self.checkpoints = checkpoint_store or CheckpointStore()
+
+    async def run(self, max_pages=None):
+        """
+        Réconcilier au plus `max_pages` pages depuis le dernier checkpoint.
+        Le rapport retourné indique si le parcours du canal est terminé.
+        """
+        started = time.monotonic()
+        checkpoint = self.checkpoints.load(self.channel_id)
+        report = ReconcileReport(checkpoint['report'])
+        last_pk = checkpoint['last_pk']
+
+        if last_pk == 0:
+            report.remote_member_count = await self.bot.get_chat_member_count(chat_id=self.channel_id)
+        admins = await self.bot.get_chat_administrators(chat_id=self.channel_id)
+        admin_ids = {admin.user.id for admin in admins}
+        report.admin_count = len(admin_ids)
+
+        pages = 0
+        while max_pages is None or pages < max_pages:
+            page_last_pk, groups = await sync_to_async(self._load_page)(last_pk)
+            if page_last_pk is None:
+                report.completed = True
+                break
+
+            remote = await self._fetch_remote_presence(groups, admin_ids, report)
+            await self._apply_delta(groups, remote, report)
+
+            last_pk = page_last_pk
+            pages += 1
+            report.pages += 1
+            self.checkpoints.save(self.channel_id, {'last_pk': last_pk, 'report': report.as_dict()})
+
+        report.duration_ms += round((time.monotonic() - started) * 1000, 1)
+        if report.completed:
+            self.checkpoints.clear(self.channel_id)
+        else:
+            self.checkpoints.save(self.channel_id, {'last_pk': last_pk, 'report': report.as_dict()})
+
+        logger.info(f"🔄 Réconciliation canal {self.channel_id} : {report.as_dict()}")
+        return report
+
+    def _load_page(self, last_pk):
+        """
+        Page suivante, regroupée par utilisateur : {telegram_user_id: lignes}.
+        Les lignes d'un utilisateur situées sur d'autres pages sont incluses ;
+        les utilisateurs dont la première ligne est sur une page précédente
+        (déjà traités) sont ignorés. Retourne (dernière clé de la page, groupes).
+        """
+        page = list(
+            TelegramChannelMember.objects
+            .filter(channel_id=self.channel_id, pk__gt=last_pk)
+            .order_by('pk')[:self.page_size]
+        )
+        if not page:
+            return None, {}
+
+        groups = {}
+        for member in TelegramChannelMember.objects.filter(
+            channel_id=self.channel_id,
+            telegram_user_id__in={member.telegram_user_id for member in page},
+        ).order_by('pk'):
+            groups.setdefault(member.telegram_user_id, []).append(member)
+        groups = {user_id: rows for user_id, rows in groups.items() if rows[0].pk > last_pk}
+        return page[-1].pk, groups
+
+    async def _fetch_remote_presence(self, groups, admin_ids, report):
+        """Statut réel de chaque utilisateur de la page : {telegram_user_id: statut Telegram}"""
+        async def fetch(telegram_user_id):
+            if telegram_user_id in admin_ids:
+                return telegram_user_id, 'administrator'
+            async with self.semaphore:
+                try:
+                    member = await self.bot.get_chat_member(chat_id=self.channel_id, user_id=telegram_user_id)
+                    return telegram_user_id, member.status
+                except BadRequest:
+                    # Utilisateur inconnu du canal
+                    return telegram_user_id, 'left'
+                except Exception as e:
+                    logger.error(f"❌ Erreur getChatMember {telegram_user_id} : {e}")
+                    report.errors += 1
+                    return telegram_user_id, None
+
+        results = await asyncio.gather(*(fetch(user_id) for user_id in groups))
+        return {user_id: status for user_id, status in results if status is not None}
+
+    async def _apply_delta(self, groups, remote, report):
+        now = timezone.now()
+
+        # Ensembles (id, présent) côté base et côté Telegram : seul le delta est traité
+        expected = {
+            (user_id, any(member.status == 'active' for member in rows))
+            for user_id, rows in groups.items() if user_id in remote
+        }
+        actual = {(user_id, status in PRESENT_STATUSES) for user_id, status in remote.items()}
+        drifted = {user_id for user_id, _ in expected - actual}
+
+        report.checked += len(expected)
+        report.unchanged += len(expected) - len(drifted)
+
+        changed, intruders = [], []
+        for user_id in drifted:
+            rows = groups[user_id]
+            status = remote[user_id]
+
+            if status not in PRESENT_STATUSES:
+                # Absent du canal : toutes ses lignes actives sont closes
+                for member in rows:
+                    if member.status != 'active':
+                        continue
+                    if status == 'kicked':
+                        member.status = 'banned'
+                        member.banned_at = now
+                        report.marked_banned += 1
+                    else:
+                        member.status = 'left'
+                        member.left_at = now
+                        report.marked_left += 1
+                    changed.append(member)
+                continue
+
+            # Présent dans le canal sans ligne active
+            renewable = [
+                member for member in rows
+                if member.status == 'left' and member.subscription_end_date > now
+            ]
+            if renewable:
+                # Revenu dans le canal avec un abonnement encore valide
+                member = max(renewable, key=lambda m: m.subscription_end_date)
+                member.status = 'active'
+                member.left_at = None
+                report.reactivated += 1
+                changed.append(member)
+            else:
+                # Présent dans le canal sans abonnement valide
+                report.intruders += 1
+                intruders.append(user_id)
+
+        if changed:
+            await sync_to_async(TelegramChannelMember.objects.bulk_update)(
+                changed, ['status', 'left_at', 'banned_at'], batch_size=self.page_size
+            )
+            # bulk_update n'envoie pas post_save
+            invalidate_memberships(member.telegram_user_id for member in changed)
+            invalidate_telegram_stats()
+
+        if intruders and self.enforce:
+            for user_id in intruders:
+                try:
+                    await self.bot.ban_chat_member(chat_id=self.channel_id, user_id=user_id)
+                    report.banned_intruders += 1
+                except Exception as e:
+                    logger.error(f"❌ Erreur bannissement {user_id} : {e}")
+                    report.errors += 1
+
+
+async def reconcile_channel(bot, channel_id, max_pages=None, **kwargs):
+    """Ouvrir la session du bot et lancer une exécution de réconciliation"""
+    async with bot:
+        return await ChannelReconciler(bot, channel_id, **kwargs).run(max_pages=max_pages)
@@ -0,0 +1,38 @@
+"""Signaux de l'application accounts"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .cache_telegram import invalidate_memberships, invalidate_token
+from .models_telegram import TelegramBotToken, TelegramChannelInvite, TelegramChannelMember
+from .stats_telegram import invalidate_telegram_stats
+
+
+# Invalidation du cache du bot et des statistiques admin après le commit : une
+# lecture concurrente ne peut pas remettre en cache l'état antérieur à la
+# modification. Les écritures en masse (QuerySet.update, bulk_update)
+# n'envoient pas ces signaux et invalident elles-mêmes les entrées concernées.
+
+@receiver(post_init, sender=TelegramChannelMember)
+def remember_member_telegram_id(sender, instance, **kwargs):
+    instance._cached_telegram_user_id = instance.telegram_user_id
+
+
+@receiver([post_save, post_delete], sender=TelegramChannelMember)
+def invalidate_member_cache(sender, instance, **kwargs):
+    telegram_user_ids = {instance.telegram_user_id, instance._cached_telegram_user_id}
+    transaction.on_commit(lambda: invalidate_memberships(telegram_user_ids))
+    transaction.on_commit(invalidate_telegram_stats)
+    instance._cached_telegram_user_id = instance.telegram_user_id
+
+
+@receiver([post_save, post_delete], sender=TelegramBotToken)
+def invalidate_token_cache(sender, instance, **kwargs):
+    token = instance.token
+    transaction.on_commit(lambda: invalidate_token(token))
+    transaction.on_commit(invalidate_telegram_stats)
+
+
+@receiver([post_save, post_delete], sender=TelegramChannelInvite)
+def invalidate_invite_stats(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_telegram_stats)
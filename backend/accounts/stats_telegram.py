@@ -0,0 +1,101 @@
+"""
+Statistiques Telegram pour le tableau de bord admin
+
+Tous les compteurs d'une table sont calculés en une seule requête
+d'agrégation conditionnelle (COUNT ... FILTER). Le résultat est mis en cache
+quelques secondes et invalidé après le commit de chaque enregistrement ou
+suppression d'un token, d'une invitation ou d'un membre (signaux,
+accounts/signals.py) ; les écritures en masse (sweep_update, bulk_update de
+la réconciliation) l'invalident elles-mêmes.
+"""
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models_telegram import TelegramBotToken, TelegramChannelInvite, TelegramChannelMember
+
+STATS_CACHE_KEY = 'telegram:stats'
+STATS_TTL = 60
+
+
+def invalidate_telegram_stats():
+    cache.delete(STATS_CACHE_KEY)
+
+
+def compute_telegram_stats():
+    """Compteurs tokens / invitations / membres : une requête par table"""
+    seven_days_ago = timezone.now() - timedelta(days=7)
+
+    tokens = TelegramBotToken.objects.aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(status='pending')),
+        used=Count('id', filter=Q(status='used')),
+        recent=Count('id', filter=Q(created_at__gte=seven_days_ago)),
+    )
+    invites = TelegramChannelInvite.objects.aggregate(
+        total=Count('id'),
+        accepted=Count('id', filter=Q(status='accepted')),
+    )
+    members = TelegramChannelMember.objects.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(status='active')),
+        recent_joins=Count('id', filter=Q(joined_at__gte=seven_days_ago)),
+    )
+
+    invites['acceptance_rate'] = round(
+        (invites['accepted'] / invites['total'] * 100) if invites['total'] > 0 else 0, 2
+    )
+
+    return {
+        'tokens': tokens,
+        'invites': invites,
+        'members': members,
+    }
+
+
+def get_telegram_stats():
+    """Statistiques depuis le cache, recalculées au plus toutes les STATS_TTL secondes"""
+    stats = cache.get(STATS_CACHE_KEY)
+    if stats is None:
+        stats = compute_telegram_stats()
+        cache.set(STATS_CACHE_KEY, stats, STATS_TTL)
+    return stats
+
+
+def _daily_counts(queryset, date_field, since):
+    rows = (
+        queryset.filter(**{f'{date_field}__gte': since})
+        .annotate(day=TruncDate(date_field))
+        .values('day')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    return {row['day']: row['count'] for row in rows}
+
+
+def get_telegram_timeseries(days=30):
+    """
+    Nombre de tokens, invitations et arrivées par jour sur `days` jours.
+    Une requête groupée par table ; les jours sans activité valent 0.
+    """
+    today = timezone.localdate()
+    first_day = today - timedelta(days=days - 1)
+    since = timezone.make_aware(datetime.combine(first_day, time.min))
+
+    tokens = _daily_counts(TelegramBotToken.objects.all(), 'created_at', since)
+    invites = _daily_counts(TelegramChannelInvite.objects.all(), 'created_at', since)
+    joins = _daily_counts(TelegramChannelMember.objects.all(), 'joined_at', since)
+
+    series = []
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        series.append({
+            'date': day.isoformat(),
+            'tokens': tokens.get(day, 0),
+            'invites': invites.get(day, 0),
+            'joins': joins.get(day, 0),
+        })
+    return series
@@ -0,0 +1,92 @@
+"""
+Balayages par lots des objets Telegram (tokens, invitations, notifications)
+
+Chaque balayage parcourt les lignes ciblées par clé primaire croissante
+(keyset) en lots bornés : chaque lot est une requête courte, ce qui évite
+de verrouiller toute la table pendant un UPDATE/DELETE massif.
+"""
+import logging
+import time
+
+from django.db.models.deletion import Collector
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class SweepResult:
+    """Nombre de lignes traitées et durée d'un balayage"""
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = 0
+        self.batches = 0
+        self._started = time.monotonic()
+        self.duration_ms = 0
+
+    def finish(self):
+        self.duration_ms = round((time.monotonic() - self._started) * 1000, 1)
+        logger.info(
+            f"🧹 Sweep {self.name} : {self.rows} ligne(s) en {self.batches} lot(s), {self.duration_ms} ms"
+        )
+        return self
+
+    def as_dict(self):
+        return {
+            'sweep': self.name,
+            'rows': self.rows,
+            'batches': self.batches,
+            'duration_ms': self.duration_ms,
+        }
+
+
+def _iter_pk_batches(queryset, batch_size):
+    """Itérer sur les clés primaires du queryset par lots (keyset pagination)"""
+    last_pk = None
+    while True:
+        batch = queryset.order_by('pk')
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+        pks = list(batch.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return
+        yield pks
+        last_pk = pks[-1]
+
+
+def sweep_update(name, queryset, values, batch_size=DEFAULT_BATCH_SIZE, on_batch=None):
+    """
+    Appliquer `values` aux lignes du queryset, lot par lot.
+    Le filtre est réappliqué à chaque lot pour ne pas écraser une ligne
+    qui aurait changé d'état entre la sélection et la mise à jour.
+    L'UPDATE n'envoie pas post_save : `on_batch(pks)` est appelé après chaque
+    lot (invalidation de cache par exemple).
+    """
+    result = SweepResult(name)
+    for pks in _iter_pk_batches(queryset, batch_size):
+        result.rows += queryset.filter(pk__in=pks).update(**values)
+        result.batches += 1
+        if on_batch:
+            on_batch(pks)
+    return result.finish()
+
+
+def sweep_delete(name, queryset, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Supprimer les lignes du queryset, lot par lot.
+    Utilise un DELETE direct (sans charger les objets) quand aucune cascade
+    ni signal ne s'applique, sinon retombe sur la suppression ORM.
+    """
+    result = SweepResult(name)
+    model = queryset.model
+    fast = Collector(using=queryset.db, origin=queryset).can_fast_delete(queryset)
+
+    for pks in _iter_pk_batches(queryset, batch_size):
+        batch = model._base_manager.using(queryset.db).filter(pk__in=pks)
+        if fast:
+            result.rows += batch._raw_delete(batch.db)
+        else:
+            result.rows += batch.delete()[0]
+        result.batches += 1
+    return result.finish()
@@ -4,13 +4,25 @@ Tasks Celery pour la gestion automatique des accès Telegram
 from celery import shared_task
 from django.utils import timezone
 from django.conf import settings
+import asyncio
 import logging
 import telegram
 
 from .models_telegram import TelegramBotToken, TelegramChannelInvite, TelegramChannelMember, TelegramNotification
+from .sweeper_telegram import sweep_update, sweep_delete
+from .reconcile_telegram import reconcile_channel
+from .stats_telegram import invalidate_telegram_stats
+from .cache_telegram import invalidate_tokens
 
 logger = logging.getLogger(__name__)
 
+# Pages de membres (200 par page) réconciliées par exécution de sync_telegram_members
+SYNC_MAX_PAGES_PER_RUN = 10
+
+def _invalidate_token_batch(pks):
+    invalidate_tokens(TelegramBotToken.objects.filter(pk__in=pks).values_list('token', flat=True))
+
+
 @shared_task
 def expire_old_tokens():
     """
@@ -25,11 +37,13 @@ def expire_old_tokens():
         expires_at__lt=now
     )
     
-    count = expired_tokens.count()
-    expired_tokens.update(status='expired')
+    result = sweep_update(
+        'expire_old_tokens', expired_tokens, {'status': 'expired'}, on_batch=_invalidate_token_batch
+    )
+    invalidate_telegram_stats()
     
-    logger.info(f"✅ {count} tokens expirés marqués comme 'expired'")
-    return f"Expired {count} tokens"
+    logger.info(f"✅ {result.rows} tokens expirés marqués comme 'expired'")
+    return f"Expired {result.rows} tokens in {result.duration_ms} ms"
 
 @shared_task
 def expire_old_invites():
@@ -45,11 +59,11 @@ def expire_old_invites():
         expires_at__lt=now
     )
     
-    count = expired_invites.count()
-    expired_invites.update(status='expired')
+    result = sweep_update('expire_old_invites', expired_invites, {'status': 'expired'})
+    invalidate_telegram_stats()
     
-    logger.info(f"✅ {count} invitations expirées marquées comme 'expired'")
-    return f"Expired {count} invites"
+    logger.info(f"✅ {result.rows} invitations expirées marquées comme 'expired'")
+    return f"Expired {result.rows} invites in {result.duration_ms} ms"
 
 @shared_task
 def check_expired_subscriptions():
@@ -169,34 +183,36 @@ def cleanup_old_notifications():
         created_at__lt=ninety_days_ago
     )
     
-    count = old_notifications.count()
-    old_notifications.delete()
+    result = sweep_delete('cleanup_old_notifications', old_notifications)
     
-    logger.info(f"✅ {count} anciennes notifications supprimées")
-    return f"Deleted {count} old notifications"
+    logger.info(f"✅ {result.rows} anciennes notifications supprimées")
+    return f"Deleted {result.rows} old notifications in {result.duration_ms} ms"
 
 @shared_task
-def sync_telegram_members():
+def sync_telegram_members(max_pages=SYNC_MAX_PAGES_PER_RUN):
     """
-    Synchroniser les membres du canal Telegram avec la base de données
+    Réconcilier les membres du canal Telegram avec la base de données
     À exécuter tous les jours à 03:00
+    Chaque exécution traite au plus `max_pages` pages puis se replanifie
+    depuis son checkpoint tant que le parcours du canal n'est pas terminé.
     """
     try:
         bot = telegram.Bot(token=settings.TELEGRAM_BOT_TOKEN)
         channel_id = settings.TELEGRAM_CHANNEL_ID
         
-        # Récupérer le nombre de membres du canal
-        chat = bot.get_chat(chat_id=channel_id)
-        member_count = chat.member_count if hasattr(chat, 'member_count') else 0
-        
-        logger.info(f"✅ Synchronisation : {member_count} membres dans le canal Telegram")
+        report = asyncio.run(reconcile_channel(bot, channel_id, max_pages=max_pages))
         
-        # TODO: Implémenter la logique de synchronisation complète si nécessaire
-        # (nécessite des permissions admin sur le canal)
+        if not report.completed:
+            sync_telegram_members.delay(max_pages=max_pages)
+            return f"Sync in progress: {report.checked} members checked"
         
-        return f"Synced: {member_count} members in channel"
+        logger.info(
+            f"✅ Synchronisation : {report.checked} membres vérifiés, "
+            f"{report.marked_left + report.marked_banned} sortis, {report.reactivated} réactivés, "
+            f"{report.intruders} sans abonnement"
+        )
+        return f"Synced: {report.checked} members checked, {report.remote_member_count} members in channel"
         
     except Exception as e:
         logger.error(f"❌ Erreur synchronisation : {e}")
         return f"Sync failed: {str(e)}"
-
@@ -1,3 +1,139 @@
-from django.test import TestCase
+import asyncio
+from datetime import timedelta
 
-# Create your tests here.
+import telegram
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from accounts.models_telegram import TelegramBotToken, TelegramChannelMember
+from accounts.reconcile_telegram import CheckpointStore, reconcile_channel
+from accounts.stats_telegram import STATS_CACHE_KEY, get_telegram_stats
+from telegram_bot.fake_api import FakeTelegramAPI, serve
+
+User = get_user_model()
+
+CHANNEL_ID = -1001
+
+
+class ReconcileChannelTests(TransactionTestCase):
+    """Réconciliation du canal contre la fausse API Telegram (telegram_bot/fake_api.py)"""
+
+    def setUp(self):
+        self.api = FakeTelegramAPI({CHANNEL_ID: {'title': 'Canal', 'members': {}, 'admins': [1]}})
+        self.server, self.base_url = serve(self.api)
+        self.addCleanup(self.server.shutdown)
+        CheckpointStore().clear(CHANNEL_ID)
+        self.users = 0
+
+    def member(self, telegram_user_id, status, ends_in=timedelta(days=30)):
+        self.users += 1
+        user = User.objects.create_user(
+            email=f'u{self.users}@example.com', username=f'u{self.users}', password='x'
+        )
+        end = timezone.now() + ends_in
+        return TelegramChannelMember.objects.create(
+            user=user, channel_id=CHANNEL_ID, channel_name='Canal', telegram_user_id=telegram_user_id,
+            status=status, subscription_type='test', subscription_end_date=end, expires_at=end,
+        )
+
+    def reconcile(self, **kwargs):
+        bot = telegram.Bot(token='123:test', base_url=self.base_url)
+        return asyncio.run(reconcile_channel(bot, CHANNEL_ID, **kwargs))
+
+    def status_of(self, member):
+        member.refresh_from_db()
+        return member.status
+
+    def test_present_user_with_active_and_expired_rows_is_unchanged(self):
+        active = self.member(42, 'active')
+        old = self.member(42, 'left', ends_in=timedelta(days=-10))
+        self.api.set_member_status(CHANNEL_ID, 42, 'member')
+
+        report = self.reconcile(enforce=True)
+
+        self.assertEqual(self.status_of(active), 'active')
+        self.assertEqual(self.status_of(old), 'left')
+        self.assertEqual((report.checked, report.unchanged, report.intruders), (1, 1, 0))
+        self.assertNotIn('banChatMember', [method for method, _ in self.api.calls])
+
+    def test_absent_active_members_are_closed(self):
+        gone = self.member(10, 'active')
+        kicked = self.member(11, 'active')
+        self.api.set_member_status(CHANNEL_ID, 11, 'kicked')
+
+        report = self.reconcile()
+
+        self.assertEqual(self.status_of(gone), 'left')
+        self.assertEqual(self.status_of(kicked), 'banned')
+        self.assertEqual((report.marked_left, report.marked_banned), (1, 1))
+
+    def test_present_user_with_valid_left_row_is_reactivated(self):
+        expired = self.member(20, 'left', ends_in=timedelta(days=-1))
+        renewed = self.member(20, 'left')
+        self.api.set_member_status(CHANNEL_ID, 20, 'member')
+
+        report = self.reconcile(enforce=True)
+
+        self.assertEqual(self.status_of(renewed), 'active')
+        self.assertEqual(self.status_of(expired), 'left')
+        self.assertEqual((report.reactivated, report.intruders), (1, 0))
+
+    def test_present_user_without_valid_subscription_is_banned_once(self):
+        self.member(30, 'expired', ends_in=timedelta(days=-1))
+        self.member(30, 'left', ends_in=timedelta(days=-5))
+        self.api.set_member_status(CHANNEL_ID, 30, 'member')
+
+        report = self.reconcile(enforce=True)
+
+        self.assertEqual((report.intruders, report.banned_intruders), (1, 1))
+        self.assertEqual(self.api.chats[CHANNEL_ID]['members'][30], 'kicked')
+
+    def test_user_rows_split_across_pages_are_reconciled_once(self):
+        active = self.member(42, 'active')
+        self.member(50, 'active')
+        old = self.member(42, 'left', ends_in=timedelta(days=-10))
+        self.api.set_member_status(CHANNEL_ID, 42, 'member')
+        self.api.set_member_status(CHANNEL_ID, 50, 'member')
+
+        first = self.reconcile(page_size=1, max_pages=1, enforce=True)
+        self.assertFalse(first.completed)
+        report = self.reconcile(page_size=1, enforce=True)
+
+        self.assertTrue(report.completed)
+        self.assertEqual(self.status_of(active), 'active')
+        self.assertEqual(self.status_of(old), 'left')
+        self.assertEqual((report.checked, report.unchanged, report.intruders), (2, 2, 0))
+
+
+class TelegramStatsCacheTests(TestCase):
+    """Invalidation des statistiques admin après commit (signaux)"""
+
+    def setUp(self):
+        cache.delete(STATS_CACHE_KEY)
+        self.user = User.objects.create_user(email='s@example.com', username='s', password='x')
+
+    def test_token_writes_invalidate_stats_after_commit(self):
+        get_telegram_stats()
+        with self.captureOnCommitCallbacks(execute=True):
+            token = TelegramBotToken.generate_token(self.user, transaction_id='t1')
+            # L'invalidation n'a lieu qu'au commit
+            self.assertIsNotNone(cache.get(STATS_CACHE_KEY))
+        self.assertEqual(get_telegram_stats()['tokens']['total'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            token.delete()
+        self.assertEqual(get_telegram_stats()['tokens']['total'], 0)
+
+    def test_member_delete_invalidates_stats(self):
+        end = timezone.now() + timedelta(days=1)
+        member = TelegramChannelMember.objects.create(
+            user=self.user, channel_id=CHANNEL_ID, channel_name='Canal', telegram_user_id=7,
+            subscription_type='test', subscription_end_date=end, expires_at=end,
+        )
+        self.assertEqual(get_telegram_stats()['members']['active'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            member.delete()
+        self.assertEqual(get_telegram_stats()['members']['active'], 0)
@@ -10,6 +10,7 @@ urlpatterns = [
     # Clients Support
     path('clients/', views_support.support_clients_list, name='support_clients'),
     path('clients/<int:client_id>/', views_support.support_client_detail, name='support_client_detail'),
+    path('clients/<int:client_id>/payments/', views_support.support_client_payments, name='support_client_payments'),
     
     # Revenus Support
     path('revenues/', views_support.support_revenues_stats, name='support_revenues'),
@@ -10,5 +10,6 @@ urlpatterns = [
     # Administration
     path('revoke-access/', views_telegram.revoke_telegram_access, name='revoke_telegram_access'),
     path('admin/stats/', views_telegram.get_admin_telegram_stats, name='admin_telegram_stats'),
+    path('admin/stats/daily/', views_telegram.get_admin_telegram_timeseries, name='admin_telegram_timeseries'),
 ]
 
@@ -6,7 +6,6 @@ from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth import get_user_model, authenticate
 from django.contrib.sites.shortcuts import get_current_site
 from django.urls import reverse
-from django.core.mail import EmailMultiAlternatives
 from django.conf import settings
 from django.utils import timezone
 from django.db.models import Q
@@ -14,10 +13,29 @@ import os
 import secrets
 from .serializers import RegisterSerializer, UserSerializer, AdminUserSerializer
 from .models import UserProfile, EmailVerificationToken
+from backend.mail import build_email, mail_service
 
 User = get_user_model()
 
 
+def send_activation_email(user, activation_link):
+    """Envoyer l'e-mail d'activation du compte (gabarit emails/activation)"""
+    site_name = os.getenv('SITE_NAME', 'CALMNESS FI')
+    email = build_email(
+        subject=f"{site_name} • Confirmez votre e-mail",
+        to=[user.email],
+        template='activation',
+        context={
+            'site_name': site_name,
+            'brand_color': os.getenv('BRAND_COLOR', '#F5B301'),
+            'logo_url': f"{settings.FRONTEND_BASE_URL.rstrip('/')}/logo.png",
+            'user_name': user.first_name or user.username,
+            'activation_link': activation_link,
+        },
+    )
+    mail_service.send(email)
+
+
 # Create your views here.
 
 
@@ -59,76 +77,9 @@ class RegisterView(generics.CreateAPIView):
             else:
                 activation_link = f"{frontend_base}/verify-email?token={verification_token.token}"
 
-            site_name = os.getenv('SITE_NAME', 'CALMNESS FI')
-            brand_color = os.getenv('BRAND_COLOR', '#F5B301')
-            logo_url = f"{settings.FRONTEND_BASE_URL.rstrip('/')}/logo.png"
-
-            subject = f"{site_name} • Confirmez votre e-mail"
-
-            text_message = (
-                f"Bonjour {user.first_name or user.username},\n\n"
-                "Merci pour votre inscription. Veuillez confirmer votre adresse e-mail avec le lien ci-dessous :\n"
-                f"{activation_link}\n\n"
-                f"— L'équipe {site_name}"
-            )
-
-            html_message = f"""
-<!doctype html>
-<html lang=\"fr\">
-  <head>
-    <meta charset=\"utf-8\" />
-    <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\" />
-    <title>{site_name} - Confirmation d'email</title>
-  </head>
-  <body style=\"margin:0;padding:0;background:#0b0e14;color:#111;font-family:Inter,Arial,sans-serif;\">
-    <table role=\"presentation\" cellpadding=\"0\" cellspacing=\"0\" width=\"100%\" style=\"background:#0b0e14;padding:32px 0;\">
-      <tr>
-        <td align=\"center\">
-          <table role=\"presentation\" cellpadding=\"0\" cellspacing=\"0\" width=\"600\" style=\"background:#ffffff;border-radius:12px;overflow:hidden;\">
-            <tr>
-              <td style=\"padding:24px 24px 0 24px; text-align:center; background:#111;\">
-                <img src=\"{logo_url}\" alt=\"{site_name}\" height=\"48\" style=\"display:inline-block;\" />
-              </td>
-            </tr>
-            <tr>
-              <td style=\"padding:24px 24px 8px 24px; text-align:center; background:#111;\">
-                <h1 style=\"margin:0;color:#fff;font-size:22px;font-weight:700;\">Confirmez votre adresse e-mail</h1>
-              </td>
-            </tr>
-            <tr>
-              <td style=\"padding:24px;\">
-                <p style=\"margin:0 0 12px 0;color:#111;\">Bonjour {user.first_name or user.username},</p>
-                <p style=\"margin:0 0 16px 0;color:#4b5563;\">Merci pour votre inscription à <strong>{site_name}</strong>. Cliquez sur le bouton ci-dessous pour activer votre compte.</p>
-                <p style=\"text-align:center;margin:28px 0;\">
-                  <a href=\"{activation_link}\" style=\"display:inline-block;background:{brand_color};color:#111;text-decoration:none;padding:12px 20px;border-radius:10px;font-weight:600;\">Activer mon compte</a>
-                </p>
-                <p style=\"margin:0 0 8px 0;color:#6b7280;font-size:12px;\">Si le bouton ne fonctionne pas, copiez-collez ce lien dans votre navigateur :</p>
-                <p style=\"word-break:break-all;color:#2563eb;font-size:12px;\">{activation_link}</p>
-                <hr style=\"border:none;border-top:1px solid #e5e7eb;margin:24px 0;\" />
-                <p style=\"margin:0;color:#9ca3af;font-size:12px;\">Cet e-mail vous a été envoyé par {site_name}. Si vous n'êtes pas à l'origine de cette action, ignorez ce message.</p>
-              </td>
-            </tr>
-            <tr>
-              <td style=\"padding:16px 24px;background:#f9fafb;text-align:center;color:#6b7280;font-size:12px;\">© {site_name}</td>
-            </tr>
-          </table>
-        </td>
-      </tr>
-    </table>
-  </body>
-  </html>
-            """
-
             try:
                 print(f"Tentative d'envoi d'email à {user.email}")
-                email = EmailMultiAlternatives(
-                    subject=subject,
-                    body=text_message,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    to=[user.email],
-                )
-                email.attach_alternative(html_message, "text/html")
-                email.send(fail_silently=False)
+                send_activation_email(user, activation_link)
                 print(f"SUCCESS: Email d'activation envoyé à {user.email}")
             except Exception as e:
                 print(f"ERREUR lors de l'envoi de l'email d'activation: {e}")
@@ -243,79 +194,8 @@ def resend_activation_email(request):
         activation_link = f"{frontend_base}/verify-email?token={verification_token.token}"
         
         # Envoyer l'email
-        site_name = os.getenv('SITE_NAME', 'CALMNESS FI')
-        brand_color = os.getenv('BRAND_COLOR', '#F5B301')
-        logo_url = f"{settings.FRONTEND_BASE_URL.rstrip('/')}/logo.png"
-        
-        subject = f"{site_name} • Confirmez votre e-mail"
-        
-        text_message = (
-            f"Bonjour {user.first_name or user.username},\n\n"
-            f"Merci pour votre inscription à {site_name}. Cliquez sur le lien ci-dessous pour activer votre compte.\n\n"
-            f"Lien d'activation: {activation_link}\n\n"
-            f"Cet e-mail vous a été envoyé par {site_name}. Si vous n'êtes pas à l'origine de cette action, ignorez ce message.\n"
-        )
-        
-        html_message = f"""
-        <!DOCTYPE html>
-        <html lang="fr">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>{site_name} • Confirmation d'e-mail</title>
-            <style>
-                body {{ margin: 0; padding: 0; font-family: Arial, sans-serif; background-color: #f9fafb; }}
-                .container {{ max-width: 600px; margin: 0 auto; background-color: #ffffff; }}
-                .header {{ background-color: #f9fafb; padding: 40px 0; text-align: center; border-bottom: 1px solid #e5e7eb; }}
-                .content {{ padding: 24px; }}
-                .button {{ display: inline-block; background-color: {brand_color}; color: #111; text-decoration: none; padding: 12px 20px; border-radius: 10px; font-weight: 600; }}
-                .footer {{ background-color: #f9fafb; padding: 16px 24px; text-align: center; color: #6b7280; font-size: 12px; }}
-            </style>
-        </head>
-        <body>
-            <table role="presentation" style="width:100%;border-collapse:collapse;border:0;border-spacing:0;background:#ffffff;">
-                <tr>
-                    <td align="center" style="padding:0;">
-                        <table role="presentation" style="width:600px;border-collapse:collapse;border:1px solid #cccccc;border-spacing:0;text-align:left;">
-                            <tr>
-                                <td align="center" style="padding:40px 0 30px 0;background:#f9fafb;">
-                                    <img src="{logo_url}" alt="" width="120" style="height:auto;display:block;" />
-                                    <h1 style="margin:0;font-size:24px;line-height:32px;font-family:Arial,sans-serif;color:#111;">{site_name}</h1>
-                                </td>
-                            </tr>
-                            <tr>
-                                <td style="padding:24px;">
-                                    <p style="margin:0 0 12px 0;color:#111;">Bonjour {user.first_name or user.username},</p>
-                                    <p style="margin:0 0 16px 0;color:#4b5563;">Merci pour votre inscription à <strong>{site_name}</strong>. Cliquez sur le bouton ci-dessous pour activer votre compte.</p>
-                                    <p style="text-align:center;margin:28px 0;">
-                                        <a href="{activation_link}" style="display:inline-block;background:{brand_color};color:#111;text-decoration:none;padding:12px 20px;border-radius:10px;font-weight:600;">Activer mon compte</a>
-                                    </p>
-                                    <p style="margin:0 0 8px 0;color:#6b7280;font-size:12px;">Si le bouton ne fonctionne pas, copiez-collez ce lien dans votre navigateur :</p>
-                                    <p style="word-break:break-all;color:#2563eb;font-size:12px;">{activation_link}</p>
-                                    <hr style="border:none;border-top:1px solid #e5e7eb;margin:24px 0;" />
-                                    <p style="margin:0;color:#9ca3af;font-size:12px;">Cet e-mail vous a été envoyé par {site_name}. Si vous n'êtes pas à l'origine de cette action, ignorez ce message.</p>
-                                </td>
-                            </tr>
-                            <tr>
-                                <td style="padding:16px 24px;background:#f9fafb;text-align:center;color:#6b7280;font-size:12px;">© {site_name}</td>
-                            </tr>
-                        </table>
-                    </td>
-                </tr>
-            </table>
-        </body>
-        </html>
-        """
-        
         try:
-            email_obj = EmailMultiAlternatives(
-                subject=subject,
-                body=text_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[user.email],
-            )
-            email_obj.attach_alternative(html_message, "text/html")
-            email_obj.send(fail_silently=False)
+            send_activation_email(user, activation_link)
             print(f"Email d'activation renvoyé à {user.email}")
             
             return Response({
@@ -3,14 +3,20 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
-from django.db.models import Q, Count, Sum
+from django.db.models import Q, Count, Sum, Exists, OuterRef, Subquery, Value, DecimalField, IntegerField
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from datetime import datetime, timedelta
+from decimal import Decimal
+import base64
+import json
 
 from .models_support import SupportMessage, SupportReply, SupportTicket, SupportOrder, SupportInvoice, SupportInvoiceItem
 from .serializers import UserSerializer
-from payments.models import Payment, PendingPayment
+from payments.models import Payment, PendingPayment, Subscription
 from payments.serializers import PaymentSerializer
+from payments.revenue import get_revenue_stats, get_total_revenue
+from payments.subscriptions import active_at
 
 User = get_user_model()
 
@@ -81,15 +87,113 @@ def support_message_detail(request, message_id):
 
 # ==================== CLIENTS SUPPORT ====================
 
+CLIENTS_PAGE_SIZE = 50
+CLIENTS_MAX_PAGE_SIZE = 200
+
+# Tris disponibles : paramètre `ordering` -> champ (annoté) du queryset
+CLIENT_SORT_FIELDS = {
+    'created_at': 'date_joined',
+    'total_spent': 'total_spent',
+    'support_tickets': 'ticket_count',
+}
+
+
+def _annotate_client_stats(queryset):
+    """Total dépensé et nombre de tickets en sous-requêtes corrélées (pas de N+1)"""
+    total_spent = (
+        Payment.objects
+        .filter(user=OuterRef('pk'), status='completed')
+        .values('user')
+        .annotate(total=Sum('amount'))
+        .values('total')
+    )
+    support_tickets = (
+        SupportMessage.objects
+        .filter(user=OuterRef('pk'))
+        .values('user')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    return queryset.annotate(
+        total_spent=Coalesce(
+            Subquery(total_spent, output_field=DecimalField(max_digits=14, decimal_places=2)),
+            Value(Decimal('0')),
+            output_field=DecimalField(max_digits=14, decimal_places=2)
+        ),
+        ticket_count=Coalesce(Subquery(support_tickets, output_field=IntegerField()), Value(0)),
+    )
+
+
+def _client_totals(clients):
+    """
+    Totaux sur l'ensemble des clients filtrés (pas seulement la page) :
+    nombre, actifs (compte actif et abonnement en cours), inactifs, revenus
+    """
+    has_active_subscription = Exists(active_at(queryset=Subscription.objects.filter(user=OuterRef('pk'))))
+    totals = clients.aggregate(
+        count=Count('id'),
+        active=Count('id', filter=Q(has_active_subscription, is_active=True)),
+        inactive=Count('id', filter=Q(is_active=False)),
+    )
+    revenue = Payment.objects.filter(user__in=clients, status='completed').aggregate(total=Sum('amount'))['total']
+    totals['total_revenue'] = float(revenue or 0)
+    return totals
+
+
+def _encode_cursor(value, pk):
+    raw = json.dumps([str(value), pk])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor):
+    try:
+        value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        return value, int(pk)
+    except (ValueError, TypeError):
+        return None
+
+
+def _keyset_page(queryset, field, descending, cursor, page_size):
+    """
+    Page suivante triée sur (field, id) : la position est portée par le
+    curseur (dernière valeur et dernier id) au lieu d'un OFFSET.
+    """
+    if cursor:
+        value, pk = cursor
+        if descending:
+            queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__lt': pk}))
+        else:
+            queryset = queryset.filter(Q(**{f'{field}__gt': value}) | Q(**{field: value, 'id__gt': pk}))
+
+    prefix = '-' if descending else ''
+    rows = list(queryset.order_by(f'{prefix}{field}', f'{prefix}id')[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    next_cursor = _encode_cursor(getattr(rows[-1], field), rows[-1].id) if has_more else None
+    return rows, next_cursor
+
+
+def _page_size(request):
+    try:
+        page_size = int(request.GET.get('page_size', CLIENTS_PAGE_SIZE))
+    except ValueError:
+        page_size = CLIENTS_PAGE_SIZE
+    return max(1, min(page_size, CLIENTS_MAX_PAGE_SIZE))
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def support_clients_list(request):
-    """Liste des clients pour le support"""
+    """
+    Annuaire paginé des clients pour le support
+    Paramètres : search, status, ordering (created_at, total_spent,
+    support_tickets, préfixe '-' pour décroissant), page_size, cursor
+    La première page (sans curseur) inclut les totaux de la sélection.
+    """
     if not (request.user.is_staff or request.user.role in ['customer_service', 'admin']):
         return Response({'error': 'Accès non autorisé'}, status=status.HTTP_403_FORBIDDEN)
     
-    # Récupérer tous les utilisateurs avec leurs informations
-    clients = User.objects.filter(role='user').select_related().prefetch_related('payments')
+    clients = User.objects.filter(role='user')
     
     # Filtrer par recherche si fournie
     search = request.GET.get('search')
@@ -109,18 +213,29 @@ def support_clients_list(request):
         elif status_filter == 'inactive':
             clients = clients.filter(is_active=False)
     
+    ordering = request.GET.get('ordering', '-created_at')
+    descending = ordering.startswith('-')
+    sort_field = CLIENT_SORT_FIELDS.get(ordering.lstrip('-'))
+    if sort_field is None:
+        return Response(
+            {'error': f"Tri invalide (valeurs possibles : {', '.join(CLIENT_SORT_FIELDS)})"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    cursor = None
+    if request.GET.get('cursor'):
+        cursor = _decode_cursor(request.GET['cursor'])
+        if cursor is None:
+            return Response({'error': 'Curseur invalide'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    page_size = _page_size(request)
+    filtered_clients = clients
+    clients, next_cursor = _keyset_page(
+        _annotate_client_stats(clients), sort_field, descending, cursor, page_size
+    )
+    
     clients_data = []
     for client in clients:
-        # Calculer les statistiques du client
-        payments = Payment.objects.filter(user=client)
-        total_spent = sum(float(p.amount) for p in payments)
-        
-        # Compter les tickets de support
-        support_tickets = SupportMessage.objects.filter(user=client).count()
-        
-        # Dernière connexion
-        last_login = client.last_login if client.last_login else None
-        
         clients_data.append({
             'id': client.id,
             'name': f"{client.first_name} {client.last_name}".strip() or client.username,
@@ -133,13 +248,46 @@ def support_clients_list(request):
             'is_verified': client.is_verified,
             'role': client.role,
             'created_at': client.date_joined,
-            'last_login': last_login,
-            'total_spent': total_spent,
-            'support_tickets': support_tickets,
-            'payment_history': PaymentSerializer(payments, many=True).data
+            'last_login': client.last_login,
+            'total_spent': float(client.total_spent),
+            'support_tickets': client.ticket_count,
         })
     
-    return Response(clients_data)
+    data = {
+        'results': clients_data,
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None,
+        'page_size': page_size,
+        'ordering': ordering,
+    }
+    if cursor is None:
+        data['totals'] = _client_totals(filtered_clients)
+    return Response(data)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def support_client_payments(request, client_id):
+    """Historique des paiements d'un client (chargé à la demande, paginé)"""
+    if not (request.user.is_staff or request.user.role in ['customer_service', 'admin']):
+        return Response({'error': 'Accès non autorisé'}, status=status.HTTP_403_FORBIDDEN)
+    
+    if not User.objects.filter(id=client_id, role='user').exists():
+        return Response({'error': 'Client non trouvé'}, status=status.HTTP_404_NOT_FOUND)
+    
+    cursor = None
+    if request.GET.get('cursor'):
+        cursor = _decode_cursor(request.GET['cursor'])
+        if cursor is None:
+            return Response({'error': 'Curseur invalide'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    payments = Payment.objects.filter(user_id=client_id).select_related('user', 'offer', 'validated_by')
+    payments, next_cursor = _keyset_page(payments, 'paid_at', True, cursor, _page_size(request))
+    
+    return Response({
+        'results': PaymentSerializer(payments, many=True).data,
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None,
+    })
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -208,58 +356,11 @@ def support_revenues_stats(request):
     if not (request.user.is_staff or request.user.role in ['customer_service', 'admin']):
         return Response({'error': 'Accès non autorisé'}, status=status.HTTP_403_FORBIDDEN)
     
-    # Calculer les statistiques
-    payments = Payment.objects.all()
-    
-    total_revenue = sum(float(p.amount) for p in payments)
-    
-    # Revenus ce mois
-    current_month = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    this_month_payments = payments.filter(created_at__gte=current_month)
-    this_month_revenue = sum(float(p.amount) for p in this_month_payments)
-    
-    # Revenus mois dernier
-    last_month = (current_month - timedelta(days=1)).replace(day=1)
-    last_month_payments = payments.filter(
-        created_at__gte=last_month,
-        created_at__lt=current_month
-    )
-    last_month_revenue = sum(float(p.amount) for p in last_month_payments)
-    
-    # Croissance
-    growth = 0
-    if last_month_revenue > 0:
-        growth = ((this_month_revenue - last_month_revenue) / last_month_revenue) * 100
-    
-    # Statistiques par offre
-    offer_stats = {}
-    for payment in payments:
-        offer_name = getattr(payment, 'offer_name', 'Offre inconnue')
-        if offer_name not in offer_stats:
-            offer_stats[offer_name] = {'count': 0, 'revenue': 0}
-        offer_stats[offer_name]['count'] += 1
-        offer_stats[offer_name]['revenue'] += float(payment.amount)
-    
-    offer_stats_list = [
-        {
-            'name': name,
-            'count': stats['count'],
-            'revenue': stats['revenue'],
-            'currency': 'EUR'
-        }
-        for name, stats in offer_stats.items()
-    ]
-    offer_stats_list.sort(key=lambda x: x['revenue'], reverse=True)
+    stats = get_revenue_stats()
+    recent_payments = Payment.objects.select_related('user', 'offer').order_by('-paid_at')[:10]
+    stats['recent_payments'] = PaymentSerializer(recent_payments, many=True).data
     
-    return Response({
-        'total_revenue': total_revenue,
-        'this_month': this_month_revenue,
-        'last_month': last_month_revenue,
-        'growth': growth,
-        'total_transactions': payments.count(),
-        'offer_stats': offer_stats_list,
-        'recent_payments': PaymentSerializer(payments[:10], many=True).data
-    })
+    return Response(stats)
 
 # ==================== COMMANDES SUPPORT ====================
 
@@ -390,8 +491,7 @@ def support_dashboard_stats(request):
         status__in=['pending', 'transaction_submitted']
     ).count()
     
-    payments = Payment.objects.all()
-    total_revenue = sum(float(p.amount) for p in payments)
+    total_revenue = get_total_revenue()
     
     # Messages
     unread_messages = SupportMessage.objects.filter(status='unread').count()
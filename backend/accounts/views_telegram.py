@@ -7,6 +7,7 @@ from django.utils import timezone
 from django.conf import settings
 
 from .models_telegram import TelegramBotToken, TelegramChannelInvite, TelegramChannelMember, TelegramNotification
+from .stats_telegram import get_telegram_stats, get_telegram_timeseries
 from payments.models import Payment, PendingPayment
 
 User = get_user_model()
@@ -209,38 +210,28 @@ def get_admin_telegram_stats(request):
             status=status.HTTP_403_FORBIDDEN
         )
     
-    # Statistiques générales
-    total_tokens = TelegramBotToken.objects.count()
-    pending_tokens = TelegramBotToken.objects.filter(status='pending').count()
-    used_tokens = TelegramBotToken.objects.filter(status='used').count()
-    
-    total_invites = TelegramChannelInvite.objects.count()
-    accepted_invites = TelegramChannelInvite.objects.filter(status='accepted').count()
-    
-    total_members = TelegramChannelMember.objects.count()
-    active_members = TelegramChannelMember.objects.filter(status='active').count()
+    return Response(get_telegram_stats())
+
+@api_view(['GET'])
+def get_admin_telegram_timeseries(request):
+    """
+    Séries quotidiennes (tokens, invitations, arrivées) pour les graphiques admin
+    """
+    if not request.user.is_staff and request.user.role not in ['admin', 'customer_service']:
+        return Response(
+            {'error': 'Permission refusée'},
+            status=status.HTTP_403_FORBIDDEN
+        )
     
-    # Statistiques récentes (7 derniers jours)
-    seven_days_ago = timezone.now() - timezone.timedelta(days=7)
-    recent_tokens = TelegramBotToken.objects.filter(created_at__gte=seven_days_ago).count()
-    recent_joins = TelegramChannelMember.objects.filter(joined_at__gte=seven_days_ago).count()
+    try:
+        days = min(max(int(request.query_params.get('days', 30)), 1), 365)
+    except ValueError:
+        return Response(
+            {'error': 'days doit être un entier'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     
     return Response({
-        'tokens': {
-            'total': total_tokens,
-            'pending': pending_tokens,
-            'used': used_tokens,
-            'recent': recent_tokens
-        },
-        'invites': {
-            'total': total_invites,
-            'accepted': accepted_invites,
-            'acceptance_rate': round((accepted_invites / total_invites * 100) if total_invites > 0 else 0, 2)
-        },
-        'members': {
-            'total': total_members,
-            'active': active_members,
-            'recent_joins': recent_joins
-        }
+        'days': days,
+        'series': get_telegram_timeseries(days)
     })
-
@@ -7,6 +7,7 @@ from django.utils import timezone
 from django.db.models import Q, Sum
 from datetime import timedelta
 from payments.models import Subscription, Payment
+from payments.subscriptions import active_at
 from .models import UserNotification
 from .serializers import UserSerializer
 
@@ -22,10 +23,8 @@ def user_dashboard(request):
     user = request.user
     
     # Récupérer les abonnements actifs
-    active_subscriptions = Subscription.objects.filter(
-        user=user,
-        status='active',
-        end_date__gt=timezone.now()
+    active_subscriptions = active_at(
+        queryset=Subscription.objects.filter(user=user)
     ).select_related('offer')
     
     # Récupérer les paiements
@@ -225,7 +224,7 @@ def user_subscriptions(request):
     return Response({
         'subscriptions': subscriptions_data,
         'total': subscriptions.count(),
-        'active_count': subscriptions.filter(status='active', end_date__gt=timezone.now()).count()
+        'active_count': active_at(queryset=subscriptions).count()
     })
 
 
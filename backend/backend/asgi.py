@@ -14,3 +14,12 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_asgi_application()
+
+# En mode webhook, le bot Telegram est servi par la même app ASGI
+from django.conf import settings
+
+if settings.TELEGRAM_BOT_MODE == 'webhook':
+    from telegram_bot.bot import CalmnessTradingBot
+    from telegram_bot.webhook import TelegramWebhookApp
+
+    application = TelegramWebhookApp(CalmnessTradingBot(), fallback_app=application)
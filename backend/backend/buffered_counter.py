@@ -0,0 +1,106 @@
+"""
+Compteurs tamponnés (nombre de vues...)
+
+Les incréments sont cumulés en mémoire du processus puis écrits par lots :
+un UPDATE par valeur d'incrément distincte (`champ = champ + n` pour tous
+les objets concernés) au lieu d'un UPDATE par objet et par vue.
+
+Le tampon est vidé :
+- toutes les FLUSH_INTERVAL secondes par un thread du processus (démarré au
+  premier incrément, relancé après un fork)
+- dès que MAX_PENDING objets sont en attente
+- à l'arrêt du processus
+
+Un arrêt brutal perd au plus les incréments des FLUSH_INTERVAL dernières
+secondes, ce qui est acceptable pour des statistiques de consultation.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+from django.apps import apps
+from django.db import connection
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 30
+MAX_PENDING = 1000
+
+
+class BufferedCounter:
+    """Incréments d'un champ entier de `model_label` (ex. 'content.FAQItem'), écrits par lots"""
+
+    def __init__(self, model_label, field, flush_interval=FLUSH_INTERVAL, max_pending=MAX_PENDING):
+        self.model_label = model_label
+        self.field = field
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._pid = None
+        self.stats = {'increments': 0, 'flushes': 0, 'updates': 0}
+        atexit.register(self.flush)
+
+    def _ensure_flusher(self):
+        if self._pid == os.getpid():
+            return
+        # Processus enfant (fork) : le thread du parent n'existe pas ici
+        self._pid = os.getpid()
+        self._pending = Counter()
+        thread = threading.Thread(target=self._run, name=f"counter-{self.model_label}.{self.field}", daemon=True)
+        thread.start()
+
+    def _run(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"❌ Compteur {self.model_label}.{self.field} non enregistré : {e}")
+            finally:
+                # Connexion propre au thread
+                connection.close()
+
+    def add(self, ids, amount=1):
+        """Compter `amount` pour chaque objet de `ids`"""
+        with self._lock:
+            self._ensure_flusher()
+            for object_id in ids:
+                self._pending[object_id] += amount
+            self.stats['increments'] += len(ids)
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Écrire les incréments en attente ; retourne le nombre d'objets mis à jour"""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return 0
+
+        by_amount = {}
+        for object_id, amount in pending.items():
+            by_amount.setdefault(amount, []).append(object_id)
+
+        model = apps.get_model(self.model_label)
+        updated = 0
+        for amount, ids in by_amount.items():
+            try:
+                updated += model.objects.filter(pk__in=ids).update(**{self.field: F(self.field) + amount})
+            except Exception:
+                # Remettre les incréments non écrits dans le tampon
+                with self._lock:
+                    self._pending.update(pending)
+                raise
+            for object_id in ids:
+                del pending[object_id]
+        self.stats['flushes'] += 1
+        self.stats['updates'] += len(by_amount)
+        logger.debug(f"🔢 {self.model_label}.{self.field} : {updated} compteur(s) mis à jour")
+        return updated
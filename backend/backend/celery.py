@@ -57,6 +57,34 @@ app.conf.beat_schedule = {
         'schedule': crontab(hour=3, minute=0),  # Tous les jours à 03:00
     },
     
+    # ==================== PAYMENTS TASKS ====================
+    
+    # Reprendre les étapes post-validation non terminées toutes les 10 minutes
+    'resume-payment-validation-steps': {
+        'task': 'payments.tasks.resume_validation_steps',
+        'schedule': crontab(minute='*/10'),
+    },
+    
+    # Expirer les abonnements arrivés à échéance toutes les 15 minutes
+    'expire-subscriptions': {
+        'task': 'payments.tasks.expire_subscriptions',
+        'schedule': crontab(minute='*/15'),
+    },
+    
+    # Recalculer les revenus journaliers des derniers jours tous les jours à 02:30
+    'refresh-recent-revenue-daily': {
+        'task': 'payments.tasks.refresh_recent_revenue',
+        'schedule': crontab(hour=2, minute=30),
+    },
+    
+    # ==================== CONTENT TASKS ====================
+    
+    # Compacter l'historique des versions de contenu tous les jours à 03:30
+    'compact-content-versions-daily': {
+        'task': 'content.tasks.compact_content_versions',
+        'schedule': crontab(hour=3, minute=30),
+    },
+    
     # ==================== ANALYTICS TASKS ====================
     
     # Mettre à jour les analytics tous les jours à 04:00
@@ -0,0 +1,146 @@
+"""
+Service d'envoi d'e-mails
+
+- une connexion SMTP par thread (worker Celery, thread du serveur web),
+  ouverte au premier envoi puis réutilisée : la poignée de main SMTP/TLS
+  n'est plus payée à chaque message, et aucun verrou n'est tenu pendant
+  les échanges SMTP
+- les envois restent synchrones : la facture part depuis l'étape Celery
+  send_invoice_email_step (reprises et suivi par étape), l'e-mail
+  d'activation depuis la requête d'inscription
+- reconnexion automatique si le serveur a fermé la connexion (inactivité,
+  redémarrage) ; le message en échec est renvoyé une fois sur la nouvelle
+  connexion, les messages déjà partis ne sont pas renvoyés
+- les corps HTML / texte sont rendus depuis des gabarits compilés une seule
+  fois par processus (templates/emails/)
+"""
+import logging
+import os
+import smtplib
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.utils.html import strip_tags
+
+logger = logging.getLogger(__name__)
+
+# Les serveurs SMTP ferment les connexions inactives (souvent après 5 min)
+MAIL_IDLE_TIMEOUT = 120
+
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+@lru_cache(maxsize=None)
+def _get_template(name):
+    return get_template(name)
+
+
+def _get_optional_template(name):
+    try:
+        return _get_template(name)
+    except TemplateDoesNotExist:
+        return None
+
+
+def render_email(template, context):
+    """Rendre `emails/<template>.html` et `.txt` (texte dérivé du HTML à défaut)"""
+    html = _get_template(f"emails/{template}.html").render(context)
+    text_template = _get_optional_template(f"emails/{template}.txt")
+    text = text_template.render(context) if text_template else strip_tags(html)
+    return text, html
+
+
+def build_email(subject, to, template, context, attachments=None, from_email=None):
+    """Construire un e-mail texte + HTML depuis les gabarits"""
+    text, html = render_email(template, context)
+    message = EmailMultiAlternatives(
+        subject=subject,
+        body=text,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=to if isinstance(to, (list, tuple)) else [to],
+    )
+    message.attach_alternative(html, 'text/html')
+    for filename, content, mimetype in attachments or []:
+        message.attach(filename, content, mimetype)
+    return message
+
+
+class MailService:
+    """Connexion d'envoi réutilisée, une par thread du processus"""
+
+    def __init__(self, idle_timeout=MAIL_IDLE_TIMEOUT, connection_factory=None):
+        self.idle_timeout = idle_timeout
+        self.connection_factory = connection_factory or get_connection
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.stats = {'sent': 0, 'connections': 0, 'reconnections': 0}
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            self.stats[name] += amount
+
+    def _state(self):
+        state = self._local
+        if getattr(state, 'pid', None) != os.getpid():
+            # Nouveau thread ou processus enfant (fork) : ne jamais partager la socket du parent
+            state.pid = os.getpid()
+            state.connection = None
+            state.last_used = 0
+        return state
+
+    def _open(self):
+        state = self._state()
+        if state.connection is not None and time.monotonic() - state.last_used > self.idle_timeout:
+            self._close()
+        if state.connection is None:
+            connection = self.connection_factory(fail_silently=False)
+            connection.open()
+            state.connection = connection
+            self._count('connections')
+        return state.connection
+
+    def _close(self):
+        state = self._state()
+        if state.connection is not None:
+            try:
+                state.connection.close()
+            except Exception:
+                pass
+            state.connection = None
+
+    def _send_one(self, message):
+        for attempt in range(2):
+            connection = self._open()
+            try:
+                sent = connection.send_messages([message]) or 0
+                self._local.last_used = time.monotonic()
+                return sent
+            except RECONNECT_ERRORS as e:
+                self._close()
+                if attempt:
+                    raise
+                self._count('reconnections')
+                logger.warning(f"🔌 Connexion SMTP perdue ({e}), reconnexion")
+
+    def send_messages(self, messages):
+        """Envoyer les messages sur la connexion du thread ; retourne le nombre envoyé"""
+        sent = 0
+        for message in messages:
+            sent += self._send_one(message)
+        self._count('sent', sent)
+        return sent
+
+    def send(self, message):
+        return self.send_messages([message]) == 1
+
+    def close(self):
+        """Fermer la connexion du thread courant"""
+        self._close()
+
+
+mail_service = MailService()
@@ -15,6 +15,7 @@ import os
 from datetime import timedelta
 from dotenv import load_dotenv
 from corsheaders.defaults import default_headers
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -28,6 +29,16 @@ TELEGRAM_BOT_USERNAME = os.getenv('TELEGRAM_BOT_USERNAME', '')
 TELEGRAM_CHANNEL_ID = int(os.getenv('TELEGRAM_CHANNEL_ID', '0'))
 TELEGRAM_CHANNEL_NAME = os.getenv('TELEGRAM_CHANNEL_NAME', 'Calmness Trading Signals')
 
+# Mode de réception des updates : 'polling' (un seul process) ou 'webhook' (plusieurs réplicas)
+TELEGRAM_BOT_MODE = os.getenv('TELEGRAM_BOT_MODE', 'polling').lower()
+TELEGRAM_WEBHOOK_URL = os.getenv('TELEGRAM_WEBHOOK_URL', '')
+TELEGRAM_WEBHOOK_PATH = os.getenv('TELEGRAM_WEBHOOK_PATH', '/api/telegram/webhook/')
+TELEGRAM_WEBHOOK_SECRET = os.getenv('TELEGRAM_WEBHOOK_SECRET', '')
+# Durée de rétention des update_id traités (Telegram conserve les updates 24h)
+TELEGRAM_WEBHOOK_DEDUP_TTL = int(os.getenv('TELEGRAM_WEBHOOK_DEDUP_TTL', str(24 * 60 * 60)))
+# Temps maximum d'attente des updates en cours lors de l'arrêt d'un réplica
+TELEGRAM_WEBHOOK_DRAIN_TIMEOUT = int(os.getenv('TELEGRAM_WEBHOOK_DRAIN_TIMEOUT', '25'))
+
 # Celery Configuration (Upstash Redis)
 UPSTASH_REDIS_REST_URL = os.getenv('UPSTASH_REDIS_REST_URL', '')
 UPSTASH_REDIS_REST_TOKEN = os.getenv('UPSTASH_REDIS_REST_TOKEN', '')
@@ -42,6 +53,28 @@ else:
     CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
     CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0')
 
+# Cache partagé entre réplicas (Redis si configuré, sinon mémoire locale).
+# Sans CACHE_REDIS_URL, le Redis Upstash de Celery est réutilisé (KEY_PREFIX
+# distinct). Obligatoire hors DEBUG : voir la vérification après DEBUG.
+CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', '') or (
+    CELERY_BROKER_URL if UPSTASH_REDIS_REST_URL and UPSTASH_REDIS_REST_TOKEN else ''
+)
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+            'KEY_PREFIX': 'calmness',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'calmness-default',
+        }
+    }
+
 # Celery Settings
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
@@ -60,6 +93,13 @@ SECRET_KEY = os.getenv('DJANGO_SECRET_KEY', 'change-me-in-production')
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.getenv('DJANGO_DEBUG', 'True').lower() in ('1', 'true', 'yes', 'on')
 
+# Les invalidations de cache (Celery, commandes, autres workers) ne passent
+# que par un cache partagé : la mémoire locale servirait des données périmées
+if not DEBUG and not CACHE_REDIS_URL:
+    raise ImproperlyConfigured(
+        "CACHE_REDIS_URL (ou UPSTASH_REDIS_REST_URL / UPSTASH_REDIS_REST_TOKEN) est obligatoire quand DEBUG est désactivé"
+    )
+
 ALLOWED_HOSTS = [h for h in os.getenv('DJANGO_ALLOWED_HOSTS', '').split(',') if h] or [
     '127.0.0.1',
     'localhost',
@@ -144,6 +184,7 @@ EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True').lower() in ('1', 'true', 'yes', 'on')
 EMAIL_USE_SSL = os.getenv('EMAIL_USE_SSL', 'False').lower() in ('1', 'true', 'yes', 'on')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', EMAIL_HOST_USER or 'no-reply@example.com')
+EMAIL_TIMEOUT = int(os.getenv('EMAIL_TIMEOUT', '10'))
 
 # Frontend base URL used for redirects after activation
 FRONTEND_BASE_URL = os.getenv('FRONTEND_BASE_URL', 'http://127.0.0.1:5173')
@@ -230,6 +271,10 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static'),
 ]
 
+# Fichiers générés (PDF de factures, exports)
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -240,7 +285,8 @@ AUTH_USER_MODEL = 'accounts.User'
 
 # DeepL API Configuration
 DEEPL_API_KEY = os.getenv('DEEPL_API_KEY', '')
-DEEPL_API_URL = 'https://api-free.deepl.com/v2/translate'
+DEEPL_API_URL = os.getenv('DEEPL_API_URL', 'https://api-free.deepl.com/v2/translate')
+DEEPL_MAX_REQUESTS_PER_SECOND = float(os.getenv('DEEPL_MAX_REQUESTS_PER_SECOND', '5'))
 
 # Langues supportées
 SUPPORTED_LANGUAGES = {
@@ -0,0 +1,206 @@
+"""
+Cache versionné à deux niveaux pour les données publiques peu modifiées
+(catalogues d'offres, contenus CMS)
+
+- niveau 1 : copie en mémoire du processus, revalidée au plus toutes les
+  LOCAL_CHECK_SECONDS secondes en relisant la version partagée
+- niveau 2 : cache Django partagé (Redis en production), clé
+  `<nom>:<version>`
+
+Invalider revient à changer la version partagée : tous les processus
+reconstruisent (ou relisent) la donnée à leur prochaine vérification.
+L'ETag est le hash du contenu sérialisé, identique sur tous les processus.
+
+TaggedCache : entrées multiples (par page, par liste...) dépendant
+d'étiquettes (`page:accueil`, `faq`...). Chaque étiquette a une version
+partagée (horodatage de sa dernière invalidation) ; une entrée n'est servie
+que si les versions de toutes ses étiquettes sont celles relevées lors de sa
+construction. invalidate_tags() n'invalide donc que les entrées concernées.
+
+Avec la mémoire locale (LocMemCache, développement), les invalidations faites
+par un autre processus (Celery, commandes, autres workers) ne sont pas vues :
+les entrées expirent alors après LOCMEM_SHARED_TTL secondes au lieu de
+SHARED_TTL. La production exige un Redis (voir settings.CACHE_REDIS_URL).
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+LOCAL_CHECK_SECONDS = 5
+SHARED_TTL = 24 * 60 * 60
+LOCMEM_SHARED_TTL = 60
+
+
+def default_shared_ttl():
+    """Durée de vie des entrées : courte si le cache n'est pas partagé entre processus"""
+    if settings.CACHES['default']['BACKEND'].endswith('LocMemCache'):
+        return LOCMEM_SHARED_TTL
+    return SHARED_TTL
+
+
+class VersionedCache:
+    """Donnée sérialisable reconstruite par `build()` et servie depuis le cache"""
+
+    def __init__(self, name, build, shared_ttl=None, local_check_seconds=LOCAL_CHECK_SECONDS):
+        self.name = name
+        self.build = build
+        self.shared_ttl = shared_ttl or default_shared_ttl()
+        self.local_check_seconds = local_check_seconds
+        self._local = None  # (version, payload, etag, vérifié_le, lu_le)
+        self._lock = threading.Lock()
+
+    @property
+    def version_key(self):
+        return f"{self.name}:version"
+
+    def _current_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, uuid.uuid4().hex, None)
+            version = cache.get(self.version_key)
+        return version
+
+    def get(self):
+        """Retourne (payload, etag)"""
+        local = self._local
+        if local and time.monotonic() - local[3] < self.local_check_seconds:
+            return local[1], local[2]
+
+        with self._lock:
+            version = self._current_version()
+            # La copie locale ne survit pas à l'entrée partagée dont elle provient
+            if local and local[0] == version and time.monotonic() - local[4] < self.shared_ttl:
+                self._local = (version, local[1], local[2], time.monotonic(), local[4])
+                return local[1], local[2]
+
+            entry = cache.get(f"{self.name}:{version}")
+            if entry is None:
+                payload = self.build()
+                body = json.dumps(payload, cls=DjangoJSONEncoder, sort_keys=True)
+                entry = (json.loads(body), hashlib.sha1(body.encode()).hexdigest())
+                cache.set(f"{self.name}:{version}", entry, self.shared_ttl)
+                logger.info(f"🗂️ Cache {self.name} reconstruit (version {version[:8]})")
+
+            now = time.monotonic()
+            self._local = (version, entry[0], entry[1], now, now)
+            return entry
+
+    def invalidate(self):
+        """Nouvelle version partagée : les anciennes entrées ne sont plus lues"""
+        cache.set(self.version_key, uuid.uuid4().hex, None)
+        self._local = None
+
+
+def cached_response(request, versioned_cache, max_age=60, transform=None):
+    """
+    Réponse DRF depuis un VersionedCache, avec ETag / Cache-Control.
+    `transform(payload)` permet de servir une partie du contenu (l'ETag
+    reste celui du contenu complet). Retourne un 304 si l'ETag du client
+    est à jour.
+    """
+    payload, etag = versioned_cache.get()
+    etag = f'"{etag}"'
+
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        not_modified['Cache-Control'] = f'public, max-age={max_age}'
+        return not_modified
+
+    response = Response(transform(payload) if transform else payload)
+    response['ETag'] = etag
+    response['Cache-Control'] = f'public, max-age={max_age}'
+    return response
+
+
+# ==================== CACHE PAR ÉTIQUETTES ====================
+
+def _tag_key(tag):
+    return f"cache_tag:{tag}"
+
+
+def tag_versions(tags):
+    """Versions courantes des étiquettes (initialisées si absentes)"""
+    keys = {_tag_key(tag): tag for tag in tags}
+    found = cache.get_many(list(keys))
+    missing = [key for key in keys if key not in found]
+    if missing:
+        now = time.time()
+        for key in missing:
+            cache.add(key, now, None)
+        found.update(cache.get_many(missing))
+    return {keys[key]: version for key, version in found.items()}
+
+
+def invalidate_tags(*tags):
+    """Invalider toutes les entrées dépendant de ces étiquettes"""
+    if tags:
+        now = time.time()
+        cache.set_many({_tag_key(tag): now for tag in tags}, None)
+        logger.info(f"🗂️ Étiquettes de cache invalidées : {', '.join(sorted(tags))}")
+
+
+class TaggedCache:
+    """Entrées sérialisables reconstruites par `build()` tant que leurs étiquettes n'ont pas changé"""
+
+    def __init__(self, name, shared_ttl=None):
+        self.name = name
+        self.shared_ttl = shared_ttl or default_shared_ttl()
+
+    def get(self, key, tags, build):
+        """
+        Retourne l'entrée {'payload', 'etag', 'last_modified'} ; `build()` n'est
+        appelé que si l'entrée est absente ou si une étiquette a été invalidée.
+        Les versions sont relevées avant la construction : une invalidation
+        concurrente rend l'entrée obsolète dès la requête suivante.
+        """
+        versions = tag_versions(tags)
+        cache_key = f"{self.name}:{key}"
+        entry = cache.get(cache_key)
+        if entry is not None and entry['versions'] == versions:
+            return entry
+
+        body = json.dumps(build(), cls=DjangoJSONEncoder, sort_keys=True)
+        entry = {
+            'payload': json.loads(body),
+            'etag': hashlib.sha1(body.encode()).hexdigest(),
+            'last_modified': int(max(versions.values())) if versions else int(time.time()),
+            'versions': versions,
+        }
+        cache.set(cache_key, entry, self.shared_ttl)
+        return entry
+
+
+def tagged_response(request, tagged_cache, key, tags, build, max_age=60, variant=None, transform=None):
+    """
+    Réponse DRF depuis un TaggedCache, avec ETag / Last-Modified (304 si à jour).
+    `transform(payload)` sert une partie de l'entrée ; `variant` (ex. la
+    sélection de champs) distingue alors l'ETag de chaque variante.
+    """
+    entry = tagged_cache.get(key, tags, build)
+    etag = entry['etag']
+    if variant:
+        etag = hashlib.sha1(f"{etag}:{variant}".encode()).hexdigest()
+    etag = f'"{etag}"'
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=entry['last_modified'])
+    if not_modified is not None:
+        not_modified['Cache-Control'] = f'public, max-age={max_age}'
+        return not_modified
+
+    response = Response(transform(entry['payload']) if transform else entry['payload'])
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(entry['last_modified'])
+    response['Cache-Control'] = f'public, max-age={max_age}'
+    return response
@@ -8,6 +8,7 @@ from .models_comprehensive_cms import (
     GlobalSettings, PageCategory, SitePage, ContentBlock, ComprehensiveContentVersion,
     Testimonial, FAQItem, Offer, ComprehensiveEditSession, ComprehensivePendingChange
 )
+from .models_translation import ContentBlockTranslation, TranslationMemory
 
 @admin.register(GlobalSettings)
 class GlobalSettingsAdmin(admin.ModelAdmin):
@@ -143,11 +144,12 @@ class ComprehensiveContentVersionInline(admin.TabularInline):
 class ComprehensiveContentVersionAdmin(admin.ModelAdmin):
     """Administration des versions de contenu"""
     
-    list_display = ['content_block', 'version_number', 'title_preview', 'change_summary', 'created_at', 'created_by']
-    list_filter = ['created_at', 'created_by']
+    list_display = ['content_block', 'version_number', 'title_preview', 'change_summary', 'is_snapshot', 'created_at', 'created_by']
+    list_filter = ['is_snapshot', 'created_at', 'created_by']
     search_fields = ['content_block__block_key', 'title', 'change_summary']
     ordering = ['-created_at']
-    readonly_fields = ['version_number', 'created_at']
+    # Les versions suivantes peuvent être stockées en delta de celle-ci
+    readonly_fields = ['version_number', 'created_at', 'title', 'content', 'metadata', 'is_snapshot', 'delta']
     
     fieldsets = (
         ('Informations générales', {
@@ -156,6 +158,10 @@ class ComprehensiveContentVersionAdmin(admin.ModelAdmin):
         ('Contenu', {
             'fields': ('title', 'content', 'metadata')
         }),
+        ('Stockage', {
+            'fields': ('is_snapshot', 'delta'),
+            'classes': ('collapse',)
+        }),
         ('Métadonnées', {
             'fields': ('created_at', 'created_by'),
             'classes': ('collapse',)
@@ -329,6 +335,20 @@ class ComprehensivePendingChangeAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('session', 'content_block')
 
+@admin.register(ContentBlockTranslation)
+class ContentBlockTranslationAdmin(admin.ModelAdmin):
+    list_display = ['content_block', 'field_name', 'language', 'is_auto_generated', 'is_manual_override', 'updated_at']
+    list_filter = ['language', 'is_auto_generated', 'is_manual_override']
+    search_fields = ['content_block__block_key', 'translated_content']
+    raw_id_fields = ['content_block', 'created_by']
+
+@admin.register(TranslationMemory)
+class TranslationMemoryAdmin(admin.ModelAdmin):
+    list_display = ['source_language', 'target_language', 'source_text', 'hits', 'last_used_at']
+    list_filter = ['source_language', 'target_language']
+    search_fields = ['source_text', 'translated_text']
+    readonly_fields = ['source_hash', 'created_at', 'last_used_at']
+
 # Configuration de l'admin
 admin.site.site_header = "CALMNESS FI - Administration"
 admin.site.site_title = "CALMNESS FI Admin"
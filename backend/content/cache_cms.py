@@ -0,0 +1,42 @@
+"""
+Cache des contenus CMS publics
+
+cms_cache : réponses publiques par page / liste (TaggedCache), chacune
+dépendant d'étiquettes invalidées par les signaux (voir signals.py), et
+instantanés des pages pour l'aperçu des sessions d'édition (voir preview.py)
+"""
+from backend.versioned_cache import TaggedCache, invalidate_tags, tagged_response
+
+TAG_SETTINGS = 'cms:settings'
+TAG_TESTIMONIALS = 'cms:testimonials'
+TAG_FAQ = 'cms:faq'
+TAG_OFFERS = 'cms:offers'
+TAG_CONTACT_FIELDS = 'cms:contact_fields'
+TAG_REVIEWS = 'cms:reviews'
+# Pages, blocs et versions (statistiques du tableau de bord)
+TAG_STATS = 'cms:stats'
+
+
+def page_tag(slug):
+    return f"cms:page:{slug}"
+
+
+def translation_tag(language):
+    """Étiquette des pages servies dans une langue (traductions des blocs)"""
+    return f"cms:translations:{language}"
+
+
+def section_page_tag(page_id):
+    """Étiquette d'une page du CMS historique (Page / ContentSection)"""
+    return f"cms:section_page:{page_id}"
+
+
+cms_cache = TaggedCache('content:cms')
+
+
+def cms_response(request, key, tags, build, variant=None, transform=None):
+    return tagged_response(request, cms_cache, key, tags, build, variant=variant, transform=transform)
+
+
+def invalidate_pages(*slugs):
+    invalidate_tags(*(page_tag(slug) for slug in slugs if slug))
@@ -0,0 +1,88 @@
+"""
+Application groupée de modifications de blocs de contenu (change-sets)
+
+Un change-set associe à chaque bloc les valeurs de ses champs modifiés.
+Pour l'ensemble des blocs, en un nombre constant de requêtes :
+- verrouillage des blocs (select_for_update)
+- une version par bloc (état avant modification, en delta de la version
+  précédente, voir versioning.py) en un bulk_create
+- mise à jour en un bulk_update limité aux champs touchés
+- une invalidation de cache par page concernée, après le commit
+
+bulk_create / bulk_update ne déclenchent pas les signaux : l'invalidation
+des pages et des statistiques, et la réindexation des blocs (recherche),
+sont faites ici.
+"""
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from backend.versioned_cache import invalidate_tags
+from .cache_cms import TAG_STATS, invalidate_pages
+from .search_index import index_on_commit
+from .models_comprehensive_cms import ComprehensiveContentVersion, ContentBlock, SitePage
+from .versioning import block_versions, state_of
+
+logger = logging.getLogger(__name__)
+
+# Champs modifiables par change-set (ni clés, ni horodatages, ni auteur)
+EDITABLE_FIELDS = frozenset(
+    field.name for field in ContentBlock._meta.concrete_fields
+    if field.name not in ('id', 'page', 'created_at', 'updated_at', 'updated_by')
+)
+
+
+def apply_change_set(changes, user, summary=None):
+    """
+    Appliquer {block_id: {champ: valeur}} ; retourne la liste des blocs
+    modifiés. Les blocs inexistants et les champs non modifiables sont ignorés.
+    `summary(block_id, champs)` donne le résumé de chaque version (par défaut
+    la liste des champs modifiés).
+    """
+    cleaned = {}
+    for block_id, fields in changes.items():
+        fields = {field: value for field, value in fields.items() if field in EDITABLE_FIELDS}
+        try:
+            block_id = int(block_id)
+        except (TypeError, ValueError):
+            continue
+        if fields:
+            cleaned.setdefault(block_id, {}).update(fields)
+    changes = cleaned
+    if not changes:
+        return []
+
+    with transaction.atomic():
+        blocks = ContentBlock.objects.select_for_update().in_bulk(list(changes))
+        if not blocks:
+            return []
+
+        now = timezone.now()
+        entries = []
+        touched = set()
+        for block_id, block in blocks.items():
+            fields = changes[block_id]
+            entries.append((
+                block,
+                state_of(block),
+                summary(block_id, fields) if summary else f"Modification de {', '.join(fields)}"
+            ))
+            for field, value in fields.items():
+                setattr(block, field, value)
+            block.updated_by = user
+            block.updated_at = now
+            touched.update(fields)
+        versions = block_versions.build(entries, user)
+
+        ComprehensiveContentVersion.objects.bulk_create(versions)
+        ContentBlock.objects.bulk_update(list(blocks.values()), sorted(touched | {'updated_by', 'updated_at'}))
+
+        page_ids = {block.page_id for block in blocks.values()}
+        slugs = list(SitePage.objects.filter(id__in=page_ids).values_list('slug', flat=True))
+        transaction.on_commit(lambda: invalidate_pages(*slugs))
+        transaction.on_commit(lambda: invalidate_tags(TAG_STATS))
+        index_on_commit('block', list(blocks))
+
+    logger.info(f"✏️ Change-set appliqué : {len(blocks)} bloc(s), {len(page_ids)} page(s)")
+    return list(blocks)
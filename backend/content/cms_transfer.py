@@ -0,0 +1,545 @@
+"""
+Transfert du CMS entre environnements (export / import en flux)
+
+Format : un dossier contenant un fichier NDJSON par modèle (une ligne JSON
+par objet, dans l'ordre des clés primaires) et un manifest.json (date
+d'export, ordre de chargement, nombre de lignes par fichier).
+
+- les objets sont identifiés par leur clé naturelle (slug, page + clé du
+  bloc...), jamais par leur id (différent d'un environnement à l'autre) ;
+  les clés étrangères sont exportées sous la forme de la clé naturelle de
+  l'objet visé, et résolues à l'import en une requête par lot
+- FAQ et témoignages n'ont pas de clé unique en base : ils sont rapprochés
+  par leur contenu (question ; client + texte), les paramètres globaux sont
+  un singleton (pk=1, voir GlobalSettings.get_settings)
+- une ligne dont un autre champ unique (nom d'une page ou d'une catégorie)
+  est déjà pris par un autre objet est ignorée et signalée, au lieu de faire
+  échouer tout le lot
+- les auteurs (updated_by, created_by...) ne sont pas exportés : à l'import
+  ils reçoivent l'utilisateur qui importe
+- les horodatages automatiques (created_at, updated_at) ne sont pas exportés
+- l'export lit les tables avec .iterator() : mémoire constante
+- l'import lit les fichiers ligne à ligne et écrit par lots
+  (bulk_create update_conflicts, un INSERT ... ON CONFLICT par lot), chaque
+  lot dans sa propre transaction ; un point de reprise est enregistré après
+  chaque lot validé
+
+bulk_create ne déclenche pas les signaux : l'invalidation du cache et la
+réindexation (recherche) des objets chargés sont faites après chaque lot.
+
+load_rows() expose le même chargeur aux commandes d'initialisation
+(init_*, populate_*), avec update=False pour ne créer que les objets absents
+(sémantique de get_or_create).
+"""
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field as dataclass_field
+
+from django.contrib.auth import get_user_model
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from backend.versioned_cache import invalidate_tags
+from .cache_cms import (
+    TAG_CONTACT_FIELDS, TAG_FAQ, TAG_OFFERS, TAG_SETTINGS, TAG_STATS, TAG_TESTIMONIALS, invalidate_pages,
+)
+from .models_comprehensive_cms import (
+    ContactField, ContentBlock, FAQItem, GlobalSettings, Offer, PageCategory, SitePage, Testimonial,
+)
+from .models_translation import ContentBlockTranslation
+from .search_index import index_objects
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+EXPORT_CHUNK_SIZE = 2000
+IMPORT_CHUNK_SIZE = 500
+FORMAT_VERSION = 1
+MANIFEST = 'manifest.json'
+CHECKPOINT = '.import_checkpoint.json'
+
+
+@dataclass
+class Ref:
+    """Clé étrangère exportée sous la forme de la clé naturelle de l'objet visé"""
+    model: type
+    lookups: tuple
+
+    def export(self, target):
+        values = []
+        for lookup in self.lookups:
+            value = target
+            for attr in lookup.split('__'):
+                value = getattr(value, attr)
+            values.append(value)
+        return values[0] if len(values) == 1 else values
+
+    def resolve(self, keys):
+        """{clé naturelle: id} pour les clés données, en une requête"""
+        keys = {self._key(key) for key in keys if key is not None}
+        if not keys:
+            return {}
+        filters = {f"{lookup}__in": {key[i] for key in keys} for i, lookup in enumerate(self.lookups)}
+        rows = self.model.objects.filter(**filters).values_list('id', *self.lookups)
+        return {tuple(row[1:]): row[0] for row in rows if tuple(row[1:]) in keys}
+
+    def _key(self, value):
+        return tuple(value) if isinstance(value, (list, tuple)) else (value,)
+
+
+@dataclass
+class TransferSpec:
+    """Modèle transférable : clé naturelle, références, dépendances dérivées"""
+    label: str
+    model: type
+    key: tuple
+    refs: dict = dataclass_field(default_factory=dict)
+    tag: str = None
+    # Type de document de recherche et attribut donnant l'objet à réindexer
+    search: tuple = None
+    # Slug de la page concernée par une ligne (invalidation du cache)
+    page_of: object = None
+    # False : clé sans contrainte d'unicité en base, rapprochement par requête
+    # (bulk_update des objets trouvés, bulk_create des autres)
+    constrained: bool = True
+    # Modèle singleton : seule la ligne de cette clé primaire est transférée
+    singleton_pk: int = None
+
+    def __post_init__(self):
+        meta = self.model._meta
+        self.key_attnames = [meta.get_field(name).attname for name in self.key]
+        self.other_unique = [
+            f.name for f in meta.concrete_fields
+            if f.unique and not f.primary_key and f.name not in self.key
+        ]
+        self.user_fields = [
+            f.name for f in meta.concrete_fields if f.is_relation and f.related_model is User
+        ]
+        self.fields = {
+            f.name: f for f in meta.concrete_fields
+            if f.name not in self.user_fields
+            and not getattr(f, 'auto_now', False) and not getattr(f, 'auto_now_add', False)
+            and (not f.primary_key or 'id' in self.key)
+        }
+        self.auto_now_fields = [f.name for f in meta.concrete_fields if getattr(f, 'auto_now', False)]
+
+
+SPECS = [
+    TransferSpec('page_categories', PageCategory, ('slug',)),
+    TransferSpec(
+        'pages', SitePage, ('slug',),
+        refs={'category': Ref(PageCategory, ('slug',))},
+        tag=TAG_STATS, search=('page', 'pk'), page_of=lambda row: row.get('slug'),
+    ),
+    TransferSpec(
+        'content_blocks', ContentBlock, ('page', 'block_key'),
+        refs={'page': Ref(SitePage, ('slug',))},
+        tag=TAG_STATS, search=('block', 'pk'), page_of=lambda row: row.get('page'),
+    ),
+    TransferSpec(
+        'block_translations', ContentBlockTranslation, ('content_block', 'field_name', 'language'),
+        refs={'content_block': Ref(ContentBlock, ('page__slug', 'block_key'))},
+        search=('block', 'content_block_id'),
+    ),
+    TransferSpec('global_settings', GlobalSettings, ('id',), tag=TAG_SETTINGS, singleton_pk=1),
+    TransferSpec(
+        'faq_items', FAQItem, ('question',),
+        tag=TAG_FAQ, search=('faq', 'pk'), constrained=False,
+    ),
+    TransferSpec(
+        'testimonials', Testimonial, ('client_name', 'testimonial_text'),
+        tag=TAG_TESTIMONIALS, constrained=False,
+    ),
+    TransferSpec('offers', Offer, ('slug',), tag=TAG_OFFERS, search=('offer', 'pk')),
+    TransferSpec('contact_fields', ContactField, ('field_name',), tag=TAG_CONTACT_FIELDS),
+]
+SPECS_BY_LABEL = {spec.label: spec for spec in SPECS}
+
+
+class TransferError(Exception):
+    pass
+
+
+class Progress:
+    """Suivi du nombre de lignes traitées et du débit, par modèle"""
+
+    def __init__(self, label, total=None, report=None, done=0):
+        self.label = label
+        self.total = total
+        self.report = report
+        self.done = self.resumed_from = done
+        self.skipped = 0
+        self.started = time.monotonic()
+
+    @property
+    def rate(self):
+        """Lignes par seconde depuis le début (ou la reprise)"""
+        elapsed = time.monotonic() - self.started
+        return (self.done - self.resumed_from) / elapsed if elapsed > 0 else 0.0
+
+    def advance(self, count, skipped=0):
+        self.done += count
+        self.skipped += skipped
+        if self.report:
+            self.report(self)
+
+
+# ==================== EXPORT ====================
+
+def _export_row(spec, obj):
+    row = {}
+    for name, f in spec.fields.items():
+        if name in spec.refs:
+            row[name] = spec.refs[name].export(getattr(obj, name)) if getattr(obj, f.attname) is not None else None
+        else:
+            row[name] = f.value_from_object(obj)
+    return row
+
+
+def _select_related(spec):
+    paths = []
+    for name, ref in spec.refs.items():
+        nested = [f"{name}__{lookup.rsplit('__', 1)[0]}" for lookup in ref.lookups if '__' in lookup]
+        paths.extend(nested or [name])
+    return paths
+
+
+def export_cms(directory, labels=None, chunk_size=EXPORT_CHUNK_SIZE, report=None):
+    """Écrire un fichier NDJSON par modèle et le manifest ; retourne {label: lignes}"""
+    specs = [spec for spec in SPECS if labels is None or spec.label in labels]
+    os.makedirs(directory, exist_ok=True)
+    counts = {}
+    for spec in specs:
+        progress = Progress(spec.label, spec.model.objects.count(), report)
+        queryset = spec.model.objects.select_related(*_select_related(spec)).order_by('pk')
+        if spec.singleton_pk is not None:
+            queryset = queryset.filter(pk=spec.singleton_pk)
+            progress.total = queryset.count()
+        path = os.path.join(directory, f"{spec.label}.ndjson")
+        with open(path, 'w', encoding='utf-8') as stream:
+            pending = 0
+            for obj in queryset.iterator(chunk_size=chunk_size):
+                stream.write(json.dumps(_export_row(spec, obj), cls=DjangoJSONEncoder, ensure_ascii=False))
+                stream.write('\n')
+                pending += 1
+                if pending == chunk_size:
+                    progress.advance(pending)
+                    pending = 0
+            progress.advance(pending)
+        counts[spec.label] = progress.done
+
+    manifest = {
+        'format': FORMAT_VERSION,
+        'exported_at': timezone.now().isoformat(),
+        'order': [spec.label for spec in specs],
+        'counts': counts,
+    }
+    with open(os.path.join(directory, MANIFEST), 'w', encoding='utf-8') as stream:
+        json.dump(manifest, stream, indent=2)
+    logger.info(f"📤 CMS exporté dans {directory} : {counts}")
+    return counts
+
+
+# ==================== CHARGEMENT ====================
+
+def _build(spec, rows, user):
+    """Instances non enregistrées pour les lignes dont les références existent"""
+    resolved = {
+        name: ref.resolve(row.get(name) for row in rows)
+        for name, ref in spec.refs.items()
+    }
+    objects, skipped = [], 0
+    for row in rows:
+        values = {}
+        missing = False
+        for name, value in row.items():
+            f = spec.fields.get(name)
+            if f is None:
+                # Champ inconnu ici (schéma différent) : ignoré
+                continue
+            if name in spec.refs:
+                if value is None:
+                    values[f.attname] = None
+                    continue
+                ref_id = resolved[name].get(spec.refs[name]._key(value))
+                if ref_id is None:
+                    missing = True
+                    break
+                values[f.attname] = ref_id
+            elif isinstance(f, models.JSONField):
+                values[name] = value
+            else:
+                values[name] = f.to_python(value)
+        if missing or any(row.get(name) is None for name in spec.key):
+            skipped += 1
+            continue
+        for name in spec.user_fields:
+            values[spec.model._meta.get_field(name).attname] = user.pk if user else None
+        if spec.singleton_pk is not None:
+            values['id'] = spec.singleton_pk
+        objects.append(spec.model(**values))
+    return objects, skipped
+
+
+def _update_fields(spec, row, only=None):
+    names = [name for name in row if name in spec.fields and name not in spec.key and name != 'id']
+    if only is not None:
+        names = [name for name in names if name in only]
+    return names + spec.auto_now_fields + spec.user_fields if names else []
+
+
+def _unique_fields(spec):
+    return ['pk' if name == 'id' else name for name in spec.key]
+
+
+def _key_of(spec, obj):
+    return tuple(getattr(obj, attname) for attname in spec.key_attnames)
+
+
+def _drop_unique_conflicts(spec, objects):
+    """
+    Écarter les objets dont un champ unique hors clé (ex. nom d'une page) est
+    déjà porté par un autre objet : l'INSERT échouerait pour tout le lot.
+    Retourne (objets conservés, nombre écartés).
+    """
+    conflicts = 0
+    for name in spec.other_unique:
+        attname = spec.model._meta.get_field(name).attname
+        owners = {
+            row[0]: tuple(row[1:])
+            for row in spec.model.objects.filter(
+                **{f"{attname}__in": {getattr(obj, attname) for obj in objects}}
+            ).values_list(attname, *spec.key_attnames)
+        }
+        kept = []
+        for obj in objects:
+            owner = owners.get(getattr(obj, attname))
+            if owner is not None and owner != _key_of(spec, obj):
+                logger.warning(
+                    f"⚠️ {spec.label} {_key_of(spec, obj)} ignoré : {name}={getattr(obj, attname)!r} "
+                    f"déjà utilisé par {owner}"
+                )
+                conflicts += 1
+            else:
+                kept.append(obj)
+        objects = kept
+    return objects, conflicts
+
+
+def _match_write(spec, objects, update_fields):
+    """
+    Écriture sans contrainte d'unicité sur la clé : les objets existants sont
+    retrouvés en une requête (le plus ancien en cas de doublon), mis à jour
+    si `update_fields`, les autres sont créés. Retourne les objets (avec pk).
+    """
+    # Doublons dans le lot : la dernière ligne l'emporte
+    by_key = {_key_of(spec, obj): obj for obj in objects}
+    filters = {
+        f"{attname}__in": {key[i] for key in by_key}
+        for i, attname in enumerate(spec.key_attnames)
+    }
+    existing = {}
+    for row in spec.model.objects.filter(**filters).order_by('-id').values_list('id', *spec.key_attnames):
+        existing[tuple(row[1:])] = row[0]
+
+    matched, created = [], []
+    for key, obj in by_key.items():
+        if key in existing:
+            obj.pk = existing[key]
+            matched.append(obj)
+        else:
+            created.append(obj)
+    if matched and update_fields:
+        # bulk_update n'applique pas auto_now
+        now = timezone.now()
+        for obj in matched:
+            for name in spec.auto_now_fields:
+                setattr(obj, name, now)
+        spec.model.objects.bulk_update(matched, update_fields)
+    spec.model.objects.bulk_create(created)
+    return matched + created
+
+
+def _write(spec, rows, user, update=True, update_only=None):
+    """
+    Écrire un lot (dans la transaction courante) ; retourne (objets, ignorés).
+    Les lignes sont groupées par ensemble de champs : une ligne partielle ne
+    remet pas à leur valeur par défaut les champs qu'elle ne contient pas.
+    """
+    written, skipped = [], 0
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    for group in groups.values():
+        objects, group_skipped = _build(spec, group, user)
+        objects, conflicts = _drop_unique_conflicts(spec, objects)
+        skipped += group_skipped + conflicts
+        if not objects:
+            continue
+        update_fields = _update_fields(spec, group[0], update_only) if update else []
+        if not spec.constrained:
+            objects = _match_write(spec, objects, update_fields)
+        elif update_fields:
+            spec.model.objects.bulk_create(
+                objects, update_conflicts=True,
+                unique_fields=_unique_fields(spec), update_fields=update_fields,
+            )
+        else:
+            spec.model.objects.bulk_create(objects, ignore_conflicts=True)
+        written.extend(objects)
+    return written, skipped
+
+
+def _refresh(spec, rows, objects):
+    """Invalider le cache et réindexer les objets d'un lot validé"""
+    if spec.tag:
+        invalidate_tags(spec.tag)
+    if spec.page_of:
+        invalidate_pages(*{spec.page_of(row) for row in rows})
+    elif spec.refs.get('content_block'):
+        invalidate_pages(*{row['content_block'][0] for row in rows if row.get('content_block')})
+    if spec.search:
+        content_type, attr = spec.search
+        ids = {getattr(obj, attr) for obj in objects} - {None}
+        if not ids:
+            # ignore_conflicts : les id des objets ne sont pas renvoyés
+            ids = _existing_ids(spec, rows, attr)
+        index_objects(content_type, ids)
+
+
+def _existing_ids(spec, rows, attr):
+    if spec.key == ('id',):
+        ids = [row['id'] for row in rows if row.get('id') is not None]
+        return set(spec.model.objects.filter(pk__in=ids).values_list('id', flat=True))
+    if attr != 'pk':
+        name = attr[:-len('_id')]
+        return set(spec.refs[name].resolve(row.get(name) for row in rows).values())
+    # Clé naturelle simple ou avec une référence
+    filters = {}
+    for name in spec.key:
+        values = {row.get(name) for row in rows}
+        if name in spec.refs:
+            values = set(spec.refs[name].resolve(values).values())
+            filters[f"{name}_id__in"] = values
+        else:
+            filters[f"{name}__in"] = values
+    return set(spec.model.objects.filter(**filters).values_list('id', flat=True))
+
+
+def load_rows(label, rows, user=None, update=True, update_only=None, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Charger des lignes au format d'export (références par clé naturelle) :
+    - update=True : créer ou mettre à jour (champs `update_only` seulement
+      si précisé)
+    - update=False : créer seulement les objets absents
+    Retourne le nombre de lignes ignorées (référence introuvable ou champ
+    unique déjà pris par un autre objet).
+    """
+    spec = SPECS_BY_LABEL[label]
+    rows = list(rows)
+    skipped = 0
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        with transaction.atomic():
+            objects, chunk_skipped = _write(spec, chunk, user, update, update_only)
+        skipped += chunk_skipped
+        _refresh(spec, chunk, objects)
+    return skipped
+
+
+# ==================== IMPORT ====================
+
+def read_manifest(directory):
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        raise TransferError(f"Manifest introuvable : {path}")
+    with open(path, encoding='utf-8') as stream:
+        manifest = json.load(stream)
+    if manifest.get('format') != FORMAT_VERSION:
+        raise TransferError(f"Format d'export non pris en charge : {manifest.get('format')}")
+    unknown = [label for label in manifest['order'] if label not in SPECS_BY_LABEL]
+    if unknown:
+        raise TransferError(f"Modèles inconnus dans l'export : {', '.join(unknown)}")
+    return manifest
+
+
+def _read_checkpoint(directory, manifest):
+    path = os.path.join(directory, CHECKPOINT)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as stream:
+        checkpoint = json.load(stream)
+    # Point de reprise d'un autre export : ignoré
+    if checkpoint.get('exported_at') != manifest['exported_at']:
+        return {}
+    return checkpoint.get('done', {})
+
+
+def _write_checkpoint(directory, manifest, done):
+    path = os.path.join(directory, CHECKPOINT)
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as stream:
+        json.dump({'exported_at': manifest['exported_at'], 'done': done}, stream)
+    os.replace(f"{path}.tmp", path)
+
+
+def _chunks(path, skip, chunk_size):
+    """Lots de lignes du fichier NDJSON, à partir de la ligne `skip`"""
+    chunk = []
+    with open(path, encoding='utf-8') as stream:
+        for number, line in enumerate(stream):
+            if number < skip or not line.strip():
+                continue
+            chunk.append(json.loads(line))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def _reset_sequences(specs):
+    """Après un import avec id explicites (PostgreSQL) : recaler les séquences"""
+    models_with_ids = [spec.model for spec in specs if spec.key == ('id',)]
+    statements = connection.ops.sequence_reset_sql(no_style(), models_with_ids)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+def import_cms(directory, user=None, chunk_size=IMPORT_CHUNK_SIZE, restart=False, report=None):
+    """
+    Importer un export : {label: (lignes écrites, lignes ignorées)}. Reprend
+    après le dernier lot validé d'un import interrompu sauf si `restart`.
+    """
+    manifest = read_manifest(directory)
+    done = {} if restart else _read_checkpoint(directory, manifest)
+    specs = [SPECS_BY_LABEL[label] for label in manifest['order']]
+    results = {}
+    for spec in specs:
+        total = manifest['counts'].get(spec.label)
+        progress = Progress(spec.label, total, report, done.get(spec.label, 0))
+        if total is not None and progress.done >= total:
+            results[spec.label] = (progress.done, 0)
+            continue
+        path = os.path.join(directory, f"{spec.label}.ndjson")
+        for chunk in _chunks(path, progress.done, chunk_size):
+            with transaction.atomic():
+                objects, skipped = _write(spec, chunk, user)
+            _refresh(spec, chunk, objects)
+            done[spec.label] = progress.done + len(chunk)
+            _write_checkpoint(directory, manifest, done)
+            progress.advance(len(chunk), skipped)
+        results[spec.label] = (progress.done, progress.skipped)
+
+    _reset_sequences(specs)
+    checkpoint = os.path.join(directory, CHECKPOINT)
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    logger.info(f"📥 CMS importé depuis {directory} : {results}")
+    return results
@@ -0,0 +1,92 @@
+"""
+Statistiques de contenu du tableau de bord admin
+
+- répartition par statut : une requête d'agrégats conditionnels
+  (COUNT ... FILTER) par modèle au lieu d'un count() par statut
+- activité éditoriale par jour, lue dans les tables de versions (CMS complet
+  et CMS historique) : une requête GROUP BY jour par table
+- les deux résultats sont mis en cache dans cms_cache et dépendent de
+  TAG_STATS (pages, blocs, versions) et des étiquettes des listes
+  (témoignages, FAQ, offres), invalidées par les signaux
+
+La compaction des versions (versioning.py) ne garde, au-delà des versions
+récentes, qu'une version par objet et par jour : `edits` peut alors
+sous-estimer les jours anciens, `edited_blocks` / `edited_sections` restent
+exacts sur la fenêtre de rétention quotidienne.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .cache_cms import TAG_FAQ, TAG_OFFERS, TAG_STATS, TAG_TESTIMONIALS, cms_cache
+from .models_cms import ContentVersion
+from .models_comprehensive_cms import ComprehensiveContentVersion, ContentBlock, FAQItem, Offer, SitePage, Testimonial
+
+EDITS_DEFAULT_DAYS = 30
+EDITS_MAX_DAYS = 365
+
+# Modèle : (clé des statistiques, {statut: filtre})
+STATUS_BREAKDOWNS = [
+    (SitePage, 'pages', {'published': Q(is_active=True), 'draft': Q(is_active=False)}),
+    (ContentBlock, 'content_blocks', {'visible': Q(is_visible=True), 'hidden': Q(is_visible=False)}),
+    (Testimonial, 'testimonials', {status: Q(status=status) for status, _ in Testimonial.STATUS_CHOICES}),
+    (FAQItem, 'faq_items', {status: Q(status=status) for status, _ in FAQItem.STATUS_CHOICES}),
+    (Offer, 'offers', {status: Q(status=status) for status, _ in Offer.STATUS_CHOICES}),
+]
+
+
+def build_content_stats():
+    """{'total_pages', 'published_pages', 'draft_pages', ...} : une requête par modèle"""
+    stats = {}
+    for model, name, statuses in STATUS_BREAKDOWNS:
+        aggregates = {f"total_{name}": Count('id')}
+        aggregates.update({f"{status}_{name}": Count('id', filter=condition) for status, condition in statuses.items()})
+        stats.update(model.objects.aggregate(**aggregates))
+    return stats
+
+
+def content_stats():
+    return cms_cache.get(
+        'stats:content', [TAG_STATS, TAG_TESTIMONIALS, TAG_FAQ, TAG_OFFERS], build_content_stats
+    )['payload']
+
+
+def _edits_by_day(model, parent_field, since):
+    return (
+        model.objects.filter(created_at__gte=since)
+        .annotate(day=TruncDate('created_at'))
+        .values('day')
+        .annotate(edits=Count('id'), items=Count(parent_field, distinct=True))
+        .values_list('day', 'edits', 'items')
+    )
+
+
+def build_edit_series(days, today):
+    """Une entrée par jour (jours sans modification compris), du plus ancien au plus récent"""
+    first_day = today - timedelta(days=days - 1)
+    since = timezone.make_aware(datetime.combine(first_day, time.min))
+    series = {
+        first_day + timedelta(days=offset): {'edits': 0, 'edited_blocks': 0, 'edited_sections': 0}
+        for offset in range(days)
+    }
+    sources = [
+        (ComprehensiveContentVersion, 'content_block', 'edited_blocks'),
+        (ContentVersion, 'section', 'edited_sections'),
+    ]
+    for model, parent_field, items_key in sources:
+        for day, edits, items in _edits_by_day(model, parent_field, since):
+            if day in series:
+                series[day]['edits'] += edits
+                series[day][items_key] = items
+    return [{'date': day.isoformat(), **counts} for day, counts in series.items()]
+
+
+def edit_series(days=EDITS_DEFAULT_DAYS):
+    """Modifications par jour sur les `days` derniers jours"""
+    days = min(max(days, 1), EDITS_MAX_DAYS)
+    today = timezone.localdate()
+    return cms_cache.get(
+        f"stats:edits:{days}:{today.isoformat()}", [TAG_STATS], lambda: build_edit_series(days, today)
+    )['payload']
@@ -1,9 +1,8 @@
-import requests
-import json
 import logging
 from typing import Dict, Optional, List
 from django.conf import settings
-from django.utils import timezone
+
+from .translation_engine import DeepLError, translation_engine
 
 logger = logging.getLogger(__name__)
 
@@ -12,7 +11,6 @@ class DeepLTranslationService:
     
     def __init__(self):
         self.api_key = settings.DEEPL_API_KEY
-        self.api_url = settings.DEEPL_API_URL
         self.supported_languages = settings.SUPPORTED_LANGUAGES
         
     def translate_text(self, text: str, target_language: str = 'en', source_language: str = 'fr') -> Optional[str]:
@@ -35,35 +33,11 @@ class DeepLTranslationService:
             return text
             
         try:
-            # Convertir les codes de langue pour DeepL
-            source_lang = self.supported_languages.get(source_language, 'FR')
-            target_lang = self.supported_languages.get(target_language, 'EN-US')
-            
-            # Préparer la requête
-            url = self.api_url
-            
-            data = {
-                'auth_key': self.api_key,
-                'text': text,
-                'target_lang': target_lang,
-                'source_lang': source_lang,
-                'preserve_formatting': '1'
-            }
-            
-            response = requests.post(url, data=data, timeout=30)
-            response.raise_for_status()
-            
-            result = response.json()
-            
-            if 'translations' in result and len(result['translations']) > 0:
-                translated_text = result['translations'][0]['text']
-                logger.info(f"Traduction DeepL réussie: '{text[:50]}...' -> '{translated_text[:50]}...'")
-                return translated_text
-            else:
-                logger.error(f"Format de réponse DeepL inattendu: {result}")
-                return None
-                
-        except requests.exceptions.RequestException as e:
+            # Mémoire de traduction puis DeepL (session HTTP partagée)
+            translated_text = translation_engine.translate(text, target_language, source_language)
+            logger.info(f"Traduction DeepL réussie: '{text[:50]}...' -> '{translated_text[:50]}...'")
+            return translated_text
+        except DeepLError as e:
             logger.error(f"Erreur de requête DeepL: {e}")
             return None
         except Exception as e:
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+
+from content.translation_engine import DeepLClient, TranslationEngine, backfill_translations
+
+
+class Command(BaseCommand):
+    help = (
+        'Traduire les champs non traduits des sections et blocs de contenu dans '
+        'toutes les langues supportées (mémoire de traduction + DeepL par lots)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--languages', nargs='*', help='Langues cibles (par défaut toutes)')
+        parser.add_argument('--api-url', help='URL DeepL (ex. serveur local `manage.py deepl_stub`)')
+        parser.add_argument('--rate', type=float, help='Requêtes DeepL par seconde')
+
+    def handle(self, *args, **options):
+        if not settings.DEEPL_API_KEY and not options['api_url']:
+            raise CommandError('DEEPL_API_KEY non configurée')
+
+        client = DeepLClient(api_key=settings.DEEPL_API_KEY or 'stub', api_url=options['api_url'], rate=options['rate'])
+        started = time.monotonic()
+        results = backfill_translations(languages=options['languages'], engine=TranslationEngine(client))
+        duration = time.monotonic() - started
+
+        for result in results:
+            self.stdout.write(
+                f"🌐 {result['language']} : {result['sections']} champ(s) de section, "
+                f"{result['blocks']} champ(s) de bloc, {result['errors']} erreur(s)"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {client.stats['texts']} texte(s) envoyé(s) à DeepL en {client.stats['requests']} requête(s), "
+            f"{client.stats['retries']} reprise(s), {duration:.1f}s"
+        ))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from content.versioning import DAILY_DAYS, KEEP_RECENT, WEEKLY_WEEKS, block_versions, section_versions
+
+
+class Command(BaseCommand):
+    help = (
+        "Appliquer la rétention aux versions de contenu (N récentes + points "
+        "journaliers / hebdomadaires) et stocker les versions conservées en deltas"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-recent', type=int, default=KEEP_RECENT, help='Versions récentes conservées par bloc')
+        parser.add_argument('--daily-days', type=int, default=DAILY_DAYS, help='Jours avec un point de reprise quotidien')
+        parser.add_argument('--weekly-weeks', type=int, default=WEEKLY_WEEKS, help='Semaines avec un point de reprise hebdomadaire')
+        parser.add_argument('--dry-run', action='store_true', help='Calculer sans rien modifier')
+
+    def handle(self, *args, **options):
+        policy = {
+            'keep_recent': options['keep_recent'],
+            'daily_days': options['daily_days'],
+            'weekly_weeks': options['weekly_weeks'],
+        }
+        for label, store in (('blocs', block_versions), ('sections', section_versions)):
+            result = store.compact(dry_run=options['dry_run'], **policy)
+            saved = result['bytes_before'] - result['bytes_after']
+            self.stdout.write(
+                f"🗜️ {label} : {result['objects']} objet(s), {result['deleted']} version(s) supprimée(s), "
+                f"{result['rewritten']} réencodée(s), {saved / 1024:.0f} Ko gagnés "
+                f"({result['bytes_before'] / 1024:.0f} → {result['bytes_after'] / 1024:.0f} Ko)"
+            )
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING("⚠️ Simulation : aucune modification enregistrée"))
+        else:
+            self.stdout.write(self.style.SUCCESS("✅ Compaction terminée"))
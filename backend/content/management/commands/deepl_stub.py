@@ -0,0 +1,71 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        'Serveur local imitant l\'API DeepL /v2/translate pour les essais '
+        '(traduction = "[LANGUE] texte"). Utiliser DEEPL_API_URL=http://127.0.0.1:<port>/v2/translate'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--throttle-every', type=int, default=0, help='Répondre 429 toutes les N requêtes')
+
+    def handle(self, *args, **options):
+        server = make_stub_server(options['port'], options['throttle_every'])
+        self.stdout.write(f"🧪 Stub DeepL sur http://127.0.0.1:{options['port']}/v2/translate")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stdout.write(f"📊 {server.stats}")
+
+
+def make_stub_server(port=0, throttle_every=0):
+    """Serveur stub DeepL (port 0 : port libre) ; server.stats compte requêtes et textes"""
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            params = parse_qs(self.rfile.read(length).decode('utf-8'))
+            with lock:
+                server.stats['requests'] += 1
+                throttled = throttle_every and server.stats['requests'] % throttle_every == 0
+                if not throttled:
+                    server.stats['texts'] += len(params.get('text', []))
+
+            if not self.headers.get('Authorization', '').startswith('DeepL-Auth-Key '):
+                self.send_response(403)
+                self.end_headers()
+                return
+            if throttled:
+                self.send_response(429)
+                self.send_header('Retry-After', '0')
+                self.end_headers()
+                return
+
+            target = params.get('target_lang', ['EN-US'])[0]
+            source = params.get('source_lang', ['FR'])[0]
+            body = json.dumps({'translations': [
+                {'detected_source_language': source, 'text': f"[{target}] {text}"}
+                for text in params.get('text', [])
+            ]}).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.stats = {'requests': 0, 'texts': 0}
+    return server
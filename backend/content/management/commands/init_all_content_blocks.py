@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from content.models_comprehensive_cms import SitePage, ContentBlock
 from accounts.models import User
+from content.cms_transfer import load_rows
 
 class Command(BaseCommand):
     help = 'Initialise tous les blocs de contenu nécessaires'
@@ -83,39 +84,22 @@ class Command(BaseCommand):
             ]
         }
         
-        total_created = 0
-        
-        for page_slug, blocks_data in content_blocks.items():
-            try:
-                page = SitePage.objects.get(slug=page_slug)
-                self.stdout.write(f"\n📄 Traitement de la page: {page.name}")
-                
-                for block_data in blocks_data:
-                    block, created = ContentBlock.objects.get_or_create(
-                        page=page,
-                        block_key=block_data['block_key'],
-                        defaults={
-                            'content': block_data['content'],
-                            'order': block_data['order'],
-                            'is_visible': True,
-                            'updated_by': admin_user
-                        }
-                    )
-                    
-                    if created:
-                        self.stdout.write(f"  ✅ Créé: {block.block_key}")
-                        total_created += 1
-                    else:
-                        # Mettre à jour le contenu si nécessaire
-                        if block.content != block_data['content']:
-                            block.content = block_data['content']
-                            block.updated_by = admin_user
-                            block.save()
-                            self.stdout.write(f"  🔄 Mis à jour: {block.block_key}")
-                        
-            except SitePage.DoesNotExist:
+        # Pages absentes : leurs blocs sont ignorés
+        existing = set(SitePage.objects.filter(slug__in=content_blocks).values_list('slug', flat=True))
+        for page_slug in content_blocks:
+            if page_slug not in existing:
                 self.stdout.write(self.style.WARNING(f"⚠️  Page '{page_slug}' non trouvée"))
-        
+
+        # Création des blocs absents et mise à jour du contenu des autres, par lots
+        rows = [
+            {'page': page_slug, 'is_visible': True, **block_data}
+            for page_slug, blocks_data in content_blocks.items() if page_slug in existing
+            for block_data in blocks_data
+        ]
+        total_before = ContentBlock.objects.count()
+        load_rows('content_blocks', rows, user=admin_user, update_only=['content'])
+        total_created = ContentBlock.objects.count() - total_before
+
         self.stdout.write(f"\n✅ Initialisation terminée! {total_created} blocs créés.")
         
         # Vérification finale
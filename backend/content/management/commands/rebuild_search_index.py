@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from content.models_search import SearchDocument
+from content.search_index import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Reconstruire l'index de recherche plein texte (pages, blocs, FAQ, offres)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--if-empty', action='store_true', help="Ne rien faire si l'index contient déjà des documents")
+
+    def handle(self, *args, **options):
+        if options['if_empty'] and SearchDocument.objects.exists():
+            self.stdout.write("🔎 Index de recherche déjà construit")
+            return
+
+        counts = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Index de recherche reconstruit : "
+            + ', '.join(f"{count} {content_type}" for content_type, count in counts.items())
+        ))
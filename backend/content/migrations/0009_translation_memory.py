@@ -0,0 +1,57 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0008_review'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationMemory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_hash', models.CharField(max_length=64, verbose_name='Hash du texte source')),
+                ('source_language', models.CharField(max_length=5, verbose_name='Langue source')),
+                ('target_language', models.CharField(max_length=5, verbose_name='Langue cible')),
+                ('source_text', models.TextField(verbose_name='Texte source')),
+                ('translated_text', models.TextField(verbose_name='Texte traduit')),
+                ('hits', models.PositiveIntegerField(default=0, verbose_name='Réutilisations')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Créé le')),
+                ('last_used_at', models.DateTimeField(auto_now=True, verbose_name='Dernière utilisation')),
+            ],
+            options={
+                'verbose_name': 'Mémoire de traduction',
+                'verbose_name_plural': 'Mémoire de traduction',
+                'unique_together': {('source_hash', 'source_language', 'target_language')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ContentBlockTranslation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field_name', models.CharField(max_length=50, verbose_name='Nom du champ')),
+                ('language', models.CharField(max_length=5, verbose_name='Langue')),
+                ('translated_content', models.TextField(verbose_name='Contenu traduit')),
+                ('source_hash', models.CharField(blank=True, max_length=64, verbose_name='Hash du texte source')),
+                ('is_auto_generated', models.BooleanField(default=True, verbose_name='Généré automatiquement')),
+                ('is_manual_override', models.BooleanField(default=False, verbose_name='Modification manuelle')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Créé le')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Modifié le')),
+                ('content_block', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='translations', to='content.contentblock', verbose_name='Bloc de contenu')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Créé par')),
+            ],
+            options={
+                'verbose_name': 'Traduction de bloc',
+                'verbose_name_plural': 'Traductions de blocs',
+                'ordering': ['content_block', 'language', 'field_name'],
+                'unique_together': {('content_block', 'field_name', 'language')},
+            },
+        ),
+    ]
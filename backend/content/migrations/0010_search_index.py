@@ -0,0 +1,90 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:51
+
+from django.db import migrations, models
+
+
+FTS_TABLE = 'content_searchdocument_fts'
+
+SQLITE_INDEX = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title_terms, body_terms,
+        content='content_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER content_searchdocument_ai AFTER INSERT ON content_searchdocument BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title_terms, body_terms) VALUES (new.id, new.title_terms, new.body_terms);
+    END""",
+    f"""CREATE TRIGGER content_searchdocument_ad AFTER DELETE ON content_searchdocument BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title_terms, body_terms) VALUES ('delete', old.id, old.title_terms, old.body_terms);
+    END""",
+    f"""CREATE TRIGGER content_searchdocument_au AFTER UPDATE ON content_searchdocument BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title_terms, body_terms) VALUES ('delete', old.id, old.title_terms, old.body_terms);
+        INSERT INTO {FTS_TABLE}(rowid, title_terms, body_terms) VALUES (new.id, new.title_terms, new.body_terms);
+    END""",
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS content_searchdocument_au",
+    "DROP TRIGGER IF EXISTS content_searchdocument_ad",
+    "DROP TRIGGER IF EXISTS content_searchdocument_ai",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+# Termes déjà analysés en Python : configuration 'simple' (sans racinisation)
+POSTGRESQL_INDEX = [
+    """ALTER TABLE content_searchdocument ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', title_terms), 'A') || setweight(to_tsvector('simple', body_terms), 'B')
+    ) STORED""",
+    "CREATE INDEX content_searchdocument_vector_idx ON content_searchdocument USING GIN (search_vector)",
+]
+
+POSTGRESQL_DROP = [
+    "DROP INDEX IF EXISTS content_searchdocument_vector_idx",
+    "ALTER TABLE content_searchdocument DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(schema_editor, statements):
+    statements = statements.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_fulltext_index(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_INDEX, 'postgresql': POSTGRESQL_INDEX})
+
+
+def drop_fulltext_index(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_DROP, 'postgresql': POSTGRESQL_DROP})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0009_translation_memory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_type', models.CharField(choices=[('page', 'Page'), ('block', 'Bloc de contenu'), ('faq', 'FAQ'), ('offer', 'Offre')], max_length=10, verbose_name='Type de contenu')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name="ID de l'objet")),
+                ('language', models.CharField(max_length=5, verbose_name='Langue')),
+                ('title', models.CharField(blank=True, max_length=500, verbose_name='Titre')),
+                ('excerpt', models.TextField(blank=True, verbose_name='Extrait')),
+                ('url', models.CharField(blank=True, max_length=500, verbose_name='URL')),
+                ('title_terms', models.TextField(blank=True, verbose_name='Termes du titre')),
+                ('body_terms', models.TextField(blank=True, verbose_name='Termes du contenu')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Indexé le')),
+            ],
+            options={
+                'verbose_name': 'Document de recherche',
+                'verbose_name_plural': 'Index de recherche',
+                'indexes': [models.Index(fields=['language', 'content_type'], name='content_sea_languag_de7ae6_idx')],
+                'unique_together': {('content_type', 'object_id', 'language')},
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0010_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comprehensivecontentversion',
+            name='delta',
+            field=models.JSONField(blank=True, null=True, verbose_name='Delta'),
+        ),
+        migrations.AddField(
+            model_name='comprehensivecontentversion',
+            name='is_snapshot',
+            field=models.BooleanField(default=True, verbose_name='Copie complète'),
+        ),
+        migrations.AddField(
+            model_name='contentversion',
+            name='delta',
+            field=models.JSONField(blank=True, null=True, verbose_name='Delta'),
+        ),
+        migrations.AddField(
+            model_name='contentversion',
+            name='is_snapshot',
+            field=models.BooleanField(default=True, verbose_name='Copie complète'),
+        ),
+    ]
@@ -210,4 +210,6 @@ class ServiceContent(models.Model):
 
 
 # Import des modèles CMS
-from .models_cms import Page, ContentSection, ContentVersion, AdminPassword, ContentEditSession, ContentChange
\ No newline at end of file
+from .models_cms import Page, ContentSection, ContentVersion, AdminPassword, ContentEditSession, ContentChange
+from .models_translation import TranslationMemory, ContentBlockTranslation
+from .models_search import SearchDocument
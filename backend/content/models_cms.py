@@ -77,6 +77,10 @@ class ContentVersion(models.Model):
     version_number = models.PositiveIntegerField(verbose_name="Numéro de version")
     change_summary = models.CharField(max_length=500, blank=True, verbose_name="Résumé des changements")
     
+    # Stockage (voir versioning.py) : copie complète, ou delta depuis la version précédente
+    is_snapshot = models.BooleanField(default=True, verbose_name="Copie complète")
+    delta = models.JSONField(null=True, blank=True, verbose_name="Delta")
+    
     # Métadonnées
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Créé le")
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='content_versions', verbose_name="Créé par")
@@ -3,6 +3,7 @@ from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.core.validators import MinLengthValidator
 import json
+from decimal import Decimal
 
 User = get_user_model()
 
@@ -172,6 +173,10 @@ class ComprehensiveContentVersion(models.Model):
     version_number = models.PositiveIntegerField(verbose_name="Numéro de version")
     change_summary = models.CharField(max_length=500, blank=True, verbose_name="Résumé des changements")
     
+    # Stockage (voir versioning.py) : copie complète, ou delta depuis la version précédente
+    is_snapshot = models.BooleanField(default=True, verbose_name="Copie complète")
+    delta = models.JSONField(null=True, blank=True, verbose_name="Delta")
+    
     # Métadonnées
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Créé le")
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Créé par")
@@ -339,7 +344,7 @@ class Offer(models.Model):
             return 0
         if not self.price:
             return None
-        return self.price * (1 - self.discount_percentage / 100)
+        return self.price * (1 - Decimal(self.discount_percentage) / 100)
 
 class ComprehensiveEditSession(models.Model):
     """Sessions d'édition pour le mode aperçu"""
@@ -0,0 +1,41 @@
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """
+    Document de l'index de recherche (une page, un bloc, une FAQ ou une offre
+    dans une langue). Les termes sont déjà analysés (voir search_index.py) ;
+    l'index plein texte lui-même dépend de la base (FTS5 sous SQLite,
+    tsvector + GIN sous PostgreSQL) et est créé par la migration.
+    """
+    
+    CONTENT_TYPES = [
+        ('page', 'Page'),
+        ('block', 'Bloc de contenu'),
+        ('faq', 'FAQ'),
+        ('offer', 'Offre'),
+    ]
+    
+    content_type = models.CharField(max_length=10, choices=CONTENT_TYPES, verbose_name="Type de contenu")
+    object_id = models.PositiveBigIntegerField(verbose_name="ID de l'objet")
+    language = models.CharField(max_length=5, verbose_name="Langue")
+    
+    # Affichage des résultats
+    title = models.CharField(max_length=500, blank=True, verbose_name="Titre")
+    excerpt = models.TextField(blank=True, verbose_name="Extrait")
+    url = models.CharField(max_length=500, blank=True, verbose_name="URL")
+    
+    # Termes analysés (minuscules, sans accents ni mots vides, racinisés)
+    title_terms = models.TextField(blank=True, verbose_name="Termes du titre")
+    body_terms = models.TextField(blank=True, verbose_name="Termes du contenu")
+    
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Indexé le")
+    
+    class Meta:
+        verbose_name = "Document de recherche"
+        verbose_name_plural = "Index de recherche"
+        unique_together = ['content_type', 'object_id', 'language']
+        indexes = [models.Index(fields=['language', 'content_type'])]
+    
+    def __str__(self):
+        return f"{self.content_type}:{self.object_id} ({self.language}) {self.title[:40]}"
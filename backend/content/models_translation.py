@@ -0,0 +1,54 @@
+from django.db import models
+from django.contrib.auth import get_user_model
+
+from .models_comprehensive_cms import ContentBlock
+
+User = get_user_model()
+
+
+class TranslationMemory(models.Model):
+    """Mémoire de traduction : un texte source déjà traduit n'est plus envoyé à DeepL"""
+    
+    source_hash = models.CharField(max_length=64, verbose_name="Hash du texte source")
+    source_language = models.CharField(max_length=5, verbose_name="Langue source")
+    target_language = models.CharField(max_length=5, verbose_name="Langue cible")
+    source_text = models.TextField(verbose_name="Texte source")
+    translated_text = models.TextField(verbose_name="Texte traduit")
+    hits = models.PositiveIntegerField(default=0, verbose_name="Réutilisations")
+    
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Créé le")
+    last_used_at = models.DateTimeField(auto_now=True, verbose_name="Dernière utilisation")
+    
+    class Meta:
+        verbose_name = "Mémoire de traduction"
+        verbose_name_plural = "Mémoire de traduction"
+        unique_together = ['source_hash', 'source_language', 'target_language']
+    
+    def __str__(self):
+        return f"{self.source_language}->{self.target_language} {self.source_text[:40]}"
+
+
+class ContentBlockTranslation(models.Model):
+    """Traductions des champs des blocs de contenu"""
+    
+    content_block = models.ForeignKey(ContentBlock, on_delete=models.CASCADE, related_name='translations', verbose_name="Bloc de contenu")
+    field_name = models.CharField(max_length=50, verbose_name="Nom du champ")
+    language = models.CharField(max_length=5, verbose_name="Langue")
+    translated_content = models.TextField(verbose_name="Contenu traduit")
+    # Hash du texte source traduit : une traduction dont le source a changé est à refaire
+    source_hash = models.CharField(max_length=64, blank=True, verbose_name="Hash du texte source")
+    is_auto_generated = models.BooleanField(default=True, verbose_name="Généré automatiquement")
+    is_manual_override = models.BooleanField(default=False, verbose_name="Modification manuelle")
+    
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Créé le")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Modifié le")
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Créé par")
+    
+    class Meta:
+        verbose_name = "Traduction de bloc"
+        verbose_name_plural = "Traductions de blocs"
+        ordering = ['content_block', 'language', 'field_name']
+        unique_together = ['content_block', 'field_name', 'language']
+    
+    def __str__(self):
+        return f"{self.content_block.block_key} - {self.field_name} ({self.language})"
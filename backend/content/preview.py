@@ -0,0 +1,142 @@
+"""
+Aperçu des sessions d'édition
+
+L'aperçu superpose les changements en attente d'une session à un instantané
+publié de la page :
+- l'instantané (page + blocs visibles) est mis en cache dans cms_cache et
+  dépend de l'étiquette de la page : il est invalidé par les mêmes signaux
+  que les réponses publiques
+- les changements de la session sont lus en une seule requête et indexés
+  par bloc en mémoire ; pour chaque champ, le changement le plus récent
+  l'emporte
+- en mode incrémental, seuls les blocs modifiés sont renvoyés (aperçu en
+  direct pendant la saisie) ; `since` les restreint aux blocs modifiés
+  depuis le curseur renvoyé par l'appel précédent
+
+Deux moteurs : CMS complet (SitePage / ContentBlock) et CMS historique
+(Page / ContentSection).
+"""
+from django.db.models import Subquery
+
+from .cache_cms import cms_cache, page_tag, section_page_tag
+from .models_cms import ContentChange, ContentEditSession, ContentSection
+from .models_comprehensive_cms import ComprehensiveEditSession, ComprehensivePendingChange, ContentBlock
+from .serializers_cms import PageSerializer
+from .serializers_comprehensive_cms import SitePageSerializer
+
+
+# ==================== SUPERPOSITION ====================
+
+def session_changes(change_model, session_model, user, page):
+    """Changements de la session active la plus récente de l'utilisateur sur la page"""
+    session = session_model.objects.filter(
+        user=user, is_active=True, page=page
+    ).order_by('-last_activity').values('id')[:1]
+    return change_model.objects.filter(session=Subquery(session))
+
+
+def pending_overlay(changes, item_field):
+    """
+    Indexer les mises à jour en attente : ({id: {champ: valeur}}, {id: date du
+    dernier changement}) en une requête
+    """
+    overlay, touched_at = {}, {}
+    rows = changes.filter(change_type='update').order_by('created_at', 'id').values_list(
+        item_field, 'field_name', 'new_value', 'created_at'
+    )
+    for item_id, field, value, created_at in rows:
+        overlay.setdefault(item_id, {})[field] = value
+        touched_at[item_id] = created_at
+    return overlay, touched_at
+
+
+def overlay_items(items, overlay, touched_at, incremental=False, since=None):
+    """Appliquer la superposition aux éléments de l'instantané (dans l'ordre de la page)"""
+    preview = []
+    for item in items:
+        fields = overlay.get(item['id'])
+        if fields is None:
+            if not incremental:
+                preview.append(item)
+        elif not (incremental and since and touched_at[item['id']] <= since):
+            preview.append({**item, **fields})
+    return preview
+
+
+def _preview(snapshot, items_key, changes, item_field, incremental, since):
+    overlay, touched_at = pending_overlay(changes, item_field)
+    result = {
+        items_key: overlay_items(snapshot[items_key], overlay, touched_at, incremental, since),
+        'cursor': max(touched_at.values()).isoformat() if touched_at else None,
+        'incremental': incremental,
+    }
+    if not incremental:
+        result['page'] = snapshot['page']
+    return result
+
+
+# ==================== CMS COMPLET ====================
+
+def build_block_snapshot(page):
+    blocks = ContentBlock.objects.filter(page=page, is_visible=True).order_by('order')
+    return {
+        'page': SitePageSerializer(page).data,
+        'content_blocks': [
+            {
+                'id': block.id,
+                'block_key': block.block_key,
+                'content_type': block.content_type,
+                'title': block.title,
+                'content': block.content,
+                'metadata': block.metadata,
+                'css_classes': block.css_classes,
+                'order': block.order
+            }
+            for block in blocks
+        ]
+    }
+
+
+def block_snapshot(page):
+    return cms_cache.get(
+        f"preview:page:{page.id}", [page_tag(page.slug)], lambda: build_block_snapshot(page)
+    )['payload']
+
+
+def preview_page(page, user, incremental=False, since=None):
+    """Aperçu d'une SitePage avec les changements en attente de l'utilisateur"""
+    changes = session_changes(ComprehensivePendingChange, ComprehensiveEditSession, user, page)
+    return _preview(block_snapshot(page), 'content_blocks', changes, 'content_block_id', incremental, since)
+
+
+# ==================== CMS HISTORIQUE ====================
+
+def build_section_snapshot(page):
+    sections = ContentSection.objects.filter(page=page, is_visible=True).order_by('order')
+    return {
+        'page': PageSerializer(page).data,
+        'sections': [
+            {
+                'id': section.id,
+                'section_key': section.section_key,
+                'content_type': section.content_type,
+                'title': section.title,
+                'content': section.content,
+                'metadata': section.metadata,
+                'order': section.order
+            }
+            for section in sections
+        ]
+    }
+
+
+def section_snapshot(page):
+    return cms_cache.get(
+        f"preview:section_page:{page.id}", [section_page_tag(page.id)], lambda: build_section_snapshot(page)
+    )['payload']
+
+
+def preview_sections(page, user, incremental=False, since=None):
+    """Aperçu d'une Page (CMS historique) avec les changements en attente de l'utilisateur"""
+    changes = session_changes(ContentChange, ContentEditSession, user, page)
+    return _preview(section_snapshot(page), 'sections', changes, 'section_id', incremental, since)
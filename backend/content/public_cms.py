@@ -0,0 +1,232 @@
+"""
+Contenus CMS publics : construction des réponses et bundles de page
+
+Un bundle regroupe tout ce dont une route du site a besoin au premier rendu
+(page, paramètres, FAQ, témoignages, offres, champs de contact, avis) en une
+seule réponse. Chaque section est une entrée de cms_cache partagée avec
+l'endpoint public correspondant ; le bundle complet est lui-même mis en cache
+et dépend des étiquettes de toutes ses sections.
+
+Après chaque publication, warm_page_bundles() régénère les bundles de toutes
+les pages publiques (tâche Celery) : les visiteurs ne paient pas la
+reconstruction.
+
+`?lang=` (langue de SUPPORTED_LANGUAGES autre que DEFAULT_LANGUAGE) sert les
+titres et contenus des blocs traduits (ContentBlockTranslation) ; un champ
+sans traduction, ou dont le texte source a changé depuis la traduction
+automatique, reste dans la langue source. Ces entrées dépendent en plus de
+l'étiquette de la langue (translation_tag).
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+
+from .cache_cms import (
+    cms_cache, page_tag, translation_tag,
+    TAG_CONTACT_FIELDS, TAG_FAQ, TAG_OFFERS, TAG_REVIEWS, TAG_SETTINGS, TAG_TESTIMONIALS,
+)
+from .models_comprehensive_cms import (
+    ContactField, ContentBlock, FAQItem, GlobalSettings, Offer, Review, SitePage, Testimonial,
+)
+from .models_translation import ContentBlockTranslation
+from .serializers_comprehensive_cms import (
+    ContactFieldListSerializer, GlobalSettingsSerializer, PublicFAQItemSerializer,
+    PublicOfferSerializer, PublicSitePageSerializer, PublicTestimonialSerializer, ReviewListSerializer,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== TRADUCTIONS ====================
+
+def public_language(code):
+    """Langue de traduction demandée, ou None pour la langue source"""
+    if code in settings.SUPPORTED_LANGUAGES and code != settings.DEFAULT_LANGUAGE:
+        return code
+    return None
+
+
+def translate_blocks(rows, language, fields=('title', 'content')):
+    """
+    Remplacer, dans les lignes sérialisées des blocs ({'id', 'title',
+    'content', ...}), les champs traduits dans `language` encore à jour
+    """
+    from .translation_engine import source_hash
+
+    if not language or not rows:
+        return rows
+    translations = ContentBlockTranslation.objects.filter(
+        content_block_id__in=[row['id'] for row in rows],
+        field_name__in=fields,
+        language=language,
+    ).values_list('content_block_id', 'field_name', 'translated_content', 'source_hash', 'is_manual_override')
+    by_field = {
+        (block_id, field): (text, digest, manual) for block_id, field, text, digest, manual in translations
+    }
+    for row in rows:
+        for field in fields:
+            translation = by_field.get((row['id'], field))
+            if translation is None or not row.get(field):
+                continue
+            text, digest, manual = translation
+            if manual or not digest or digest == source_hash(row[field]):
+                row[field] = text
+    return rows
+
+
+# ==================== CONSTRUCTION DES RÉPONSES ====================
+
+def build_page_content(page_slug, language=None):
+    page = get_object_or_404(SitePage, slug=page_slug, is_active=True, is_public=True)
+    content_blocks = list(ContentBlock.objects.filter(
+        page=page,
+        is_visible=True
+    ).order_by('order'))
+
+    blocks = translate_blocks([
+        {
+            'id': block.id,
+            'block_key': block.block_key,
+            'content_type': block.content_type,
+            'title': block.title,
+            'content': block.content,
+            'metadata': block.metadata,
+            'css_classes': block.css_classes,
+            'order': block.order
+        }
+        for block in content_blocks
+    ], language)
+
+    return {
+        'page': PublicSitePageSerializer(page).data,
+        'content_blocks': blocks,
+        'sections': [
+            {
+                'id': block['id'],
+                'section_key': block['block_key'],
+                'content': block['content'],
+                'title': block['title']
+            }
+            for block in blocks
+        ]
+    }
+
+
+def build_global_settings():
+    return GlobalSettingsSerializer(GlobalSettings.get_settings()).data
+
+
+def build_testimonials():
+    testimonials = Testimonial.objects.filter(
+        status='published'
+    ).order_by('order', '-created_at')
+    return PublicTestimonialSerializer(testimonials, many=True).data
+
+
+def build_faq():
+    faq_items = FAQItem.objects.filter(
+        status='published'
+    ).order_by('category', 'order', '-is_featured')
+    return PublicFAQItemSerializer(faq_items, many=True).data
+
+
+def build_offers():
+    offers = Offer.objects.filter(status='published').order_by('order', '-is_featured')
+    return PublicOfferSerializer(offers, many=True).data
+
+
+def build_contact_fields():
+    fields = ContactField.objects.filter(is_visible=True).order_by('order', 'field_label')
+    return ContactFieldListSerializer(fields, many=True).data
+
+
+def build_reviews():
+    reviews = Review.objects.filter(
+        status='approved',
+        is_public=True
+    ).order_by('-order', '-created_at')
+    return ReviewListSerializer(reviews, many=True).data
+
+
+# Sections communes à toutes les pages : (clé de cache, étiquettes, construction)
+SHARED_SECTIONS = {
+    'settings': ('settings', [TAG_SETTINGS], build_global_settings),
+    'faq': ('faq', [TAG_FAQ], build_faq),
+    'testimonials': ('testimonials', [TAG_TESTIMONIALS], build_testimonials),
+    'offers': ('offers', [TAG_OFFERS], build_offers),
+    'contact_fields': ('contact_fields', [TAG_CONTACT_FIELDS], build_contact_fields),
+    'reviews': ('reviews', [TAG_REVIEWS], build_reviews),
+}
+BUNDLE_SECTIONS = ('page', *SHARED_SECTIONS)
+
+
+def page_key(page_slug, language=None):
+    return f"page:{page_slug}:{language}" if language else f"page:{page_slug}"
+
+
+def page_tags(page_slug, language=None):
+    return [page_tag(page_slug), translation_tag(language)] if language else [page_tag(page_slug)]
+
+
+def page_section(page_slug, language=None):
+    return cms_cache.get(
+        page_key(page_slug, language), page_tags(page_slug, language),
+        lambda: build_page_content(page_slug, language)
+    )
+
+
+def shared_section(name):
+    key, tags, build = SHARED_SECTIONS[name]
+    return cms_cache.get(key, tags, build)
+
+
+# ==================== BUNDLES ====================
+
+def bundle_key(page_slug, language=None):
+    return f"bundle:{page_slug}:{language}" if language else f"bundle:{page_slug}"
+
+
+def bundle_tags(page_slug, language=None):
+    tags = page_tags(page_slug, language)
+    for _, section_tags, _ in SHARED_SECTIONS.values():
+        tags.extend(section_tags)
+    return tags
+
+
+def build_page_bundle(page_slug, language=None):
+    bundle = {'page': page_section(page_slug, language)['payload']}
+    for name in SHARED_SECTIONS:
+        bundle[name] = shared_section(name)['payload']
+    return bundle
+
+
+def get_page_bundle(page_slug, language=None):
+    """Entrée en cache du bundle complet de la page (Http404 si la page n'est pas publique)"""
+    return cms_cache.get(
+        bundle_key(page_slug, language), bundle_tags(page_slug, language),
+        lambda: build_page_bundle(page_slug, language)
+    )
+
+
+def warm_page_bundles():
+    """Régénérer (si nécessaire) les bundles de toutes les pages publiques"""
+    slugs = list(SitePage.objects.filter(is_active=True, is_public=True).values_list('slug', flat=True))
+    for slug in slugs:
+        get_page_bundle(slug)
+    logger.info(f"📦 {len(slugs)} bundle(s) de page à jour")
+    return len(slugs)
+
+
+def schedule_bundle_warmup():
+    """Planifier la régénération des bundles après le commit de la publication"""
+    def enqueue():
+        from .tasks import warm_page_bundles as warm_task
+
+        try:
+            warm_task.delay()
+        except Exception as e:
+            logger.error(f"❌ Impossible de planifier la régénération des bundles : {e}")
+
+    transaction.on_commit(enqueue)
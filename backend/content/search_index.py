@@ -0,0 +1,368 @@
+"""
+Recherche plein texte dans le contenu public (pages, blocs, FAQ, offres)
+
+- chaque contenu visible est un SearchDocument par langue (contenu source
+  dans DEFAULT_LANGUAGE, traductions des blocs dans leur langue), mis à jour
+  par les signaux après chaque écriture (voir signals.py)
+- les textes sont analysés en Python, de la même façon à l'indexation et à
+  la requête : HTML retiré, minuscules, sans accents, mots vides retirés,
+  racinisation légère propre à la langue (fr, en, es)
+- l'index inversé est celui de la base : table FTS5 (classement BM25) sous
+  SQLite, colonne tsvector générée + index GIN (ts_rank_cd normalisé par la
+  longueur) sous PostgreSQL ; le titre pèse plus que le contenu
+- un document correspond s'il contient tous les termes de la requête
+"""
+import logging
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.html import strip_tags
+
+from backend.buffered_counter import BufferedCounter
+from .models_search import SearchDocument
+
+logger = logging.getLogger(__name__)
+
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 50
+EXCERPT_LENGTH = 300
+# Poids du titre par rapport au contenu
+TITLE_WEIGHT = 4.0
+
+FTS_TABLE = 'content_searchdocument_fts'
+
+
+# ==================== ANALYSE ====================
+
+STOPWORDS = {
+    'fr': set(
+        "a au aux avec ce ces dans de des du elle en et eux il ils je la le les leur lui ma mais me meme mes "
+        "moi mon ne nos notre nous on ou par pas pour qu que qui sa se ses son sur ta te tes toi ton tu un une "
+        "vos votre vous c d j l m n s t y est sont ete etre avoir a ai as avons avez ont cette cet"
+        .split()
+    ),
+    'en': set(
+        "a an and are as at be but by for from has have if in into is it its no not of on or such that the "
+        "their then there these they this to was were will with you your we our"
+        .split()
+    ),
+    'es': set(
+        "a al algo como con de del el ella ellos en entre era es esta este esto fue ha la las le les lo los mas "
+        "me mi mis muy no nos o para pero por que se sin sobre su sus te tu un una uno y ya"
+        .split()
+    ),
+}
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+FR_SUFFIXES = ('issement', 'ement', 'ation', 'ateur', 'atrice', 'ences', 'ances', 'ence', 'ance', 'ique', 'isme', 'iste', 'able', 'ible', 'euse', 'eur', 'ive', 'if', 'ee', 'er', 'e')
+EN_SUFFIXES = ('ing', 'ed')
+
+
+def _stem_fr(word):
+    if len(word) > 4 and word.endswith('aux'):
+        return word[:-3] + 'al'
+    if len(word) > 4 and word[-1] in 'sx':
+        word = word[:-1]
+    for suffix in FR_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def _stem_en(word):
+    if len(word) > 4 and word.endswith('ies') and not word.endswith(('eies', 'aies')):
+        word = word[:-3] + 'y'
+    elif len(word) > 3 and word.endswith('es') and not word.endswith(('aes', 'ees', 'oes')):
+        word = word[:-1]
+    elif len(word) > 3 and word.endswith('s') and not word.endswith(('us', 'ss')):
+        word = word[:-1]
+    for suffix in EN_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)]
+    return word
+
+
+def _stem_es(word):
+    if len(word) > 5 and word.endswith('ces'):
+        return word[:-3] + 'z'
+    if len(word) > 4 and word.endswith(('os', 'as', 'es')):
+        return word[:-2]
+    if len(word) > 3 and word[-1] in 'oae':
+        return word[:-1]
+    return word
+
+
+STEMMERS = {'fr': _stem_fr, 'en': _stem_en, 'es': _stem_es}
+
+
+def fold(text):
+    """Minuscules sans accents"""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def plain_text(text):
+    return ' '.join(strip_tags(text or '').split())
+
+
+def analyze(text, language):
+    """Termes indexés d'un texte : [terme racinisé, ...] dans l'ordre du texte"""
+    stopwords = STOPWORDS.get(language, ())
+    stem = STEMMERS.get(language, lambda word: word)
+    return [
+        stem(token) for token in TOKEN_RE.findall(fold(plain_text(text)))
+        if token not in stopwords
+    ]
+
+
+# ==================== DOCUMENTS ====================
+
+def _document(content_type, object_id, language, title, body, url):
+    body = plain_text(body)
+    return SearchDocument(
+        content_type=content_type,
+        object_id=object_id,
+        language=language,
+        title=plain_text(title)[:500],
+        excerpt=body[:EXCERPT_LENGTH],
+        url=url,
+        title_terms=' '.join(analyze(title, language)),
+        body_terms=' '.join(analyze(body, language)),
+    )
+
+
+def _join(*parts):
+    texts = []
+    for part in parts:
+        if isinstance(part, (list, tuple)):
+            texts.extend(str(item) for item in part if item)
+        elif part:
+            texts.append(str(part))
+    return '\n'.join(texts)
+
+
+def _page_documents(ids):
+    from .models_comprehensive_cms import SitePage
+
+    language = settings.DEFAULT_LANGUAGE
+    return [
+        _document('page', page.id, language, page.title, _join(page.description, page.meta_keywords), f'/pages/{page.slug}')
+        for page in SitePage.objects.filter(id__in=ids, is_active=True, is_public=True)
+    ]
+
+
+def _block_documents(ids):
+    from .models_comprehensive_cms import ContentBlock
+    from .models_translation import ContentBlockTranslation
+
+    language = settings.DEFAULT_LANGUAGE
+    blocks = {
+        block.id: block for block in ContentBlock.objects.filter(
+            id__in=ids, is_visible=True, page__is_active=True, page__is_public=True
+        ).select_related('page').only('id', 'block_key', 'title', 'content', 'page__slug')
+    }
+    translated = {}
+    for block_id, field, lang, text in ContentBlockTranslation.objects.filter(
+        content_block_id__in=list(blocks), field_name__in=('title', 'content')
+    ).exclude(language=language).values_list('content_block_id', 'field_name', 'language', 'translated_content'):
+        translated.setdefault((block_id, lang), {})[field] = text
+
+    documents = []
+    for block in blocks.values():
+        url = f'/pages/{block.page.slug}#{block.block_key}'
+        documents.append(_document('block', block.id, language, block.title or block.block_key, block.content, url))
+    for (block_id, lang), fields in translated.items():
+        block = blocks[block_id]
+        documents.append(_document(
+            'block', block_id, lang,
+            fields.get('title') or block.title or block.block_key,
+            fields.get('content', block.content),
+            f'/pages/{block.page.slug}#{block.block_key}'
+        ))
+    return documents
+
+
+def _faq_documents(ids):
+    from .models_comprehensive_cms import FAQItem
+
+    language = settings.DEFAULT_LANGUAGE
+    return [
+        _document('faq', faq.id, language, faq.question, _join(faq.answer, faq.keywords, faq.search_tags), f'/faq#{faq.id}')
+        for faq in FAQItem.objects.filter(id__in=ids, status='published')
+    ]
+
+
+def _offer_documents(ids):
+    from .models_comprehensive_cms import Offer
+
+    language = settings.DEFAULT_LANGUAGE
+    return [
+        _document(
+            'offer', offer.id, language, offer.name,
+            _join(offer.short_description, offer.description, offer.features, offer.benefits),
+            f'/offers/{offer.slug}'
+        )
+        for offer in Offer.objects.filter(id__in=ids, status='published')
+    ]
+
+
+DOCUMENT_BUILDERS = {
+    'page': _page_documents,
+    'block': _block_documents,
+    'faq': _faq_documents,
+    'offer': _offer_documents,
+}
+
+
+def index_objects(content_type, ids):
+    """
+    (Ré)indexer des objets : leurs documents sont remplacés par ceux des
+    objets encore visibles (les objets supprimés ou dépubliés sortent de l'index)
+    """
+    ids = list(ids)
+    if not ids:
+        return 0
+    documents = DOCUMENT_BUILDERS[content_type](ids)
+    with transaction.atomic():
+        SearchDocument.objects.filter(content_type=content_type, object_id__in=ids).delete()
+        SearchDocument.objects.bulk_create(documents)
+    return len(documents)
+
+
+def index_on_commit(content_type, ids):
+    ids = list(ids)
+    if ids:
+        transaction.on_commit(lambda: index_objects(content_type, ids))
+
+
+def rebuild_index(chunk_size=500):
+    """Reconstruire tout l'index ; retourne le nombre de documents par type"""
+    from .models_comprehensive_cms import ContentBlock, FAQItem, Offer, SitePage
+
+    models = {'page': SitePage, 'block': ContentBlock, 'faq': FAQItem, 'offer': Offer}
+    counts = {}
+    SearchDocument.objects.all().delete()
+    for content_type, model in models.items():
+        ids = list(model.objects.order_by('id').values_list('id', flat=True))
+        counts[content_type] = sum(
+            index_objects(content_type, ids[start:start + chunk_size])
+            for start in range(0, len(ids), chunk_size)
+        )
+    logger.info(f"🔎 Index de recherche reconstruit : {counts}")
+    return counts
+
+
+# ==================== REQUÊTES ====================
+
+def _fts_query(terms):
+    """Expression FTS5 : tous les termes"""
+    return ' '.join(f'"{term}"' for term in terms)
+
+
+def _tsquery(terms):
+    """Expression tsquery : tous les termes"""
+    return ' & '.join(terms)
+
+
+def _filters(language, content_types):
+    sql, params = ['d.language = %s'], [language]
+    if content_types:
+        sql.append(f"d.content_type IN ({', '.join(['%s'] * len(content_types))})")
+        params.extend(content_types)
+    return ' AND '.join(sql), params
+
+
+def _search_sqlite(terms, language, content_types, offset, limit):
+    where, params = _filters(language, content_types)
+    match = [_fts_query(terms)]
+    base = (
+        f"FROM {FTS_TABLE} JOIN content_searchdocument d ON d.id = {FTS_TABLE}.rowid "
+        f"WHERE {FTS_TABLE} MATCH %s AND {where}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) {base}", match + params)
+        total = cursor.fetchone()[0]
+        if not total or offset >= total:
+            return total, []
+        # bm25() est négatif : plus petit = plus pertinent
+        cursor.execute(
+            f"SELECT d.content_type, d.object_id, d.title, d.excerpt, d.url, "
+            f"-bm25({FTS_TABLE}, {TITLE_WEIGHT}, 1.0) AS score {base} "
+            f"ORDER BY score DESC, d.id LIMIT %s OFFSET %s",
+            match + params + [limit, offset]
+        )
+        return total, cursor.fetchall()
+
+
+def _search_postgresql(terms, language, content_types, offset, limit):
+    where, params = _filters(language, content_types)
+    query = [_tsquery(terms)]
+    base = "FROM content_searchdocument d, to_tsquery('simple', %s) q WHERE d.search_vector @@ q AND " + where
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) {base}", query + params)
+        total = cursor.fetchone()[0]
+        if not total or offset >= total:
+            return total, []
+        # Poids {D, C, B, A} : titre (A) = TITLE_WEIGHT x contenu (B) ;
+        # 1 | 32 : normalisation par la longueur du document, score ramené dans [0, 1[
+        cursor.execute(
+            f"SELECT d.content_type, d.object_id, d.title, d.excerpt, d.url, "
+            f"ts_rank_cd('{{0.1, 0.2, {1 / TITLE_WEIGHT}, 1.0}}', d.search_vector, q, 1 | 32) AS score {base} "
+            f"ORDER BY score DESC, d.id LIMIT %s OFFSET %s",
+            query + params + [limit, offset]
+        )
+        return total, cursor.fetchall()
+
+
+def _search_fallback(terms, language, content_types, offset, limit):
+    """Autres bases : filtrage sur les termes et score calculé en Python"""
+    documents = SearchDocument.objects.filter(language=language)
+    if content_types:
+        documents = documents.filter(content_type__in=content_types)
+    scored = []
+    for document in documents.iterator():
+        title, body = document.title_terms.split(), document.body_terms.split()
+        if not all(term in title or term in body for term in terms):
+            continue
+        score = sum(TITLE_WEIGHT * title.count(term) + body.count(term) for term in terms) / (1 + len(title) + len(body)) ** 0.5
+        scored.append((document.content_type, document.object_id, document.title, document.excerpt, document.url, score))
+    scored.sort(key=lambda row: -row[5])
+    return len(scored), scored[offset:offset + limit]
+
+
+SEARCH_BACKENDS = {
+    'sqlite': _search_sqlite,
+    'postgresql': _search_postgresql,
+}
+
+
+def search(query, language=None, content_types=None, page=1, page_size=SEARCH_PAGE_SIZE):
+    """
+    Rechercher dans l'index ; retourne (nombre total de résultats, résultats
+    de la page demandée par pertinence décroissante)
+    """
+    language = language if language in settings.SUPPORTED_LANGUAGES else settings.DEFAULT_LANGUAGE
+    terms = list(dict.fromkeys(analyze(query, language)))
+    if not terms:
+        return 0, []
+
+    backend = SEARCH_BACKENDS.get(connection.vendor, _search_fallback)
+    total, rows = backend(terms, language, content_types, (page - 1) * page_size, page_size)
+    return total, [
+        {
+            'content_type': content_type,
+            'id': object_id,
+            'title': title,
+            'content': excerpt,
+            'url': url,
+            'relevance_score': float(f'{score:.6g}')
+        }
+        for content_type, object_id, title, excerpt, url, score in rows
+    ]
+
+
+# Affichages des FAQ dans les résultats de recherche (écrits par lots)
+faq_views = BufferedCounter('content.FAQItem', 'views_count')
@@ -51,7 +51,7 @@ class ContentVersionSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = ContentVersion
-        fields = '__all__'
+        exclude = ['is_snapshot', 'delta']
         read_only_fields = ['created_at', 'created_by']
 
 class AdminPasswordSerializer(serializers.ModelSerializer):
@@ -132,6 +132,8 @@ class ContentPreviewSerializer(serializers.Serializer):
         child=serializers.DictField(),
         allow_empty=True
     )
+    incremental = serializers.BooleanField(default=False)
+    since = serializers.DateTimeField(required=False)
     
     def validate_page_id(self, value):
         try:
@@ -453,6 +453,22 @@ class ContentStatsSerializer(serializers.Serializer):
     draft_testimonials = serializers.IntegerField()
     draft_faq_items = serializers.IntegerField()
     draft_offers = serializers.IntegerField()
+    
+    archived_testimonials = serializers.IntegerField()
+    archived_faq_items = serializers.IntegerField()
+    archived_offers = serializers.IntegerField()
+    
+    visible_content_blocks = serializers.IntegerField()
+    hidden_content_blocks = serializers.IntegerField()
+
+
+class ContentEditDaySerializer(serializers.Serializer):
+    """Serializer pour l'activité éditoriale d'une journée"""
+    
+    date = serializers.DateField()
+    edits = serializers.IntegerField()
+    edited_blocks = serializers.IntegerField()
+    edited_sections = serializers.IntegerField()
 
 # ==================== SERIALIZERS POUR LES RECHERCHES ====================
 
@@ -0,0 +1,141 @@
+"""Signaux de l'application content"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from backend.versioned_cache import invalidate_tags
+from .cache_cms import (
+    invalidate_pages, section_page_tag, translation_tag,
+    TAG_CONTACT_FIELDS, TAG_FAQ, TAG_OFFERS, TAG_REVIEWS, TAG_SETTINGS, TAG_STATS, TAG_TESTIMONIALS,
+)
+from .models_cms import ContentSection, ContentVersion, Page
+from .models_comprehensive_cms import (
+    ComprehensiveContentVersion, ContactField, ContentBlock, FAQItem, GlobalSettings, Offer,
+    PageCategory, Review, SitePage, Testimonial,
+)
+from .models_translation import ContentBlockTranslation
+from .search_index import index_on_commit
+
+
+# Les invalidations ont lieu après le commit : une requête concurrente ne peut
+# pas remettre en cache l'état antérieur à la modification
+
+def _invalidate_on_commit(*tags):
+    transaction.on_commit(lambda: invalidate_tags(*tags))
+
+
+def _invalidate_pages_on_commit(page_ids):
+    slugs = list(SitePage.objects.filter(id__in=page_ids).values_list('slug', flat=True))
+    if slugs:
+        transaction.on_commit(lambda: invalidate_pages(*slugs))
+
+
+@receiver(post_init, sender=SitePage)
+def remember_page_slug(sender, instance, **kwargs):
+    instance._cached_slug = instance.slug
+
+
+@receiver(post_init, sender=ContentBlock)
+def remember_block_page(sender, instance, **kwargs):
+    instance._cached_page_id = instance.page_id
+
+
+@receiver([post_save, post_delete], sender=SitePage)
+def invalidate_page(sender, instance, **kwargs):
+    # Ancien et nouveau slug en cas de renommage
+    slugs = {instance.slug, getattr(instance, '_cached_slug', None)}
+    transaction.on_commit(lambda: invalidate_pages(*slugs))
+    instance._cached_slug = instance.slug
+    _invalidate_on_commit(TAG_STATS)
+    # Page et blocs (visibilité et URL dépendent de la page)
+    index_on_commit('page', [instance.pk])
+    if kwargs.get('signal') is post_save:
+        index_on_commit('block', ContentBlock.objects.filter(page_id=instance.pk).values_list('id', flat=True))
+
+
+@receiver([post_save, post_delete], sender=ContentBlock)
+def invalidate_block_page(sender, instance, **kwargs):
+    # Ancienne et nouvelle page si le bloc a été déplacé
+    _invalidate_pages_on_commit({instance.page_id, getattr(instance, '_cached_page_id', None)} - {None})
+    instance._cached_page_id = instance.page_id
+    _invalidate_on_commit(TAG_STATS)
+    index_on_commit('block', [instance.pk])
+
+
+@receiver([post_save, pre_delete], sender=PageCategory)
+def invalidate_category_pages(sender, instance, **kwargs):
+    # Le nom de la catégorie figure dans les pages (avant la suppression : les
+    # pages sont ensuite détachées par SET_NULL)
+    _invalidate_pages_on_commit(SitePage.objects.filter(category=instance).values('id'))
+
+
+@receiver([post_save, post_delete], sender=ComprehensiveContentVersion)
+def invalidate_version_page(sender, instance, **kwargs):
+    # Le nombre de versions figure dans les blocs publics
+    _invalidate_pages_on_commit(
+        ContentBlock.objects.filter(id=instance.content_block_id).values('page_id')
+    )
+    _invalidate_on_commit(TAG_STATS)
+
+
+@receiver([post_save, post_delete], sender=GlobalSettings)
+def invalidate_settings(sender, **kwargs):
+    _invalidate_on_commit(TAG_SETTINGS)
+
+
+@receiver([post_save, post_delete], sender=Testimonial)
+def invalidate_testimonials(sender, **kwargs):
+    _invalidate_on_commit(TAG_TESTIMONIALS)
+
+
+@receiver([post_save, post_delete], sender=FAQItem)
+def invalidate_faq(sender, instance, **kwargs):
+    _invalidate_on_commit(TAG_FAQ)
+    index_on_commit('faq', [instance.pk])
+
+
+@receiver([post_save, post_delete], sender=ContactField)
+def invalidate_contact_fields(sender, **kwargs):
+    _invalidate_on_commit(TAG_CONTACT_FIELDS)
+
+
+@receiver([post_save, post_delete], sender=Offer)
+def invalidate_offers(sender, instance, **kwargs):
+    _invalidate_on_commit(TAG_OFFERS)
+    index_on_commit('offer', [instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Review)
+def invalidate_reviews(sender, **kwargs):
+    _invalidate_on_commit(TAG_REVIEWS)
+
+
+@receiver([post_save, post_delete], sender=ContentBlockTranslation)
+def reindex_translated_block(sender, instance, **kwargs):
+    index_on_commit('block', [instance.content_block_id])
+    _invalidate_on_commit(translation_tag(instance.language))
+
+
+# ==================== CMS HISTORIQUE ====================
+
+@receiver(post_init, sender=ContentSection)
+def remember_section_page(sender, instance, **kwargs):
+    instance._cached_page_id = instance.page_id
+
+
+@receiver([post_save, post_delete], sender=Page)
+def invalidate_section_page(sender, instance, **kwargs):
+    _invalidate_on_commit(section_page_tag(instance.pk))
+
+
+@receiver([post_save, post_delete], sender=ContentSection)
+def invalidate_section(sender, instance, **kwargs):
+    page_ids = {instance.page_id, getattr(instance, '_cached_page_id', None)} - {None}
+    _invalidate_on_commit(*(section_page_tag(page_id) for page_id in page_ids))
+    instance._cached_page_id = instance.page_id
+
+
+@receiver([post_save, post_delete], sender=ContentVersion)
+def invalidate_section_version_stats(sender, **kwargs):
+    # Activité éditoriale du tableau de bord
+    _invalidate_on_commit(TAG_STATS)
@@ -0,0 +1,46 @@
+"""
+Tasks Celery du CMS
+"""
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def warm_page_bundles():
+    """
+    Régénérer les bundles des pages publiques après une publication
+    (les visiteurs ne paient pas la reconstruction)
+    """
+    from .public_cms import warm_page_bundles as warm
+
+    pages = warm()
+    return f"Warmed {pages} page bundles"
+
+
+@shared_task
+def backfill_translations(languages=None):
+    """
+    Traduire tous les champs de sections / blocs encore non traduits dans les
+    langues supportées (mémoire de traduction + DeepL par lots)
+    """
+    from .translation_engine import backfill_translations as backfill
+
+    results = backfill(languages=languages)
+    translated = sum(result['sections'] + result['blocks'] for result in results)
+    return f"Translated {translated} fields"
+
+
+@shared_task
+def compact_content_versions():
+    """
+    Appliquer la rétention aux versions de blocs et de sections et stocker
+    les versions conservées en deltas (voir versioning.py)
+    """
+    from .versioning import block_versions, section_versions
+
+    results = [store.compact() for store in (block_versions, section_versions)]
+    deleted = sum(result['deleted'] for result in results)
+    rewritten = sum(result['rewritten'] for result in results)
+    return f"Deleted {deleted} versions, rewrote {rewritten}"
@@ -1,3 +1,63 @@
+import threading
+
 from django.test import TestCase
 
-# Create your tests here.
+from content.management.commands.deepl_stub import make_stub_server
+from content.models_translation import TranslationMemory
+from content.translation_engine import MAX_TEXTS_PER_REQUEST, DeepLClient, TranslationEngine
+
+LANGUAGES = ('en', 'es')
+# Deux lots pleins et un lot partiel par langue
+TEXTS = [f"Texte {i}" for i in range(2 * MAX_TEXTS_PER_REQUEST + 10)]
+CHUNKS_PER_LANGUAGE = 3
+
+
+class DeepLStubTests(TestCase):
+    """Moteur de traduction contre le stub DeepL (management/commands/deepl_stub.py)"""
+
+    def engine(self, throttle_every=0):
+        server = make_stub_server(0, throttle_every=throttle_every)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f'http://127.0.0.1:{server.server_address[1]}/v2/translate'
+        client = DeepLClient(api_key='stub', api_url=url, rate=0)
+        return server, client, TranslationEngine(client)
+
+    def translate_all(self, engine):
+        return {language: engine.translate_many(TEXTS, language) for language in LANGUAGES}
+
+    def test_one_request_per_chunk_and_language(self):
+        server, client, engine = self.engine()
+
+        results = self.translate_all(engine)
+
+        self.assertEqual(client.stats['requests'], CHUNKS_PER_LANGUAGE * len(LANGUAGES))
+        self.assertEqual(server.stats['requests'], CHUNKS_PER_LANGUAGE * len(LANGUAGES))
+        self.assertEqual(server.stats['texts'], len(TEXTS) * len(LANGUAGES))
+        self.assertEqual(results['en'][0], '[EN-US] Texte 0')
+        self.assertEqual(results['es'][-1], f'[ES] {TEXTS[-1]}')
+
+    def test_second_run_is_served_from_translation_memory(self):
+        server, client, engine = self.engine()
+        first = self.translate_all(engine)
+        requests = server.stats['requests']
+
+        second = self.translate_all(engine)
+
+        self.assertEqual(second, first)
+        self.assertEqual(server.stats['requests'], requests)
+        self.assertEqual(TranslationMemory.objects.count(), len(TEXTS) * len(LANGUAGES))
+        self.assertEqual(set(TranslationMemory.objects.values_list('hits', flat=True)), {1})
+
+    def test_throttled_request_is_retried(self):
+        # Une requête sur deux reçoit 429 (Retry-After: 0) : chaque lot après le premier est repris une fois
+        server, client, engine = self.engine(throttle_every=2)
+
+        results = self.translate_all(engine)
+
+        chunks = CHUNKS_PER_LANGUAGE * len(LANGUAGES)
+        self.assertEqual(client.stats['retries'], chunks - 1)
+        self.assertEqual(client.stats['requests'], 2 * chunks - 1)
+        self.assertEqual(server.stats['texts'], len(TEXTS) * len(LANGUAGES))
+        self.assertEqual(len(results['en']), len(TEXTS))
@@ -0,0 +1,86 @@
+"""
+Couverture des traductions des sections CMS
+
+Calculée en requêtes ensemblistes (anti-jointures NOT EXISTS), quel que soit
+le nombre de sections et de langues :
+- une agrégation pour les compteurs de Translation
+- une agrégation pour les sections manquantes par langue
+- une requête (UNION des langues) pour la page de triplets manquants
+"""
+from django.conf import settings
+from django.db.models import Count, Exists, OuterRef, Q, Value, CharField
+
+from .models_cms import ContentSection, Translation
+
+DEFAULT_FIELD = 'content'
+
+
+def target_languages():
+    """Langues à couvrir : toutes sauf la langue par défaut (source)"""
+    return [code for code in settings.SUPPORTED_LANGUAGES if code != settings.DEFAULT_LANGUAGE]
+
+
+def _translated(language, field_name):
+    return Exists(Translation.objects.filter(
+        section=OuterRef('pk'), field_name=field_name, language=language
+    ))
+
+
+def _sections():
+    return ContentSection.objects.filter(is_visible=True)
+
+
+def translation_totals(languages):
+    """Compteurs globaux et par langue des traductions existantes (une requête)"""
+    aggregates = {
+        'total_translations': Count('id'),
+        'auto_generated': Count('id', filter=Q(is_auto_generated=True)),
+        'manual_overrides': Count('id', filter=Q(is_manual_override=True)),
+    }
+    for language in languages:
+        aggregates[f'count_{language}'] = Count('id', filter=Q(language=language))
+    return Translation.objects.aggregate(**aggregates)
+
+
+def coverage_by_language(languages, field_name=DEFAULT_FIELD):
+    """{langue: {'total', 'translated', 'missing', 'coverage'}} (une requête)"""
+    annotations = {f'has_{language}': _translated(language, field_name) for language in languages}
+    aggregates = {'total': Count('id')}
+    for language in languages:
+        aggregates[f'missing_{language}'] = Count('id', filter=Q(**{f'has_{language}': False}))
+    result = _sections().annotate(**annotations).aggregate(**aggregates)
+
+    total = result['total']
+    coverage = {}
+    for language in languages:
+        missing = result[f'missing_{language}']
+        coverage[language] = {
+            'total': total,
+            'translated': total - missing,
+            'missing': missing,
+            'coverage': round((total - missing) * 100 / total, 1) if total else 100.0,
+        }
+    return coverage
+
+
+def missing_translations(languages, field_name=DEFAULT_FIELD, offset=0, limit=100):
+    """Page de triplets (section, champ, langue) sans traduction (une requête)"""
+    if not languages:
+        return []
+    queries = [
+        _sections().filter(~_translated(language, field_name)).annotate(
+            language=Value(language, output_field=CharField())
+        ).values('id', 'section_key', 'language').order_by()
+        for language in languages
+    ]
+    union = queries[0].union(*queries[1:], all=True) if len(queries) > 1 else queries[0]
+    rows = union.order_by('section_key', 'language')[offset:offset + limit]
+    return [
+        {
+            'section_id': row['id'],
+            'section_key': row['section_key'],
+            'field_name': field_name,
+            'language': row['language'],
+        }
+        for row in rows
+    ]
@@ -0,0 +1,351 @@
+"""
+Moteur de traduction DeepL
+
+- mémoire de traduction persistante (TranslationMemory) indexée par
+  (sha256 du texte source, langue source, langue cible) : un texte déjà
+  traduit n'est jamais renvoyé à DeepL
+- plusieurs textes par appel DeepL (paramètre `text` répété, au plus
+  MAX_TEXTS_PER_REQUEST textes et MAX_REQUEST_BYTES octets par requête)
+- session HTTP partagée (connexions keep-alive réutilisées)
+- limitation du nombre de requêtes par seconde, partagée entre threads,
+  et reprise sur 429 / 5xx en respectant Retry-After
+- rattrapage (backfill) des champs non traduits des ContentSection et
+  ContentBlock pour toutes les langues de SUPPORTED_LANGUAGES, une langue
+  par thread
+"""
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+MAX_TEXTS_PER_REQUEST = 50
+MAX_REQUEST_BYTES = 100 * 1024
+REQUEST_TIMEOUT = (5, 30)
+MAX_ATTEMPTS = 4
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Champs traduits par le rattrapage
+SECTION_FIELDS = ('title', 'content')
+BLOCK_FIELDS = ('title', 'content')
+
+
+class DeepLError(Exception):
+    """Échec d'un appel DeepL après les reprises"""
+
+
+def source_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def deepl_language(code, source=False):
+    """Code DeepL d'une langue du site (les langues source n'ont pas de variante régionale)"""
+    deepl_code = settings.SUPPORTED_LANGUAGES.get(code, code.upper())
+    return deepl_code.split('-')[0] if source else deepl_code
+
+
+class RateLimiter:
+    """Au plus `rate` acquisitions par seconde, tous threads confondus"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+    def penalize(self, seconds):
+        """Décaler les prochains appels (Retry-After reçu)"""
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
+
+
+class DeepLClient:
+    """Appels HTTP à DeepL par lots sur une session partagée"""
+
+    def __init__(self, api_key=None, api_url=None, rate=None, pool_size=10):
+        self.api_key = settings.DEEPL_API_KEY if api_key is None else api_key
+        self.api_url = api_url or settings.DEEPL_API_URL
+        self.rate_limiter = RateLimiter(settings.DEEPL_MAX_REQUESTS_PER_SECOND if rate is None else rate)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # Compteurs partagés par les threads du rattrapage (une langue par thread)
+        self.stats = {'requests': 0, 'texts': 0, 'retries': 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            self.stats[name] += amount
+
+    def _batches(self, texts):
+        batch, size = [], 0
+        for text in texts:
+            length = len(text.encode('utf-8'))
+            if batch and (len(batch) >= MAX_TEXTS_PER_REQUEST or size + length > MAX_REQUEST_BYTES):
+                yield batch
+                batch, size = [], 0
+            batch.append(text)
+            size += length
+        if batch:
+            yield batch
+
+    def _post(self, data):
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            self.rate_limiter.acquire()
+            try:
+                response = self.session.post(
+                    self.api_url,
+                    data=data,
+                    headers={'Authorization': f'DeepL-Auth-Key {self.api_key}'},
+                    timeout=REQUEST_TIMEOUT,
+                )
+            except requests.exceptions.RequestException as e:
+                if attempt == MAX_ATTEMPTS:
+                    raise DeepLError(f"Erreur de requête DeepL : {e}")
+                delay = 2 ** attempt
+            else:
+                self._count('requests')
+                if response.status_code not in RETRY_STATUSES:
+                    if response.status_code >= 400:
+                        raise DeepLError(f"DeepL a répondu {response.status_code} : {response.text[:200]}")
+                    return response.json()
+                if attempt == MAX_ATTEMPTS:
+                    raise DeepLError(f"DeepL indisponible ({response.status_code})")
+                try:
+                    delay = float(response.headers.get('Retry-After', 2 ** attempt))
+                except ValueError:
+                    delay = 2 ** attempt
+            self._count('retries')
+            self.rate_limiter.penalize(delay)
+            logger.warning(f"⏳ DeepL : nouvelle tentative dans {delay:.0f}s ({attempt}/{MAX_ATTEMPTS})")
+
+    def translate(self, texts, target_language, source_language):
+        """Traduire une liste de textes ; retourne les traductions dans le même ordre"""
+        translated = []
+        for batch in self._batches(texts):
+            data = [
+                ('target_lang', deepl_language(target_language)),
+                ('source_lang', deepl_language(source_language, source=True)),
+                ('preserve_formatting', '1'),
+            ] + [('text', text) for text in batch]
+            result = self._post(data)
+            translations = result.get('translations', [])
+            if len(translations) != len(batch):
+                raise DeepLError(f"Réponse DeepL inattendue : {len(translations)} traductions pour {len(batch)} textes")
+            translated.extend(item['text'] for item in translations)
+            self._count('texts', len(batch))
+        return translated
+
+
+class TranslationEngine:
+    """Traductions servies par la mémoire, les textes inconnus traduits par lots"""
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = DeepLClient()
+        return self._client
+
+    def translate_many(self, texts, target_language, source_language='fr'):
+        """
+        Traduire des textes (doublons et textes vides compris) ; retourne la
+        liste des traductions dans l'ordre. Lève DeepLError si DeepL échoue.
+        """
+        from .models_translation import TranslationMemory
+
+        if target_language == source_language:
+            return list(texts)
+
+        hashes = {text: source_hash(text) for text in texts if text and text.strip()}
+        known = {
+            entry.source_hash: entry.translated_text
+            for entry in TranslationMemory.objects.filter(
+                source_hash__in=set(hashes.values()),
+                source_language=source_language,
+                target_language=target_language,
+            ).only('source_hash', 'translated_text')
+        }
+        if known:
+            TranslationMemory.objects.filter(
+                source_hash__in=list(known),
+                source_language=source_language,
+                target_language=target_language,
+            ).update(hits=F('hits') + 1, last_used_at=timezone.now())
+
+        missing = list({text: None for text, digest in hashes.items() if digest not in known})
+        if missing:
+            translated = self.client.translate(missing, target_language, source_language)
+            TranslationMemory.objects.bulk_create([
+                TranslationMemory(
+                    source_hash=hashes[text],
+                    source_language=source_language,
+                    target_language=target_language,
+                    source_text=text,
+                    translated_text=result,
+                )
+                for text, result in zip(missing, translated)
+            ], ignore_conflicts=True)
+            for text, result in zip(missing, translated):
+                known[hashes[text]] = result
+
+        return [known[hashes[text]] if text in hashes else text for text in texts]
+
+    def translate(self, text, target_language, source_language='fr'):
+        return self.translate_many([text], target_language, source_language)[0]
+
+
+translation_engine = TranslationEngine()
+
+
+# ==================== RATTRAPAGE ====================
+
+def _section_jobs(language, source_language):
+    """Champs de ContentSection sans traduction dans `language` : [(section_id, champ, texte)]"""
+    from .models_cms import ContentSection, Translation
+
+    done = set(Translation.objects.filter(language=language).values_list('section_id', 'field_name'))
+    jobs = []
+    for section in ContentSection.objects.only('id', *SECTION_FIELDS):
+        for field in SECTION_FIELDS:
+            text = getattr(section, field)
+            if text and text.strip() and (section.id, field) not in done:
+                jobs.append((section.id, field, text))
+    return jobs
+
+
+def _block_jobs(language, source_language):
+    """
+    Champs de ContentBlock sans traduction dans `language`, ou dont le texte
+    source a changé depuis la traduction automatique
+    """
+    from .models_comprehensive_cms import ContentBlock
+    from .models_translation import ContentBlockTranslation
+
+    existing = {
+        (block_id, field): (digest, manual)
+        for block_id, field, digest, manual in ContentBlockTranslation.objects.filter(
+            language=language
+        ).values_list('content_block_id', 'field_name', 'source_hash', 'is_manual_override')
+    }
+    jobs = []
+    for block in ContentBlock.objects.only('id', *BLOCK_FIELDS):
+        for field in BLOCK_FIELDS:
+            text = getattr(block, field)
+            if not text or not text.strip():
+                continue
+            current = existing.get((block.id, field))
+            if current is None or (not current[1] and current[0] != source_hash(text)):
+                jobs.append((block.id, field, text))
+    return jobs
+
+
+def _save_section_translations(jobs, translations, language):
+    from .models_cms import Translation
+
+    Translation.objects.bulk_create([
+        Translation(
+            section_id=section_id,
+            field_name=field,
+            language=language,
+            translated_content=translated,
+            is_auto_generated=True,
+            is_manual_override=False,
+        )
+        for (section_id, field, _), translated in zip(jobs, translations)
+    ], ignore_conflicts=True)
+
+
+def _save_block_translations(jobs, translations, language):
+    from .models_translation import ContentBlockTranslation
+
+    ContentBlockTranslation.objects.bulk_create(
+        [
+            ContentBlockTranslation(
+                content_block_id=block_id,
+                field_name=field,
+                language=language,
+                translated_content=translated,
+                source_hash=source_hash(text),
+                is_auto_generated=True,
+                is_manual_override=False,
+            )
+            for (block_id, field, text), translated in zip(jobs, translations)
+        ],
+        update_conflicts=True,
+        unique_fields=['content_block', 'field_name', 'language'],
+        update_fields=['translated_content', 'source_hash', 'is_auto_generated', 'updated_at'],
+    )
+    # bulk_create n'envoie pas post_save : invalider les pages servies dans cette langue
+    from backend.versioned_cache import invalidate_tags
+    from .cache_cms import translation_tag
+
+    invalidate_tags(translation_tag(language))
+
+
+def _backfill_language(engine, language, source_language, chunk_size):
+    counts = {'language': language, 'sections': 0, 'blocks': 0, 'errors': 0}
+    try:
+        for kind, find, save in (
+            ('sections', _section_jobs, _save_section_translations),
+            ('blocks', _block_jobs, _save_block_translations),
+        ):
+            jobs = find(language, source_language)
+            for start in range(0, len(jobs), chunk_size):
+                chunk = jobs[start:start + chunk_size]
+                try:
+                    translations = engine.translate_many([text for _, _, text in chunk], language, source_language)
+                except DeepLError as e:
+                    counts['errors'] += len(chunk)
+                    logger.error(f"❌ Rattrapage {language} : {e}")
+                    continue
+                save(chunk, translations, language)
+                counts[kind] += len(chunk)
+    finally:
+        # Chaque thread a sa propre connexion à la base
+        connection.close()
+    logger.info(f"🌐 Rattrapage {language} : {counts}")
+    return counts
+
+
+def backfill_translations(languages=None, source_language=None, engine=None, chunk_size=200):
+    """
+    Traduire tous les champs non traduits des sections et blocs dans les
+    langues demandées (par défaut toutes les langues sauf la langue source),
+    une langue par thread ; le débit DeepL est limité par le client partagé
+    """
+    source_language = source_language or settings.DEFAULT_LANGUAGE
+    languages = [
+        code for code in (languages or settings.SUPPORTED_LANGUAGES) if code != source_language
+    ]
+    engine = engine or translation_engine
+    if not languages:
+        return []
+
+    with ThreadPoolExecutor(max_workers=len(languages)) as pool:
+        futures = [
+            pool.submit(_backfill_language, engine, language, source_language, chunk_size)
+            for language in languages
+        ]
+        return [future.result() for future in futures]
@@ -65,6 +65,7 @@ urlpatterns = [
     # ==================== API PUBLIQUE ====================
     path('public/pages/<str:page_slug>/', views_comprehensive_cms.get_page_content_public, name='public-page-content'),
     path('public/pages/<str:page_slug>/content-blocks/', views_comprehensive_cms.get_page_content_blocks_public, name='public-page-content-blocks'),
+    path('public/pages/<str:page_slug>/bundle/', views_comprehensive_cms.get_page_bundle_public, name='public-page-bundle'),
     path('public/global-settings/', views_comprehensive_cms.get_global_settings_public, name='public-global-settings'),
     path('public/testimonials/', views_comprehensive_cms.get_testimonials_public, name='public-testimonials'),
     path('public/faq/', views_comprehensive_cms.get_faq_public, name='public-faq'),
@@ -76,6 +77,7 @@ urlpatterns = [
     
     # ==================== STATISTIQUES ====================
     path('stats/', views_comprehensive_cms.get_content_stats, name='content-stats'),
+    path('stats/edits/', views_comprehensive_cms.get_content_edit_stats, name='content-edit-stats'),
     
     # ==================== AVIS CLIENTS ====================
     path('reviews/', views_comprehensive_cms.ReviewListView.as_view(), name='reviews'),
@@ -0,0 +1,336 @@
+"""
+Stockage des versions de contenu (blocs du CMS complet, sections du CMS
+historique)
+
+Chaque version représente l'état (titre, contenu, métadonnées) d'un bloc à
+un instant. Elle est stockée :
+- en copie complète (is_snapshot) : la première version, puis au plus toutes
+  les SNAPSHOT_INTERVAL versions, ou quand le delta ne ferait pas gagner de
+  place
+- sinon en delta par rapport à la version stockée précédente : titre et
+  métadonnées recopiés s'ils ont changé, contenu en opérations mot à mot
+  (copier n mots, sauter n mots, insérer un texte)
+
+Reconstruire une version lit, en une requête, la copie complète la plus
+proche puis au plus SNAPSHOT_INTERVAL deltas.
+
+Rétention (compaction) : les KEEP_RECENT versions les plus récentes, la
+dernière version de chaque jour sur DAILY_DAYS jours et de chaque semaine
+sur WEEKLY_WEEKS semaines sont conservées ; les autres sont supprimées et
+la chaîne des versions conservées est réencodée (les anciennes copies
+complètes deviennent des deltas).
+"""
+import json
+import logging
+import re
+from datetime import timedelta
+from difflib import SequenceMatcher
+
+from django.db import transaction
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.utils import timezone
+
+from backend.versioned_cache import invalidate_tags
+from .cache_cms import TAG_STATS, invalidate_pages
+from .models_cms import ContentVersion
+from .models_comprehensive_cms import ComprehensiveContentVersion, SitePage
+
+logger = logging.getLogger(__name__)
+
+TRACKED_FIELDS = ('title', 'content', 'metadata')
+SNAPSHOT_INTERVAL = 20
+# Un delta plus gros que cette fraction de la copie complète n'est pas gardé
+MAX_DELTA_RATIO = 0.5
+
+KEEP_RECENT = 50
+DAILY_DAYS = 30
+WEEKLY_WEEKS = 52
+
+TOKEN_RE = re.compile(r'\S+\s*|\s+')
+
+
+# ==================== DELTAS ====================
+
+def _tokens(text):
+    return TOKEN_RE.findall(text or '')
+
+
+def diff_text(base, text):
+    """
+    Opérations transformant `base` en `text` : entier positif = copier n mots,
+    négatif = sauter n mots, chaîne = insérer
+    """
+    a, b = _tokens(base), _tokens(text)
+    # Préfixe et suffixe communs retirés avant la comparaison (édition locale)
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(a) - start and end < len(b) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+
+    ops = [start] if start else []
+    middle_a, middle_b = a[start:len(a) - end], b[start:len(b) - end]
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, middle_a, middle_b, autojunk=False).get_opcodes():
+        if tag == 'equal':
+            ops.append(i2 - i1)
+            continue
+        if i2 > i1:
+            ops.append(-(i2 - i1))
+        if j2 > j1:
+            ops.append(''.join(middle_b[j1:j2]))
+    if end:
+        ops.append(end)
+    return ops
+
+
+def patch_text(base, ops):
+    tokens, position, parts = _tokens(base), 0, []
+    for op in ops:
+        if isinstance(op, str):
+            parts.append(op)
+        elif op > 0:
+            parts.append(''.join(tokens[position:position + op]))
+            position += op
+        else:
+            position -= op
+    return ''.join(parts)
+
+
+def encode_delta(base, state):
+    """Delta de l'état `base` vers `state` (champs inchangés omis)"""
+    delta = {}
+    if state['title'] != base['title']:
+        delta['title'] = state['title']
+    if state['metadata'] != base['metadata']:
+        delta['metadata'] = state['metadata']
+    if state['content'] != base['content']:
+        delta['content'] = diff_text(base['content'], state['content'])
+    return delta
+
+
+def apply_delta(base, delta):
+    return {
+        'title': delta.get('title', base['title']),
+        'content': patch_text(base['content'], delta['content']) if 'content' in delta else base['content'],
+        'metadata': delta.get('metadata', base['metadata']),
+    }
+
+
+def _size(value):
+    return len(json.dumps(value, ensure_ascii=False))
+
+
+def _store(version, state, base=None, chain_length=0):
+    """
+    Renseigner le stockage de `version` (état `state`) : delta par rapport à
+    `base`, ou copie complète. Retourne la longueur de chaîne résultante.
+    """
+    if base is not None and chain_length < SNAPSHOT_INTERVAL:
+        delta = encode_delta(base, state)
+        if _size(delta) <= MAX_DELTA_RATIO * _size(state):
+            version.is_snapshot = False
+            version.delta = delta
+            version.title, version.content, version.metadata = '', '', {}
+            return chain_length + 1
+    version.is_snapshot = True
+    version.delta = None
+    version.title, version.content, version.metadata = state['title'], state['content'], state['metadata']
+    return 0
+
+
+def materialize(versions):
+    """
+    États des versions d'un même bloc, triées par numéro et commençant par une
+    copie complète ; les champs title / content / metadata des deltas sont
+    renseignés en mémoire. Retourne la liste des états.
+    """
+    states, state = [], None
+    for version in versions:
+        if version.is_snapshot or state is None:
+            state = {field: getattr(version, field) for field in TRACKED_FIELDS}
+        else:
+            state = apply_delta(state, version.delta or {})
+            version.title, version.content, version.metadata = state['title'], state['content'], state['metadata']
+        states.append(state)
+    return states
+
+
+# ==================== STOCKAGE ====================
+
+class VersionStore:
+    """
+    Versions d'un modèle (`model`) rattachées à leur objet par `parent_field` ;
+    `on_pruned(parent_ids)` est appelé après la suppression de versions
+    """
+
+    def __init__(self, model, parent_field, on_pruned=None):
+        self.model = model
+        self.parent_field = parent_field
+        self.parent_id = f"{parent_field}_id"
+        self.on_pruned = on_pruned
+
+    def _chains(self, parent_ids, up_to=None):
+        """
+        Versions depuis la dernière copie complète (jusqu'au numéro `up_to`)
+        de chaque objet, en une requête : {parent_id: [versions triées]}
+        """
+        snapshots = self.model.objects.filter(**{self.parent_id: OuterRef(self.parent_id)}, is_snapshot=True)
+        versions = self.model.objects.filter(**{f"{self.parent_id}__in": parent_ids})
+        if up_to is not None:
+            snapshots = snapshots.filter(version_number__lte=up_to)
+            versions = versions.filter(version_number__lte=up_to)
+        last_snapshot = snapshots.order_by('-version_number').values('version_number')[:1]
+        chains = {}
+        for version in versions.filter(version_number__gte=Subquery(last_snapshot)).order_by('version_number'):
+            chains.setdefault(getattr(version, self.parent_id), []).append(version)
+        return chains
+
+    def reconstruct(self, version):
+        """État complet d'une version"""
+        if version.is_snapshot:
+            return {field: getattr(version, field) for field in TRACKED_FIELDS}
+        chain = self._chains([getattr(version, self.parent_id)], up_to=version.version_number)
+        return materialize(chain[getattr(version, self.parent_id)])[-1]
+
+    def build(self, entries, user):
+        """
+        Nouvelles versions (non enregistrées) pour [(objet, état, résumé)] :
+        numéro suivant et stockage en delta par rapport à la dernière version
+        de chaque objet ; deux requêtes quel que soit le nombre d'objets
+        """
+        parent_ids = [parent.pk for parent, _, _ in entries]
+        chains = self._chains(parent_ids)
+        # Objets sans copie complète (aucune version) : numéro courant éventuel
+        numbers = dict(
+            self.model.objects.filter(**{f"{self.parent_id}__in": [pk for pk in parent_ids if pk not in chains]})
+            .values(self.parent_id).annotate(last=Max('version_number')).values_list(self.parent_id, 'last')
+        )
+        versions = []
+        for parent, state, summary in entries:
+            chain = chains.get(parent.pk)
+            version = self.model(
+                **{self.parent_field: parent},
+                version_number=(chain[-1].version_number if chain else numbers.get(parent.pk, 0)) + 1,
+                change_summary=summary[:500],
+                created_by=user,
+            )
+            if chain:
+                _store(version, state, base=materialize(chain)[-1], chain_length=len(chain) - 1)
+            else:
+                _store(version, state)
+            versions.append(version)
+        return versions
+
+    def create(self, parent, state, summary, user):
+        """Enregistrer une version (signaux déclenchés)"""
+        version = self.build([(parent, state, summary)], user)[0]
+        version.save()
+        return version
+
+    def history(self, parent_id):
+        """Toutes les versions d'un objet, état reconstruit, de la plus récente à la plus ancienne"""
+        versions = list(
+            self.model.objects.filter(**{self.parent_id: parent_id}).select_related('created_by').order_by('version_number')
+        )
+        materialize(versions)
+        return versions[::-1]
+
+    # ==================== COMPACTION ====================
+
+    def compact_parent(self, parent_id, now=None, keep_recent=KEEP_RECENT, daily_days=DAILY_DAYS, weekly_weeks=WEEKLY_WEEKS, dry_run=False):
+        """Appliquer la rétention aux versions d'un objet et réencoder la chaîne conservée"""
+        now = now or timezone.now()
+        with transaction.atomic():
+            versions = list(
+                self.model.objects.select_for_update().filter(**{self.parent_id: parent_id}).order_by('version_number')
+            )
+            if not versions:
+                return {'deleted': 0, 'rewritten': 0, 'bytes_before': 0, 'bytes_after': 0}
+            bytes_before = sum(_stored_size(version) for version in versions)
+            states = materialize(versions)
+
+            keep = {version.pk for version in versions[-keep_recent:]} if keep_recent else set()
+            days, weeks = {}, {}
+            for version in versions:
+                created = timezone.localtime(version.created_at)
+                if daily_days and created >= now - timedelta(days=daily_days):
+                    days[created.date()] = version.pk
+                if weekly_weeks and created >= now - timedelta(weeks=weekly_weeks):
+                    weeks[created.isocalendar()[:2]] = version.pk
+            keep.update(days.values(), weeks.values())
+
+            kept, removed = [], []
+            for version, state in zip(versions, states):
+                (kept if version.pk in keep else removed).append((version, state))
+
+            changed, base, chain_length = [], None, 0
+            for version, state in kept:
+                stored = (version.is_snapshot, version.delta, version.title, version.content, version.metadata)
+                # États matérialisés : comparer au stockage d'origine
+                if not version.is_snapshot:
+                    stored = (False, version.delta, '', '', {})
+                chain_length = _store(version, state, base=base, chain_length=chain_length)
+                if (version.is_snapshot, version.delta, version.title, version.content, version.metadata) != stored:
+                    changed.append(version)
+                base = state
+
+            bytes_after = sum(_stored_size(version) for version, _ in kept)
+            if not dry_run:
+                if removed:
+                    # Suppression directe : les signaux par version (invalidation
+                    # de la page) seraient envoyés pour chaque ligne
+                    self.model.objects.filter(pk__in=[version.pk for version, _ in removed])._raw_delete(self.model.objects.db)
+                if changed:
+                    self.model.objects.bulk_update(changed, ['is_snapshot', 'delta', 'title', 'content', 'metadata'], batch_size=200)
+        return {
+            'deleted': len(removed), 'rewritten': len(changed),
+            'bytes_before': bytes_before, 'bytes_after': bytes_after,
+        }
+
+    def compact(self, dry_run=False, **policy):
+        """Compacter les versions de tous les objets qui en ont plusieurs"""
+        totals = {'objects': 0, 'deleted': 0, 'rewritten': 0, 'bytes_before': 0, 'bytes_after': 0}
+        parent_ids = (
+            self.model.objects.values(self.parent_id).annotate(count=Count('id'))
+            .filter(count__gt=1).values_list(self.parent_id, flat=True)
+        )
+        pruned = []
+        for parent_id in list(parent_ids):
+            result = self.compact_parent(parent_id, dry_run=dry_run, **policy)
+            totals['objects'] += 1
+            for key, value in result.items():
+                totals[key] += value
+            if result['deleted']:
+                pruned.append(parent_id)
+        if pruned and self.on_pruned and not dry_run:
+            self.on_pruned(pruned)
+        logger.info(f"🗜️ Versions {self.model.__name__} compactées : {totals}")
+        return totals
+
+
+def _stored_size(version):
+    if version.is_snapshot:
+        return len(version.title or '') + len(version.content or '') + _size(version.metadata)
+    return _size(version.delta)
+
+
+def state_of(instance):
+    """État suivi d'un bloc / d'une section"""
+    return {field: getattr(instance, field) for field in TRACKED_FIELDS}
+
+
+def _invalidate_block_pages(block_ids):
+    # Le nombre de versions figure dans les blocs publics
+    slugs = SitePage.objects.filter(content_blocks__id__in=block_ids).values_list('slug', flat=True).distinct()
+    invalidate_pages(*slugs)
+    _invalidate_stats(block_ids)
+
+
+def _invalidate_stats(parent_ids):
+    # L'activité éditoriale du tableau de bord est lue dans les versions
+    invalidate_tags(TAG_STATS)
+
+
+block_versions = VersionStore(ComprehensiveContentVersion, 'content_block', on_pruned=_invalidate_block_pages)
+section_versions = VersionStore(ContentVersion, 'section', on_pruned=_invalidate_stats)
@@ -24,9 +24,17 @@ from .serializers_translation import (
     TranslationBulkCreateSerializer, TranslationListSerializer, TranslationStatsSerializer
 )
 from .deepl_service import deepl_service
+from .preview import preview_sections
+from .versioning import section_versions, state_of
+from .translation_coverage import (
+    DEFAULT_FIELD, target_languages, translation_totals, coverage_by_language, missing_translations
+)
 
 User = get_user_model()
 
+MISSING_PAGE_SIZE = 100
+MISSING_MAX_PAGE_SIZE = 500
+
 # Pages
 class PageListView(generics.ListCreateAPIView):
     queryset = Page.objects.all()
@@ -69,8 +77,8 @@ class ContentVersionListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        section_id = self.kwargs.get('section_id')
-        return ContentVersion.objects.filter(section_id=section_id)
+        # Versions reconstruites (copies complètes et deltas), la plus récente en premier
+        return section_versions.history(self.kwargs.get('section_id'))
 
 # Gestion du mot de passe admin
 class AdminPasswordView(generics.RetrieveUpdateAPIView):
@@ -259,23 +267,13 @@ def bulk_update_content(request):
             for change_data in changes_data:
                 section = get_object_or_404(ContentSection, id=change_data['section_id'])
                 
-                # Créer une version avant modification
-                current_version = ContentVersion.objects.filter(
-                    section=section
-                ).order_by('-version_number').first()
-                
-                new_version_number = (current_version.version_number + 1) if current_version else 1
-                
-                # Sauvegarder l'ancienne version
-                if current_version:
-                    ContentVersion.objects.create(
-                        section=section,
-                        title=section.title,
-                        content=section.content,
-                        metadata=section.metadata,
-                        version_number=new_version_number,
-                        change_summary=f"Modification de {change_data['field_name']}",
-                        created_by=request.user
+                # Sauvegarder l'ancienne version (si la section est déjà versionnée)
+                if ContentVersion.objects.filter(section=section).exists():
+                    section_versions.create(
+                        section,
+                        state_of(section),
+                        f"Modification de {change_data['field_name']}",
+                        request.user
                     )
                 
                 # Appliquer le changement
@@ -341,42 +339,12 @@ def preview_content(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     page = get_object_or_404(Page, id=serializer.validated_data['page_id'])
-    sections = ContentSection.objects.filter(page=page, is_visible=True).order_by('order')
-    
-    # Appliquer les changements en attente
-    session = ContentEditSession.objects.filter(
-        user=request.user,
-        is_active=True
-    ).first()
-    
-    preview_sections = []
-    for section in sections:
-        section_data = {
-            'id': section.id,
-            'section_key': section.section_key,
-            'content_type': section.content_type,
-            'title': section.title,
-            'content': section.content,
-            'metadata': section.metadata,
-            'order': section.order
-        }
-        
-        # Appliquer les changements en attente
-        if session:
-            pending_changes = ContentChange.objects.filter(
-                session=session,
-                section=section
-            )
-            for change in pending_changes:
-                if change.change_type == 'update':
-                    section_data[change.field_name] = change.new_value
-        
-        preview_sections.append(section_data)
-    
-    return Response({
-        'page': PageSerializer(page).data,
-        'sections': preview_sections
-    })
+    return Response(preview_sections(
+        page,
+        request.user,
+        incremental=serializer.validated_data['incremental'],
+        since=serializer.validated_data.get('since')
+    ))
 
 @api_view(['GET'])
 def get_page_content(request, page_slug):
@@ -529,45 +497,45 @@ def get_translation_stats(request):
             status=status.HTTP_403_FORBIDDEN
         )
     
-    total_translations = Translation.objects.count()
-    auto_generated = Translation.objects.filter(is_auto_generated=True).count()
-    manual_overrides = Translation.objects.filter(is_manual_override=True).count()
+    # Couverture calculée en requêtes ensemblistes (nombre de requêtes constant)
+    languages = target_languages()
+    available_languages = deepl_service.get_available_languages()
+    field_name = request.GET.get('field', DEFAULT_FIELD)
+    
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+        page_size = min(max(int(request.GET.get('page_size', MISSING_PAGE_SIZE)), 1), MISSING_MAX_PAGE_SIZE)
+    except ValueError:
+        return Response({'error': 'Pagination invalide'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    totals = translation_totals(languages)
+    coverage = coverage_by_language(languages, field_name)
     
     # Statistiques par langue
     by_language = {}
-    for lang_code, lang_name in deepl_service.get_available_languages().items():
+    for lang_code in languages:
         by_language[lang_code] = {
-            'name': lang_name,
-            'count': Translation.objects.filter(language=lang_code).count()
+            'name': available_languages.get(lang_code, lang_code),
+            'count': totals[f'count_{lang_code}'],
+            **coverage[lang_code]
         }
     
-    # Traductions manquantes
-    missing_translations = []
-    sections = ContentSection.objects.filter(is_visible=True)
-    available_languages = list(deepl_service.get_available_languages().keys())
-    
-    for section in sections:
-        for lang in available_languages:
-            if lang != 'fr':  # Français est la langue par défaut
-                has_translation = Translation.objects.filter(
-                    section=section,
-                    field_name='content',
-                    language=lang
-                ).exists()
-                
-                if not has_translation:
-                    missing_translations.append({
-                        'section_id': section.id,
-                        'section_key': section.section_key,
-                        'language': lang
-                    })
+    # Traductions manquantes (paginées)
+    total_missing = sum(item['missing'] for item in coverage.values())
+    missing = missing_translations(languages, field_name, offset=(page - 1) * page_size, limit=page_size)
     
     return Response({
-        'total_translations': total_translations,
-        'auto_generated': auto_generated,
-        'manual_overrides': manual_overrides,
+        'total_translations': totals['total_translations'],
+        'auto_generated': totals['auto_generated'],
+        'manual_overrides': totals['manual_overrides'],
         'by_language': by_language,
-        'missing_translations': missing_translations
+        'missing_translations': missing,
+        'missing_pagination': {
+            'page': page,
+            'page_size': page_size,
+            'total': total_missing,
+            'has_more': page * page_size < total_missing
+        }
     })
 
 @api_view(['POST'])
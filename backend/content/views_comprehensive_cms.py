@@ -7,8 +7,25 @@ from django.db import transaction
 from django.db.models import Q, Count
 from django.core.paginator import Paginator
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 import logging
 
+from backend.versioned_cache import invalidate_tags
+from .cache_cms import (
+    cms_response,
+    TAG_CONTACT_FIELDS, TAG_FAQ, TAG_OFFERS, TAG_REVIEWS, TAG_SETTINGS, TAG_TESTIMONIALS,
+)
+from .public_cms import (
+    BUNDLE_SECTIONS, bundle_key, bundle_tags, build_page_bundle, build_page_content, build_global_settings,
+    build_testimonials, build_faq, build_offers, build_contact_fields, build_reviews,
+    page_key, page_tags, public_language, schedule_bundle_warmup, translate_blocks,
+)
+from .changesets import apply_change_set
+from .preview import preview_page
+from .versioning import block_versions, state_of
+from .content_stats import EDITS_DEFAULT_DAYS, content_stats, edit_series
+from .search_index import DOCUMENT_BUILDERS, SEARCH_MAX_PAGE_SIZE, SEARCH_PAGE_SIZE, faq_views, search
+
 from .models_comprehensive_cms import (
     GlobalSettings, PageCategory, SitePage, ContentBlock, ComprehensiveContentVersion,
     Testimonial, FAQItem, Offer, ComprehensiveEditSession, ComprehensivePendingChange, Review, ContactField
@@ -56,7 +73,7 @@ from .serializers_comprehensive_cms import (
     PublicFAQItemSerializer, PublicOfferSerializer,
     
     # Stats
-    ContentStatsSerializer, FAQSearchSerializer, ContentSearchSerializer
+    ContentStatsSerializer, ContentEditDaySerializer, FAQSearchSerializer, ContentSearchSerializer
 )
 
 logger = logging.getLogger(__name__)
@@ -75,9 +92,7 @@ class GlobalSettingsView(generics.RetrieveUpdateAPIView):
 @permission_classes([permissions.AllowAny])
 def get_global_settings_public(request):
     """Récupérer les paramètres globaux pour l'affichage public"""
-    settings = GlobalSettings.get_settings()
-    serializer = GlobalSettingsSerializer(settings)
-    return Response(serializer.data)
+    return cms_response(request, 'settings', [TAG_SETTINGS], build_global_settings)
 
 # ==================== CATÉGORIES DE PAGES ====================
 
@@ -172,8 +187,8 @@ class ComprehensiveContentVersionListView(generics.ListAPIView):
     permission_classes = [IsAdminUser]
     
     def get_queryset(self):
-        block_id = self.kwargs.get('block_id')
-        return ComprehensiveContentVersion.objects.filter(content_block_id=block_id).select_related('created_by')
+        # Versions reconstruites (copies complètes et deltas), la plus récente en premier
+        return block_versions.history(self.kwargs.get('block_id'))
 
 @api_view(['POST'])
 @permission_classes([IsAdminUser])
@@ -182,31 +197,23 @@ def restore_content_version(request, version_id):
     try:
         version = get_object_or_404(ComprehensiveContentVersion, id=version_id)
         content_block = version.content_block
-        
-        # Créer une nouvelle version avant restauration
-        current_version = ComprehensiveContentVersion.objects.filter(
-            content_block=content_block
-        ).order_by('-version_number').first()
-        
-        new_version_number = (current_version.version_number + 1) if current_version else 1
+        restored = block_versions.reconstruct(version)
         
         # Sauvegarder l'état actuel
-        ComprehensiveContentVersion.objects.create(
-            content_block=content_block,
-            title=content_block.title,
-            content=content_block.content,
-            metadata=content_block.metadata,
-            version_number=new_version_number,
-            change_summary=f"Sauvegarde avant restauration de la version {version.version_number}",
-            created_by=request.user
+        block_versions.create(
+            content_block,
+            state_of(content_block),
+            f"Sauvegarde avant restauration de la version {version.version_number}",
+            request.user
         )
         
         # Restaurer la version
-        content_block.title = version.title
-        content_block.content = version.content
-        content_block.metadata = version.metadata
+        content_block.title = restored['title']
+        content_block.content = restored['content']
+        content_block.metadata = restored['metadata']
         content_block.updated_by = request.user
         content_block.save()
+        schedule_bundle_warmup()
         
         return Response({
             'message': f'Version {version.version_number} restaurée avec succès',
@@ -405,44 +412,28 @@ def apply_comprehensive_pending_changes(request):
     
     try:
         with transaction.atomic():
-            changes = ComprehensivePendingChange.objects.filter(session=session)
-            applied_changes = []
+            # Plus ancien d'abord : la dernière modification d'un champ l'emporte
+            changes = list(ComprehensivePendingChange.objects.filter(
+                session=session
+            ).order_by('created_at', 'id'))
             
+            # Regrouper par bloc : une version et une mise à jour par bloc
+            change_set = {}
+            applied_changes = []
             for change in changes:
-                content_block = change.content_block
-                
-                # Créer une version avant modification
-                current_version = ComprehensiveContentVersion.objects.filter(
-                    content_block=content_block
-                ).order_by('-version_number').first()
-                
-                new_version_number = (current_version.version_number + 1) if current_version else 1
-                
-                # Sauvegarder l'ancienne version
-                ComprehensiveContentVersion.objects.create(
-                    content_block=content_block,
-                    title=content_block.title,
-                    content=content_block.content,
-                    metadata=content_block.metadata,
-                    version_number=new_version_number,
-                    change_summary=f"Modification de {change.field_name}",
-                    created_by=request.user
-                )
-                
-                # Appliquer le changement
                 if change.change_type == 'update':
-                    setattr(content_block, change.field_name, change.new_value)
-                    content_block.updated_by = request.user
-                    content_block.save()
-                
+                    change_set.setdefault(change.content_block_id, {})[change.field_name] = change.new_value
                 applied_changes.append({
                     'content_block_id': change.content_block_id,
                     'field_name': change.field_name,
                     'change_type': change.change_type
                 })
             
+            apply_change_set(change_set, request.user)
+            
             # Supprimer tous les changements en attente
-            changes.delete()
+            ComprehensivePendingChange.objects.filter(id__in=[change.id for change in changes]).delete()
+            schedule_bundle_warmup()
             
             return Response({
                 'message': 'Changements appliqués avec succès',
@@ -476,7 +467,10 @@ def get_comprehensive_pending_changes(request):
 @api_view(['POST'])
 @permission_classes([IsAdminUser])
 def preview_content(request):
-    """Prévisualiser le contenu avec les changements en attente"""
+    """
+    Prévisualiser le contenu avec les changements en attente ; avec
+    `incremental`, seuls les blocs modifiés (depuis `since` s'il est fourni)
+    """
     page_id = request.data.get('page_id')
     if not page_id:
         return Response(
@@ -484,222 +478,134 @@ def preview_content(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    page = get_object_or_404(SitePage, id=page_id)
-    content_blocks = ContentBlock.objects.filter(page=page, is_visible=True).order_by('order')
-    
-    # Appliquer les changements en attente
-    session = ComprehensiveEditSession.objects.filter(
-        user=request.user,
-        is_active=True,
-        page=page
-    ).first()
-    
-    preview_blocks = []
-    for block in content_blocks:
-        block_data = {
-            'id': block.id,
-            'block_key': block.block_key,
-            'content_type': block.content_type,
-            'title': block.title,
-            'content': block.content,
-            'metadata': block.metadata,
-            'css_classes': block.css_classes,
-            'order': block.order
-        }
-        
-        # Appliquer les changements en attente
-        if session:
-            comprehensive_pending_changes = ComprehensivePendingChange.objects.filter(
-                session=session,
-                content_block=block
+    since = request.data.get('since')
+    if since:
+        since = parse_datetime(str(since))
+        if since is None:
+            return Response(
+                {'error': 'Date since invalide'},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            for change in comprehensive_pending_changes:
-                if change.change_type == 'update':
-                    block_data[change.field_name] = change.new_value
-        
-        preview_blocks.append(block_data)
     
-    return Response({
-        'page': SitePageSerializer(page).data,
-        'content_blocks': preview_blocks
-    })
+    page = get_object_or_404(SitePage, id=page_id)
+    incremental = str(request.data.get('incremental', '')).lower() in ('1', 'true')
+    return Response(preview_page(page, request.user, incremental=incremental, since=since))
 
 # ==================== API PUBLIQUE ====================
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def get_page_content_public(request, page_slug):
-    """Récupérer le contenu d'une page pour l'affichage public"""
-    page = get_object_or_404(SitePage, slug=page_slug, is_active=True, is_public=True)
-    content_blocks = ContentBlock.objects.filter(
-        page=page, 
-        is_visible=True
-    ).order_by('order')
-    
-    return Response({
-        'page': PublicSitePageSerializer(page).data,
-        'content_blocks': [
-            {
-                'id': block.id,
-                'block_key': block.block_key,
-                'content_type': block.content_type,
-                'title': block.title,
-                'content': block.content,
-                'metadata': block.metadata,
-                'css_classes': block.css_classes,
-                'order': block.order
-            }
-            for block in content_blocks
-        ],
-        'sections': [
-            {
-                'id': block.id,
-                'section_key': block.block_key,
-                'content': block.content,
-                'title': block.title
-            }
-            for block in content_blocks
-        ]
-    })
+    """
+    Récupérer le contenu d'une page pour l'affichage public (depuis le cache).
+    `?lang=en` sert les blocs traduits.
+    """
+    language = public_language(request.query_params.get('lang'))
+    return cms_response(
+        request, page_key(page_slug, language), page_tags(page_slug, language),
+        lambda: build_page_content(page_slug, language)
+    )
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def get_testimonials_public(request):
     """Récupérer les témoignages pour l'affichage public"""
-    testimonials = Testimonial.objects.filter(
-        status='published'
-    ).order_by('order', '-created_at')
-    
-    return Response(PublicTestimonialSerializer(testimonials, many=True).data)
+    return cms_response(request, 'testimonials', [TAG_TESTIMONIALS], build_testimonials)
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def get_faq_public(request):
     """Récupérer les FAQ pour l'affichage public"""
-    faq_items = FAQItem.objects.filter(
-        status='published'
-    ).order_by('category', 'order', '-is_featured')
-    
-    return Response(PublicFAQItemSerializer(faq_items, many=True).data)
+    return cms_response(request, 'faq', [TAG_FAQ], build_faq)
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def get_offers_public(request):
-    """Récupérer les offres pour l'affichage public"""
-    offers = Offer.objects.filter(
-        status='published'
-    ).order_by('order', '-is_featured')
+    """Récupérer les offres pour l'affichage public (depuis le cache)"""
+    return cms_response(request, 'offers', [TAG_OFFERS], build_offers)
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def get_page_bundle_public(request, page_slug):
+    """
+    Tout le contenu public d'une page en une réponse (premier rendu du site) :
+    page, paramètres, FAQ, témoignages, offres, champs de contact, avis.
+    `?fields=page,faq` limite les sections retournées, `?lang=en` sert les
+    blocs traduits.
+    """
+    fields = [f.strip() for f in request.query_params.get('fields', '').split(',') if f.strip()]
+    unknown = sorted(set(fields) - set(BUNDLE_SECTIONS))
+    if unknown:
+        return Response(
+            {'error': f"Sections inconnues : {', '.join(unknown)}", 'available': list(BUNDLE_SECTIONS)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     
-    return Response(PublicOfferSerializer(offers, many=True).data)
+    selected = [name for name in BUNDLE_SECTIONS if name in fields] if fields else None
+    language = public_language(request.query_params.get('lang'))
+    return cms_response(
+        request, bundle_key(page_slug, language), bundle_tags(page_slug, language),
+        lambda: build_page_bundle(page_slug, language),
+        variant=','.join(selected) if selected else None,
+        transform=(lambda bundle: {name: bundle[name] for name in selected}) if selected else None
+    )
 
 # ==================== RECHERCHE ====================
 
+def _search_page(request):
+    """Paramètres de pagination de la recherche : (page, taille de page)"""
+    try:
+        page = max(int(request.query_params.get('page', 1)), 1)
+        page_size = min(max(int(request.query_params.get('page_size', SEARCH_PAGE_SIZE)), 1), SEARCH_MAX_PAGE_SIZE)
+    except ValueError:
+        page, page_size = 1, SEARCH_PAGE_SIZE
+    return page, page_size
+
+def _search_response(query, total, page, page_size, results):
+    return Response({
+        'query': query,
+        'count': total,
+        'page': page,
+        'page_size': page_size,
+        'has_more': page * page_size < total,
+        'results': results
+    })
+
 @api_view(['GET'])
 def search_faq(request):
-    """Rechercher dans les FAQ"""
+    """Rechercher dans les FAQ (index plein texte, résultats paginés)"""
     query = request.query_params.get('q', '').strip()
     
     if not query:
         return Response({'results': []})
     
-    faq_items = FAQItem.objects.filter(
-        Q(question__icontains=query) |
-        Q(answer__icontains=query) |
-        Q(keywords__icontains=query),
-        status='published'
-    ).order_by('-is_featured', '-views_count')
+    page, page_size = _search_page(request)
+    total, hits = search(query, request.query_params.get('lang'), ['faq'], page, page_size)
     
-    # Augmenter le compteur de vues pour les résultats
-    faq_items.update(views_count=models.F('views_count') + 1)
+    faq_items = FAQItem.objects.in_bulk([hit['id'] for hit in hits])
+    results = [faq_items[hit['id']] for hit in hits if hit['id'] in faq_items]
     
-    return Response(FAQSearchSerializer(faq_items, many=True).data)
+    # Compter l'affichage des résultats (écrit par lots, hors requête)
+    faq_views.add([faq.id for faq in results])
+    
+    return _search_response(query, total, page, page_size, FAQSearchSerializer(results, many=True).data)
 
 @api_view(['GET'])
 def search_content(request):
-    """Recherche globale dans tout le contenu"""
+    """Recherche globale dans tout le contenu (index plein texte, résultats paginés)"""
     query = request.query_params.get('q', '').strip()
     
     if not query:
         return Response({'results': []})
     
-    results = []
-    
-    # Recherche dans les pages
-    pages = SitePage.objects.filter(
-        Q(title__icontains=query) |
-        Q(description__icontains=query),
-        is_active=True, is_public=True
-    )
-    for page in pages:
-        results.append({
-            'content_type': 'page',
-            'id': page.id,
-            'title': page.title,
-            'content': page.description,
-            'url': f'/pages/{page.slug}',
-            'relevance_score': 1.0
-        })
-    
-    # Recherche dans les blocs de contenu
-    content_blocks = ContentBlock.objects.filter(
-        Q(title__icontains=query) |
-        Q(content__icontains=query),
-        is_visible=True,
-        page__is_active=True,
-        page__is_public=True
-    ).select_related('page')
-    
-    for block in content_blocks:
-        results.append({
-            'content_type': 'block',
-            'id': block.id,
-            'title': block.title or block.block_key,
-            'content': block.content,
-            'url': f'/pages/{block.page.slug}#{block.block_key}',
-            'relevance_score': 0.8
-        })
-    
-    # Recherche dans les FAQ
-    faq_items = FAQItem.objects.filter(
-        Q(question__icontains=query) |
-        Q(answer__icontains=query),
-        status='published'
-    )
-    
-    for faq in faq_items:
-        results.append({
-            'content_type': 'faq',
-            'id': faq.id,
-            'title': faq.question,
-            'content': faq.answer,
-            'url': f'/faq#{faq.id}',
-            'relevance_score': 0.9
-        })
-    
-    # Recherche dans les offres
-    offers = Offer.objects.filter(
-        Q(name__icontains=query) |
-        Q(description__icontains=query),
-        status='published'
-    )
-    
-    for offer in offers:
-        results.append({
-            'content_type': 'offer',
-            'id': offer.id,
-            'title': offer.name,
-            'content': offer.description,
-            'url': f'/offers/{offer.slug}',
-            'relevance_score': 0.7
-        })
-    
-    # Trier par score de pertinence
-    results.sort(key=lambda x: x['relevance_score'], reverse=True)
+    content_types = [
+        content_type for content_type in request.query_params.get('types', '').split(',')
+        if content_type in DOCUMENT_BUILDERS
+    ]
+    page, page_size = _search_page(request)
+    total, results = search(query, request.query_params.get('lang'), content_types, page, page_size)
     
-    return Response({
-        'query': query,
-        'results': results[:20]  # Limiter à 20 résultats
-    })
+    return _search_response(query, total, page, page_size, results)
 
 # ==================== STATISTIQUES ====================
 
@@ -707,26 +613,17 @@ def search_content(request):
 @permission_classes([IsAdminUser])
 def get_content_stats(request):
     """Récupérer les statistiques de contenu"""
-    
-    stats = {
-        'total_pages': SitePage.objects.count(),
-        'total_content_blocks': ContentBlock.objects.count(),
-        'total_testimonials': Testimonial.objects.count(),
-        'total_faq_items': FAQItem.objects.count(),
-        'total_offers': Offer.objects.count(),
-        
-        'published_pages': SitePage.objects.filter(is_active=True).count(),
-        'published_testimonials': Testimonial.objects.filter(status='published').count(),
-        'published_faq_items': FAQItem.objects.filter(status='published').count(),
-        'published_offers': Offer.objects.filter(status='published').count(),
-        
-        'draft_pages': SitePage.objects.filter(is_active=False).count(),
-        'draft_testimonials': Testimonial.objects.filter(status='draft').count(),
-        'draft_faq_items': FAQItem.objects.filter(status='draft').count(),
-        'draft_offers': Offer.objects.filter(status='draft').count(),
-    }
-    
-    return Response(ContentStatsSerializer(stats).data)
+    return Response(ContentStatsSerializer(content_stats()).data)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def get_content_edit_stats(request):
+    """Modifications de contenu par jour (?days=, 30 par défaut)"""
+    try:
+        days = int(request.query_params.get('days', EDITS_DEFAULT_DAYS))
+    except ValueError:
+        days = EDITS_DEFAULT_DAYS
+    return Response(ContentEditDaySerializer(edit_series(days), many=True).data)
 
 # ==================== BULK OPERATIONS ====================
 
@@ -743,54 +640,24 @@ def bulk_update_content_blocks(request):
         )
     
     try:
-        with transaction.atomic():
-            updated_blocks = []
+        change_set = {}
+        for update in updates:
+            block_id = update.get('id')
+            field_updates = update.get('fields', {})
             
-            for update in updates:
-                block_id = update.get('id')
-                field_updates = update.get('fields', {})
-                
-                if not block_id or not field_updates:
-                    continue
-                
-                try:
-                    block = ContentBlock.objects.get(id=block_id)
-                    
-                    # Créer une version avant modification
-                    current_version = ComprehensiveContentVersion.objects.filter(
-                        content_block=block
-                    ).order_by('-version_number').first()
-                    
-                    new_version_number = (current_version.version_number + 1) if current_version else 1
-                    
-                    # Sauvegarder l'ancienne version
-                    ComprehensiveContentVersion.objects.create(
-                        content_block=block,
-                        title=block.title,
-                        content=block.content,
-                        metadata=block.metadata,
-                        version_number=new_version_number,
-                        change_summary="Mise à jour en masse",
-                        created_by=request.user
-                    )
-                    
-                    # Appliquer les mises à jour
-                    for field, value in field_updates.items():
-                        if hasattr(block, field):
-                            setattr(block, field, value)
-                    
-                    block.updated_by = request.user
-                    block.save()
-                    
-                    updated_blocks.append(block_id)
-                    
-                except ContentBlock.DoesNotExist:
-                    continue
-            
-            return Response({
-                'message': f'{len(updated_blocks)} blocs mis à jour avec succès',
-                'updated_blocks': updated_blocks
-            })
+            if not block_id or not field_updates:
+                continue
+            change_set.setdefault(block_id, {}).update(field_updates)
+        
+        updated = set(apply_change_set(change_set, request.user, summary=lambda block_id, fields: "Mise à jour en masse"))
+        updated_blocks = [block_id for block_id in change_set if str(block_id).isdigit() and int(block_id) in updated]
+        if updated_blocks:
+            schedule_bundle_warmup()
+        
+        return Response({
+            'message': f'{len(updated_blocks)} blocs mis à jour avec succès',
+            'updated_blocks': updated_blocks
+        })
     
     except Exception as e:
         logger.error(f"Erreur lors de la mise à jour en masse: {str(e)}")
@@ -817,20 +684,28 @@ def get_page_content_blocks(request, slug):
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def get_page_content_blocks_public(request, page_slug):
-    """Récupérer les blocs de contenu d'une page pour l'affichage public"""
-    try:
+    """
+    Récupérer les blocs de contenu d'une page pour l'affichage public (depuis le cache).
+    `?lang=en` sert les blocs traduits.
+    """
+    language = public_language(request.query_params.get('lang'))
+
+    def build():
         page = SitePage.objects.get(slug=page_slug, is_active=True)
         content_blocks = page.content_blocks.filter(is_visible=True).order_by('order')
-        serializer = ContentBlockSerializer(content_blocks, many=True)
-        return Response({
-            'content_blocks': serializer.data,
+        return {
+            'content_blocks': translate_blocks(ContentBlockSerializer(content_blocks, many=True).data, language),
             'page': {
                 'id': page.id,
                 'name': page.name,
                 'slug': page.slug,
                 'title': page.title
             }
-        })
+        }
+    
+    try:
+        key = f"page_blocks:{page_slug}:{language}" if language else f"page_blocks:{page_slug}"
+        return cms_response(request, key, page_tags(page_slug, language), build)
     except SitePage.DoesNotExist:
         return Response({'error': 'Page not found'}, status=404)
     except Exception as e:
@@ -899,14 +774,8 @@ class ReviewDetailView(generics.RetrieveUpdateDestroyAPIView):
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def get_reviews_public(request):
-    """Récupérer les avis publics pour l'affichage"""
-    reviews = Review.objects.filter(
-        status='approved',
-        is_public=True
-    ).order_by('-order', '-created_at')
-    
-    serializer = ReviewListSerializer(reviews, many=True)
-    return Response(serializer.data)
+    """Récupérer les avis publics pour l'affichage (depuis le cache)"""
+    return cms_response(request, 'reviews', [TAG_REVIEWS], build_reviews)
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
@@ -1082,14 +951,11 @@ class ContactFieldDetailView(generics.RetrieveUpdateDestroyAPIView):
 @permission_classes([permissions.AllowAny])
 def get_contact_fields_public(request):
     """Récupérer les champs de contact pour l'affichage public"""
-    fields = ContactField.objects.filter(is_visible=True).order_by('order', 'field_label')
-    serializer = ContactFieldListSerializer(fields, many=True)
-    return Response(serializer.data)
+    return cms_response(request, 'contact_fields', [TAG_CONTACT_FIELDS], build_contact_fields)
 
 @api_view(['POST'])
 @permission_classes([IsAdminUser])
 def clear_contact_cache(request):
     """Vider le cache des champs de contact"""
-    from django.core.cache import cache
-    cache.delete('contact_fields_public')
+    invalidate_tags(TAG_CONTACT_FIELDS)
     return Response({'message': 'Cache des champs de contact vidé'})
@@ -1,5 +1,9 @@
 from django.contrib import admin
 from .models import Offer, PendingPayment, Payment, Subscription, PaymentHistory, ContactChannel
+from .models_validation import PaymentValidationStep
+from .models_revenue import DailyRevenue
+from .models_subscription import SubscriptionTransition, SubscriptionTransitionCursor
+from .subscriptions import change_status, record_created
 
 
 @admin.register(Offer)
@@ -36,6 +40,19 @@ class SubscriptionAdmin(admin.ModelAdmin):
     ordering = ['-created_at']
     readonly_fields = ['created_at', 'updated_at']
 
+    def save_model(self, request, obj, form, change):
+        """Les changements de statut passent par change_status (journal des transitions)"""
+        if not change:
+            super().save_model(request, obj, form, change)
+            record_created([obj], reason='admin')
+            return
+
+        new_status = obj.status
+        if 'status' in form.changed_data:
+            obj.status = form.initial['status']
+        super().save_model(request, obj, form, change)
+        change_status(obj, new_status, reason='admin')
+
 
 @admin.register(PaymentHistory)
 class PaymentHistoryAdmin(admin.ModelAdmin):
@@ -51,3 +68,35 @@ class ContactChannelAdmin(admin.ModelAdmin):
     list_display = ['channel_type', 'contact_info', 'is_active', 'display_order']
     list_filter = ['channel_type', 'is_active']
     ordering = ['display_order', 'channel_type']
+
+
+@admin.register(PaymentValidationStep)
+class PaymentValidationStepAdmin(admin.ModelAdmin):
+    list_display = ['payment', 'step', 'status', 'attempts', 'started_at', 'finished_at']
+    list_filter = ['step', 'status']
+    search_fields = ['payment__id', 'payment__user__email', 'last_error']
+    ordering = ['-created_at']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
+
+
+@admin.register(DailyRevenue)
+class DailyRevenueAdmin(admin.ModelAdmin):
+    list_display = ['date', 'offer', 'currency', 'payment_count', 'amount', 'updated_at']
+    list_filter = ['currency', 'offer']
+    ordering = ['-date']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(SubscriptionTransition)
+class SubscriptionTransitionAdmin(admin.ModelAdmin):
+    list_display = ['id', 'subscription', 'user', 'from_status', 'to_status', 'reason', 'created_at']
+    list_filter = ['to_status', 'reason']
+    search_fields = ['user__email', 'user__username']
+    ordering = ['-id']
+    readonly_fields = ['created_at']
+
+
+@admin.register(SubscriptionTransitionCursor)
+class SubscriptionTransitionCursorAdmin(admin.ModelAdmin):
+    list_display = ['consumer', 'last_id', 'updated_at']
+    readonly_fields = ['updated_at']
@@ -0,0 +1,219 @@
+"""
+Archives de factures PDF (export comptable)
+
+Les factures d'une période sont rendues en PDF puis écrites une par une dans
+une archive ZIP ou tar produite en flux : seul le PDF en cours d'écriture est
+en mémoire. Les PDF déjà présents dans le cache (pdf_cache) sont réutilisés
+tels quels.
+
+Le pool de processus (ReportLab est limité par le GIL) n'est utilisé que par
+la commande archive_invoices. La vue HTTP rend dans le processus de la
+requête, au plus HTTP_MAX_RENDERS factures ; au-delà, les PDF manquants sont
+rendus par lots dans des tâches Celery (schedule_invoice_renders) et l'export
+est redemandé une fois le cache rempli.
+"""
+import logging
+import os
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.files.storage import default_storage
+from django.db import connections
+
+from .models_invoice import Invoice
+from .pdf_cache import get_invoice_pdf_path, invoice_pdf_path
+
+logger = logging.getLogger(__name__)
+
+# Factures sans PDF en cache rendues au plus par une requête HTTP
+HTTP_MAX_RENDERS = 50
+# Factures rendues par tâche Celery
+RENDER_CHUNK_SIZE = 25
+
+ARCHIVE_FORMATS = {
+    'zip': ('application/zip', 'zip'),
+    'tar': ('application/gzip', 'tar.gz'),
+}
+
+
+def default_workers():
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def _render_invoice(invoice_id):
+    """Rendu d'une facture dans un processus du pool ; retourne le chemin en cache"""
+    invoice = Invoice.objects.select_related('customer').get(id=invoice_id)
+    return invoice_id, get_invoice_pdf_path(invoice)
+
+
+def render_invoices(invoice_ids):
+    """Rendre (et mettre en cache) les PDF de factures dans le processus courant"""
+    for invoice_id in invoice_ids:
+        _render_invoice(invoice_id)
+    return len(invoice_ids)
+
+
+class ArchiveProgress:
+    """Avancement d'un export : compteurs et débit"""
+
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.cached = 0
+        self.rendered = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self):
+        return self.done / self.elapsed if self.elapsed > 0 else 0
+
+    def as_dict(self):
+        return {
+            'total': self.total,
+            'done': self.done,
+            'cached': self.cached,
+            'rendered': self.rendered,
+            'bytes': self.bytes,
+            'duration_s': round(self.elapsed, 2),
+            'invoices_per_s': round(self.rate, 1),
+        }
+
+
+def invoices_for_period(start_date, end_date):
+    return Invoice.objects.filter(
+        issue_date__gte=start_date,
+        issue_date__lte=end_date
+    ).only('id', 'invoice_number', 'issue_date', 'updated_at').order_by('issue_date', 'id')
+
+
+def uncached_invoice_ids(invoices):
+    """Identifiants des factures dont le PDF n'est pas encore en cache"""
+    return [invoice.id for invoice in invoices if not default_storage.exists(invoice_pdf_path(invoice))]
+
+
+def schedule_invoice_renders(invoice_ids):
+    """Planifier le rendu des PDF manquants, par lots de RENDER_CHUNK_SIZE ; False si Celery est indisponible"""
+    from celery import group
+
+    from .tasks import render_invoice_pdfs
+
+    chunks = [invoice_ids[i:i + RENDER_CHUNK_SIZE] for i in range(0, len(invoice_ids), RENDER_CHUNK_SIZE)]
+    try:
+        group(render_invoice_pdfs.s(chunk) for chunk in chunks).delay()
+    except Exception as e:
+        logger.error(f"❌ Impossible de planifier le rendu de {len(invoice_ids)} facture(s) : {e}")
+        return False
+    logger.info(f"🗜️ Rendu de {len(invoice_ids)} facture(s) planifié en {len(chunks)} tâche(s)")
+    return True
+
+
+def iter_invoice_pdfs(invoices, workers=None, progress=None):
+    """
+    Produire (facture, chemin du PDF en cache) pour chaque facture.
+    Les factures déjà en cache sont servies d'abord, les autres sont rendues
+    dans le processus courant, ou dans un pool de `workers` processus (à
+    réserver à la commande : jamais dans un worker web ou Celery).
+    """
+    workers = workers or 1
+    cached, to_render = [], {}
+    for invoice in invoices:
+        path = invoice_pdf_path(invoice)
+        if default_storage.exists(path):
+            cached.append((invoice, path))
+        else:
+            to_render[invoice.id] = invoice
+
+    for invoice, path in cached:
+        if progress:
+            progress.cached += 1
+        yield invoice, path
+
+    if not to_render:
+        return
+
+    if workers == 1 or len(to_render) == 1:
+        results = (_render_invoice(invoice_id) for invoice_id in to_render)
+        for invoice_id, path in results:
+            if progress:
+                progress.rendered += 1
+            yield to_render[invoice_id], path
+        return
+
+    # Les processus enfants ouvrent leurs propres connexions
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for invoice_id, path in pool.map(_render_invoice, list(to_render), chunksize=4):
+            if progress:
+                progress.rendered += 1
+            yield to_render[invoice_id], path
+
+
+def _member_name(invoice):
+    return f"{invoice.issue_date:%Y-%m}/facture_{invoice.invoice_number}.pdf"
+
+
+class _StreamBuffer:
+    """Tampon non adressable : l'archive y écrit, le générateur le vide"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_invoice_archive(invoices, archive_format='zip', workers=None, progress=None, on_progress=None):
+    """
+    Générateur des octets d'une archive des PDF des factures.
+    `on_progress(progress)` est appelé après chaque facture.
+    """
+    progress = progress or ArchiveProgress(len(invoices))
+    buffer = _StreamBuffer()
+
+    if archive_format == 'tar':
+        archive = tarfile.open(fileobj=buffer, mode='w|gz')
+    else:
+        archive = zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_DEFLATED)
+
+    with archive:
+        for invoice, path in iter_invoice_pdfs(invoices, workers=workers, progress=progress):
+            with default_storage.open(path, 'rb') as pdf:
+                if archive_format == 'tar':
+                    info = tarfile.TarInfo(_member_name(invoice))
+                    info.size = default_storage.size(path)
+                    info.mtime = invoice.updated_at.timestamp() if invoice.updated_at else time.time()
+                    archive.addfile(info, pdf)
+                else:
+                    with archive.open(_member_name(invoice), mode='w') as member:
+                        for chunk in iter(lambda: pdf.read(64 * 1024), b''):
+                            member.write(chunk)
+                progress.bytes += pdf.tell()
+
+            progress.done += 1
+            if on_progress:
+                on_progress(progress)
+            data = buffer.drain()
+            if data:
+                yield data
+
+    data = buffer.drain()
+    if data:
+        yield data
+
+    logger.info(f"🗜️ Archive de factures générée : {progress.as_dict()}")
@@ -0,0 +1,15 @@
+"""
+Cache du catalogue des offres actives (endpoints publics offers/)
+Invalidé par les signaux post_save / post_delete d'Offer (voir signals.py)
+"""
+from backend.versioned_cache import VersionedCache
+
+
+def _build_offers():
+    from .models import Offer
+    from .serializers import OfferSerializer
+
+    return OfferSerializer(Offer.objects.filter(is_active=True), many=True).data
+
+
+offers_cache = VersionedCache('payments:offers', _build_offers)
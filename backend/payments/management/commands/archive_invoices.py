@@ -0,0 +1,70 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.archive import (
+    ARCHIVE_FORMATS, ArchiveProgress, default_workers, invoices_for_period, stream_invoice_archive
+)
+
+
+class Command(BaseCommand):
+    help = 'Exporter les factures PDF d\'une période dans une archive ZIP ou tar (rendu en parallèle)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('start', help='Date de début (AAAA-MM-JJ)')
+        parser.add_argument('end', help='Date de fin incluse (AAAA-MM-JJ)')
+        parser.add_argument(
+            '--output',
+            default=None,
+            help='Fichier de sortie (par défaut factures_<début>_<fin>.<format>)',
+        )
+        parser.add_argument(
+            '--format',
+            choices=list(ARCHIVE_FORMATS),
+            default='zip',
+            help='Format de l\'archive',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=default_workers(),
+            help='Nombre de processus de rendu PDF',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start'])
+            end = date.fromisoformat(options['end'])
+        except ValueError:
+            raise CommandError('Dates invalides (format attendu : AAAA-MM-JJ)')
+
+        archive_format = options['format']
+        output = options['output'] or f"factures_{start}_{end}.{ARCHIVE_FORMATS[archive_format][1]}"
+        invoices = list(invoices_for_period(start, end))
+        if not invoices:
+            self.stdout.write(self.style.WARNING('Aucune facture sur cette période'))
+            return
+
+        self.stdout.write(f'🗜️ {len(invoices)} facture(s), {options["workers"]} processus de rendu')
+        progress = ArchiveProgress(len(invoices))
+        step = max(1, len(invoices) // 20)
+
+        def report(progress):
+            if progress.done % step == 0 or progress.done == progress.total:
+                self.stdout.write(
+                    f'  {progress.done}/{progress.total} '
+                    f'({progress.cached} en cache, {progress.rendered} rendues) '
+                    f'- {progress.rate:.1f} factures/s'
+                )
+
+        with open(output, 'wb') as f:
+            for chunk in stream_invoice_archive(
+                invoices, archive_format=archive_format, workers=options['workers'],
+                progress=progress, on_progress=report
+            ):
+                f.write(chunk)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {output} : {progress.done} facture(s) en {progress.elapsed:.1f}s '
+            f'({progress.rate:.1f} factures/s, {progress.bytes / 1024 / 1024:.1f} Mo de PDF)'
+        ))
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from payments.models import Offer, PendingPayment, Payment, Subscription
+from payments.subscriptions import record_created
 from decimal import Decimal
 from datetime import datetime, timedelta
 
@@ -103,7 +104,7 @@ class Command(BaseCommand):
                 
                 # Creer une souscription si c'est un abonnement
                 if payment.offer.duration_days:
-                    Subscription.objects.get_or_create(
+                    subscription, subscription_created = Subscription.objects.get_or_create(
                         user=user,
                         offer=payment.offer,
                         payment=payment,
@@ -113,6 +114,8 @@ class Command(BaseCommand):
                             'status': 'active'
                         }
                     )
+                    if subscription_created:
+                        record_created([subscription], reason='test_data')
                     self.stdout.write(f'  [OK] Souscription creee pour: {payment.offer.name}')
             else:
                 self.stdout.write(f'  [SKIP] Paiement existe: {payment.offer.name}')
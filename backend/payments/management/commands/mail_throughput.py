@@ -0,0 +1,62 @@
+import time
+
+from django.core.mail import EmailMultiAlternatives
+from django.core.mail.backends.smtp import EmailBackend
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.mail import MailService
+
+
+class Command(BaseCommand):
+    help = (
+        'Mesure du débit d\'envoi d\'e-mails : une connexion SMTP par message '
+        'contre la connexion réutilisée de MailService. À lancer contre un '
+        'serveur local, ex. `python -m smtpd -n -c DebuggingServer localhost:1025` '
+        'ou `python -m aiosmtpd -n -l localhost:1025`'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='localhost')
+        parser.add_argument('--port', type=int, default=1025)
+        parser.add_argument('--count', type=int, default=200, help='Nombre de messages par mesure')
+        parser.add_argument('--tls', action='store_true', help='STARTTLS (serveur de test compatible requis)')
+
+    def handle(self, *args, **options):
+        count = options['count']
+
+        def backend(**kwargs):
+            return EmailBackend(
+                host=options['host'], port=options['port'], use_tls=options['tls'],
+                username='', password='', timeout=10, **kwargs
+            )
+
+        def messages():
+            return [
+                EmailMultiAlternatives(
+                    subject=f'Test débit {i}', body='Message de test',
+                    from_email='bench@example.com', to=[f'client{i}@example.com']
+                )
+                for i in range(count)
+            ]
+
+        try:
+            backend().open()
+        except OSError as e:
+            raise CommandError(f"Serveur SMTP injoignable sur {options['host']}:{options['port']} ({e})")
+
+        started = time.monotonic()
+        for message in messages():
+            backend().send_messages([message])
+        naive = time.monotonic() - started
+        self.stdout.write(f"✉️ Une connexion par message : {count} en {naive:.2f}s ({count / naive:.0f}/s)")
+
+        service = MailService(connection_factory=backend)
+        started = time.monotonic()
+        service.send_messages(messages())
+        service.close()
+        pooled = time.monotonic() - started
+        self.stdout.write(
+            f"✉️ Connexion réutilisée : {count} en {pooled:.2f}s ({count / pooled:.0f}/s), "
+            f"{service.stats['connections']} connexion(s)"
+        )
+        self.stdout.write(self.style.SUCCESS(f"✅ Gain : x{naive / pooled:.1f}"))
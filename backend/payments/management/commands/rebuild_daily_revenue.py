@@ -0,0 +1,27 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.revenue import rebuild_daily_revenue
+
+
+class Command(BaseCommand):
+    help = 'Reconstruire la table des revenus journaliers (DailyRevenue) depuis les paiements'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            default=None,
+            help='Date de début (AAAA-MM-JJ), par défaut le premier paiement',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError('Date invalide (format attendu : AAAA-MM-JJ)')
+
+        rows = rebuild_daily_revenue(since=since)
+        self.stdout.write(self.style.SUCCESS(f'✅ {rows} ligne(s) de revenus journaliers recalculée(s)'))
@@ -0,0 +1,87 @@
+import random
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction, OperationalError
+
+from payments.models_invoice import InvoiceNumberCounter
+
+
+class Command(BaseCommand):
+    help = (
+        'Test de charge de l\'allocateur de numéros de facture : allocations '
+        'concurrentes avec rollbacks aléatoires, puis vérification de la continuité'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Nombre de threads concurrents')
+        parser.add_argument('--per-thread', type=int, default=50, help='Transactions par thread')
+        parser.add_argument('--max-block', type=int, default=3, help='Taille maximale d\'un bloc alloué')
+        parser.add_argument('--rollback-rate', type=float, default=0.2, help='Part des transactions annulées')
+        parser.add_argument('--series', default='STRESS', help='Série de test (jamais la série CT)')
+
+    def handle(self, *args, **options):
+        series = options['series']
+        if series == 'CT':
+            raise CommandError('La série CT est réservée aux vraies factures')
+
+        InvoiceNumberCounter.objects.filter(name=series).delete()
+        committed = []
+        lock = threading.Lock()
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(options['per_thread']):
+                    count = random.randint(1, options['max_block'])
+                    while True:
+                        try:
+                            with transaction.atomic():
+                                numbers = InvoiceNumberCounter.allocate(count, name=series)
+                                # Simuler la création des factures
+                                time.sleep(random.random() / 1000)
+                                if random.random() < options['rollback_rate']:
+                                    raise _Rollback()
+                            with lock:
+                                committed.extend(numbers)
+                            break
+                        except _Rollback:
+                            break
+                        except OperationalError:
+                            # SQLite : base verrouillée, nouvelle tentative
+                            time.sleep(0.01)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        started = time.monotonic()
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = time.monotonic() - started
+
+        counter_value = InvoiceNumberCounter.objects.get(name=series).value if committed else 0
+        InvoiceNumberCounter.objects.filter(name=series).delete()
+
+        if errors:
+            raise CommandError(f'❌ {len(errors)} erreur(s) : {errors[0]}')
+
+        values = sorted(int(number.split('-')[1]) for number in committed)
+        duplicates = len(values) - len(set(values))
+        gaps = [v for v in range(1, len(values) + 1) if v not in set(values)]
+
+        self.stdout.write(
+            f'{len(values)} numéros validés en {duration:.2f}s '
+            f'({len(values) / duration:.0f}/s), compteur final {counter_value}'
+        )
+        if duplicates or gaps or counter_value != len(values):
+            raise CommandError(f'❌ Numérotation incorrecte : {duplicates} doublon(s), {len(gaps)} trou(s)')
+        self.stdout.write(self.style.SUCCESS('✅ Numérotation continue, sans doublon ni trou'))
+
+
+class _Rollback(Exception):
+    pass
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0007_offer_duration_hours_offer_duration_minutes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentValidationStep',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('step', models.CharField(choices=[('invoice_pdf', 'Génération du PDF de facture'), ('invoice_email', 'Envoi de la facture par email'), ('telegram_token', 'Token et notification Telegram'), ('telegram_message', 'Message Telegram')], max_length=30, verbose_name='Étape')),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('running', 'En cours'), ('done', 'Terminée'), ('failed', 'Échec')], default='pending', max_length=20, verbose_name='Statut')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Tentatives')),
+                ('last_error', models.TextField(blank=True, verbose_name='Dernière erreur')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Démarrée le')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Terminée le')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Créée le')),
+                ('payment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='validation_steps', to='payments.payment', verbose_name='Paiement')),
+            ],
+            options={
+                'verbose_name': 'Étape post-validation',
+                'verbose_name_plural': 'Étapes post-validation',
+                'ordering': ['payment', 'id'],
+                'indexes': [models.Index(fields=['status', 'started_at'], name='payments_pa_status_43aadd_idx')],
+                'unique_together': {('payment', 'step')},
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:19
+
+from django.db import migrations, models
+
+
+def seed_counter(apps, schema_editor):
+    """Initialiser la série CT au plus grand numéro de facture existant"""
+    Invoice = apps.get_model('payments', 'Invoice')
+    InvoiceNumberCounter = apps.get_model('payments', 'InvoiceNumberCounter')
+
+    value = 0
+    for invoice_number in Invoice.objects.filter(invoice_number__startswith='CT-').values_list('invoice_number', flat=True):
+        try:
+            value = max(value, int(invoice_number.split('-')[1]))
+        except (IndexError, ValueError):
+            continue
+    InvoiceNumberCounter.objects.create(name='CT', value=value)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0008_paymentvalidationstep'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoiceNumberCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Série (préfixe)', max_length=20, unique=True)),
+                ('value', models.PositiveIntegerField(default=0, help_text='Dernier numéro attribué')),
+            ],
+            options={
+                'verbose_name': 'Compteur de factures',
+                'verbose_name_plural': 'Compteurs de factures',
+            },
+        ),
+        migrations.RunPython(seed_counter, migrations.RunPython.noop),
+    ]
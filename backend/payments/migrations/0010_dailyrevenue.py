@@ -0,0 +1,61 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_revenue(apps, schema_editor):
+    """Pré-agréger les paiements existants"""
+    Payment = apps.get_model('payments', 'Payment')
+    DailyRevenue = apps.get_model('payments', 'DailyRevenue')
+
+    rows = (
+        Payment.objects
+        .filter(status='completed')
+        .annotate(day=TruncDate('paid_at'))
+        .values('day', 'offer', 'currency')
+        .annotate(payment_count=Count('id'), amount=Sum('amount'))
+        .order_by()
+    )
+    DailyRevenue.objects.bulk_create([
+        DailyRevenue(
+            date=row['day'],
+            offer_id=row['offer'],
+            currency=row['currency'],
+            payment_count=row['payment_count'],
+            amount=row['amount'],
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0009_invoicenumbercounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRevenue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Jour')),
+                ('currency', models.CharField(default='EUR', max_length=3, verbose_name='Devise')),
+                ('payment_count', models.PositiveIntegerField(default=0, verbose_name='Nombre de paiements')),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Montant')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Mis à jour le')),
+                ('offer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_revenues', to='payments.offer', verbose_name='Offre')),
+            ],
+            options={
+                'verbose_name': 'Revenu journalier',
+                'verbose_name_plural': 'Revenus journaliers',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['date'], name='payments_da_date_57ccbb_idx')],
+                'unique_together': {('date', 'offer', 'currency')},
+            },
+        ),
+        migrations.RunPython(backfill_daily_revenue, migrations.RunPython.noop),
+    ]
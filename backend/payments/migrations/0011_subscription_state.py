@@ -0,0 +1,53 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0010_dailyrevenue'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubscriptionTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, max_length=50, verbose_name='Ancien statut')),
+                ('to_status', models.CharField(max_length=50, verbose_name='Nouveau statut')),
+                ('reason', models.CharField(blank=True, max_length=100, verbose_name='Raison')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Créée le')),
+            ],
+            options={
+                'verbose_name': "Transition d'abonnement",
+                'verbose_name_plural': "Transitions d'abonnement",
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['status', 'end_date'], name='sub_status_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['end_date'], name='sub_active_end_idx'),
+        ),
+        migrations.AddField(
+            model_name='subscriptiontransition',
+            name='subscription',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transitions', to='payments.subscription', verbose_name='Abonnement'),
+        ),
+        migrations.AddField(
+            model_name='subscriptiontransition',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subscription_transitions', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur'),
+        ),
+        migrations.AddIndex(
+            model_name='subscriptiontransition',
+            index=models.Index(fields=['to_status', 'id'], name='payments_su_to_stat_8bd5db_idx'),
+        ),
+    ]
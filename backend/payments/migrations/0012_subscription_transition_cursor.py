@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0011_subscription_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubscriptionTransitionCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('consumer', models.CharField(max_length=100, unique=True, verbose_name='Consommateur')),
+                ('last_id', models.BigIntegerField(default=0, verbose_name='Dernière transition traitée')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Modifié le')),
+            ],
+            options={
+                'verbose_name': 'Curseur de transitions',
+                'verbose_name_plural': 'Curseurs de transitions',
+            },
+        ),
+    ]
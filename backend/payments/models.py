@@ -6,7 +6,7 @@ from datetime import timedelta
 User = get_user_model()
 
 # Import des modèles de facturation
-from .models_invoice import Invoice, InvoiceItem, InvoiceTemplate
+from .models_invoice import Invoice, InvoiceItem, InvoiceTemplate, InvoiceNumberCounter
 
 
 class Offer(models.Model):
@@ -206,6 +206,11 @@ class Subscription(models.Model):
         verbose_name = "Abonnement"
         verbose_name_plural = "Abonnements"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'end_date'], name='sub_status_end_idx'),
+            # Index partiel : seuls les abonnements actifs sont interrogés par date de fin
+            models.Index(fields=['end_date'], name='sub_active_end_idx', condition=models.Q(status='active')),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.offer.name} - {self.status}"
@@ -286,3 +291,13 @@ class ContactChannel(models.Model):
     
     def __str__(self):
         return f"{self.channel_type} - {self.contact_info}"
+
+
+# Import des étapes post-validation
+from .models_validation import PaymentValidationStep
+
+# Import des revenus pré-agrégés
+from .models_revenue import DailyRevenue
+
+# Import du journal des transitions d'abonnement
+from .models_subscription import SubscriptionTransition, SubscriptionTransitionCursor
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
 from decimal import Decimal
@@ -156,6 +156,11 @@ class Invoice(models.Model):
     def __str__(self):
         return f"Facture {self.invoice_number} - {self.customer.get_full_name()}"
 
+    @classmethod
+    def next_invoice_number(cls):
+        """Numéro séquentiel suivant (CT-XXXXX), à appeler dans la transaction de création"""
+        return InvoiceNumberCounter.allocate()[0]
+
     def save(self, *args, **kwargs):
         # Calculer automatiquement la TVA et le total TTC
         if self.subtotal_ht:
@@ -301,3 +306,62 @@ class InvoiceTemplate(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class InvoiceNumberCounter(models.Model):
+    """
+    Compteur des numéros de facture (une ligne par série).
+
+    L'allocation verrouille la ligne (SELECT ... FOR UPDATE) jusqu'à la fin
+    de la transaction qui crée les factures : les créations concurrentes
+    sont sérialisées et un rollback annule aussi l'incrément, la numérotation
+    reste donc continue et sans trou.
+    """
+    name = models.CharField(max_length=20, unique=True, help_text="Série (préfixe)")
+    value = models.PositiveIntegerField(default=0, help_text="Dernier numéro attribué")
+
+    class Meta:
+        verbose_name = "Compteur de factures"
+        verbose_name_plural = "Compteurs de factures"
+
+    def __str__(self):
+        return f"{self.name} : {self.value}"
+
+    @classmethod
+    def allocate(cls, count=1, name='CT'):
+        """
+        Réserver `count` numéros consécutifs et retourner leur liste.
+        Doit être appelé dans la transaction qui crée les factures : le
+        verrou est conservé jusqu'au commit.
+        """
+        with transaction.atomic():
+            try:
+                counter = cls.objects.select_for_update().get(name=name)
+            except cls.DoesNotExist:
+                counter = cls._create_counter(name)
+
+            first = counter.value + 1
+            counter.value += count
+            counter.save(update_fields=['value'])
+
+        return [f"{name}-{number:05d}" for number in range(first, first + count)]
+
+    @classmethod
+    def _create_counter(cls, name):
+        """Créer la série à partir du plus grand numéro existant"""
+        value = 0
+        for invoice_number in Invoice.objects.filter(
+            invoice_number__startswith=f"{name}-"
+        ).values_list('invoice_number', flat=True):
+            try:
+                value = max(value, int(invoice_number.split('-')[1]))
+            except (IndexError, ValueError):
+                continue
+
+        try:
+            with transaction.atomic():
+                cls.objects.create(name=name, value=value)
+        except IntegrityError:
+            # Créé au même moment par une autre transaction
+            pass
+        return cls.objects.select_for_update().get(name=name)
@@ -0,0 +1,28 @@
+from django.db import models
+
+
+class DailyRevenue(models.Model):
+    """
+    Chiffre d'affaires pré-agrégé par jour, offre et devise (paiements complétés).
+    Table dérivée de Payment : recalculée après chaque validation et chaque
+    nuit sur les derniers jours (voir payments/revenue.py).
+    """
+
+    date = models.DateField(verbose_name="Jour")
+    offer = models.ForeignKey('payments.Offer', on_delete=models.SET_NULL, null=True, blank=True, related_name='daily_revenues', verbose_name="Offre")
+    currency = models.CharField(max_length=3, default='EUR', verbose_name="Devise")
+    payment_count = models.PositiveIntegerField(default=0, verbose_name="Nombre de paiements")
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Montant")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Mis à jour le")
+
+    class Meta:
+        verbose_name = "Revenu journalier"
+        verbose_name_plural = "Revenus journaliers"
+        ordering = ['-date']
+        unique_together = ['date', 'offer', 'currency']
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - {self.offer_id} - {self.amount} {self.currency}"
@@ -0,0 +1,46 @@
+from django.db import models
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+class SubscriptionTransition(models.Model):
+    """
+    Journal des changements d'état des abonnements (création, expiration,
+    annulation). Chaque transition est écrite une seule fois ; les
+    traitements en aval la consomment depuis leur curseur
+    (SubscriptionTransitionCursor).
+    """
+
+    subscription = models.ForeignKey('payments.Subscription', on_delete=models.CASCADE, related_name='transitions', verbose_name="Abonnement")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='subscription_transitions', verbose_name="Utilisateur")
+    from_status = models.CharField(max_length=50, blank=True, verbose_name="Ancien statut")
+    to_status = models.CharField(max_length=50, verbose_name="Nouveau statut")
+    reason = models.CharField(max_length=100, blank=True, verbose_name="Raison")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Créée le")
+
+    class Meta:
+        verbose_name = "Transition d'abonnement"
+        verbose_name_plural = "Transitions d'abonnement"
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['to_status', 'id']),
+        ]
+
+    def __str__(self):
+        return f"Abonnement #{self.subscription_id} : {self.from_status or '∅'} → {self.to_status}"
+
+
+class SubscriptionTransitionCursor(models.Model):
+    """Dernière transition traitée par un consommateur du journal"""
+
+    consumer = models.CharField(max_length=100, unique=True, verbose_name="Consommateur")
+    last_id = models.BigIntegerField(default=0, verbose_name="Dernière transition traitée")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Modifié le")
+
+    class Meta:
+        verbose_name = "Curseur de transitions"
+        verbose_name_plural = "Curseurs de transitions"
+
+    def __str__(self):
+        return f"{self.consumer} : #{self.last_id}"
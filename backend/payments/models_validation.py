@@ -0,0 +1,57 @@
+from django.db import models
+from django.utils import timezone
+
+
+class PaymentValidationStep(models.Model):
+    """
+    Étape du traitement post-validation d'un paiement (PDF, email, Telegram).
+    Une ligne par (paiement, étape) : l'état est durable et chaque étape
+    n'est exécutée avec succès qu'une seule fois.
+    """
+
+    STEP_CHOICES = [
+        ('invoice_pdf', 'Génération du PDF de facture'),
+        ('invoice_email', 'Envoi de la facture par email'),
+        ('telegram_token', 'Token et notification Telegram'),
+        ('telegram_message', 'Message Telegram'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'En attente'),
+        ('running', 'En cours'),
+        ('done', 'Terminée'),
+        ('failed', 'Échec'),
+    ]
+
+    payment = models.ForeignKey('payments.Payment', on_delete=models.CASCADE, related_name='validation_steps', verbose_name="Paiement")
+    step = models.CharField(max_length=30, choices=STEP_CHOICES, verbose_name="Étape")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name="Statut")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Tentatives")
+    last_error = models.TextField(blank=True, verbose_name="Dernière erreur")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Démarrée le")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Terminée le")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Créée le")
+
+    class Meta:
+        verbose_name = "Étape post-validation"
+        verbose_name_plural = "Étapes post-validation"
+        ordering = ['payment', 'id']
+        unique_together = ['payment', 'step']
+        indexes = [
+            models.Index(fields=['status', 'started_at']),
+        ]
+
+    def __str__(self):
+        return f"Paiement #{self.payment_id} - {self.step} ({self.status})"
+
+    def mark_done(self):
+        self.status = 'done'
+        self.finished_at = timezone.now()
+        self.last_error = ''
+        self.save(update_fields=['status', 'finished_at', 'last_error'])
+
+    def mark_failed(self, error):
+        self.status = 'failed'
+        self.finished_at = timezone.now()
+        self.last_error = str(error)[:2000]
+        self.save(update_fields=['status', 'finished_at', 'last_error'])
@@ -0,0 +1,78 @@
+"""
+Cache des PDF de factures
+
+Chaque PDF est stocké (default_storage : disque local ou stockage objet) sous
+une clé dérivée de la facture et de la version du gabarit :
+sha256(id, updated_at, TEMPLATE_VERSION). Toute modification de la facture
+(ou de ses articles, qui réenregistrent la facture) ou du gabarit produit une
+nouvelle clé ; l'ancien fichier n'est simplement plus référencé.
+
+La clé sert aussi d'ETag : un client qui possède déjà la version courante
+reçoit un 304 sans lecture du fichier.
+"""
+import hashlib
+import logging
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.http import FileResponse
+from django.utils.cache import get_conditional_response
+
+from .pdf_generator import InvoicePDFGenerator, TEMPLATE_VERSION
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = 'invoices/cache'
+
+
+def invoice_pdf_key(invoice):
+    """Clé de contenu du PDF de la facture"""
+    updated_at = invoice.updated_at.isoformat() if invoice.updated_at else ''
+    raw = f"{invoice.id}:{updated_at}:{TEMPLATE_VERSION}"
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+def invoice_pdf_path(invoice):
+    return f"{CACHE_DIR}/{invoice.id}-{invoice_pdf_key(invoice)}.pdf"
+
+
+def get_invoice_pdf_path(invoice):
+    """Chemin du PDF en cache, généré et stocké au premier accès"""
+    path = invoice_pdf_path(invoice)
+    if default_storage.exists(path):
+        return path
+
+    pdf = InvoicePDFGenerator(invoice).generate_pdf().getvalue()
+    saved = default_storage.save(path, ContentFile(pdf))
+    if saved != path:
+        # Généré en parallèle par un autre processus : garder le premier
+        default_storage.delete(saved)
+    logger.info(f"📄 PDF de la facture {invoice.invoice_number} mis en cache")
+    return path
+
+
+def get_invoice_pdf_bytes(invoice):
+    """Contenu du PDF de la facture (depuis le cache)"""
+    with default_storage.open(get_invoice_pdf_path(invoice), 'rb') as f:
+        return f.read()
+
+
+def invoice_pdf_response(request, invoice):
+    """
+    Réponse de téléchargement du PDF : 304 si l'ETag du client est à jour,
+    sinon le fichier en cache servi en streaming (FileResponse)
+    """
+    etag = f'"{invoice_pdf_key(invoice)}"'
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    response = FileResponse(
+        default_storage.open(get_invoice_pdf_path(invoice), 'rb'),
+        as_attachment=True,
+        filename=f"facture_{invoice.invoice_number}.pdf",
+        content_type='application/pdf'
+    )
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -7,6 +7,7 @@ from reportlab.lib.enums import TA_LEFT, TA_RIGHT, TA_CENTER
 from reportlab.lib import colors
 from reportlab.pdfgen import canvas
 from io import BytesIO
+from functools import lru_cache
 import os
 from django.conf import settings
 from django.http import HttpResponse
@@ -20,6 +21,151 @@ BLUE_ACCENT = Color(0.2, 0.4, 0.8)      # #3366CC - Bleu accent
 GRAY_LIGHT = Color(0.95, 0.95, 0.95)    # #F2F2F2 - Gris clair
 GRAY_DARK = Color(0.3, 0.3, 0.3)        # #4D4D4D - Gris foncé
 
+# Version du gabarit : à incrémenter à chaque modification de la mise en page
+# (les PDF déjà en cache sont alors régénérés)
+TEMPLATE_VERSION = 1
+
+# Styles de tableaux statiques, construits une seule fois par processus
+INFO_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 0),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+])
+
+DETAILS_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('TEXTCOLOR', (0, 0), (0, -1), GRAY_DARK),
+    ('TEXTCOLOR', (1, 0), (1, -1), black),
+    ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 0),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+    ('TOPPADDING', (0, 0), (-1, -1), 3),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+])
+
+ITEMS_TABLE_STYLE = TableStyle([
+    # En-tête
+    ('BACKGROUND', (0, 0), (-1, 0), GOLD_PRIMARY),
+    ('TEXTCOLOR', (0, 0), (-1, 0), white),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
+    
+    # Corps du tableau
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('ALIGN', (0, 1), (0, -1), 'LEFT'),  # Description
+    ('ALIGN', (1, 1), (1, -1), 'CENTER'),  # Quantité
+    ('ALIGN', (2, 1), (3, -1), 'RIGHT'),  # Prix
+    ('VALIGN', (0, 1), (-1, -1), 'TOP'),
+    
+    # Bordures
+    ('GRID', (0, 0), (-1, -1), 0.5, black),
+    ('LINEBELOW', (0, 0), (-1, 0), 2, GOLD_DARK),
+    
+    # Alternance des couleurs
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, GRAY_LIGHT]),
+    
+    # Padding
+    ('LEFTPADDING', (0, 0), (-1, -1), 6),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+])
+
+TOTALS_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -2), 10),
+    ('FONTSIZE', (0, -1), (-1, -1), 14),  # Total TTC plus grand
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),  # Total TTC en gras
+    ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('TEXTCOLOR', (0, -1), (-1, -1), GOLD_PRIMARY),  # Total TTC en gold
+    ('BACKGROUND', (0, -1), (-1, -1), GOLD_LIGHT),  # Fond gold pour le total
+    ('LEFTPADDING', (0, 0), (-1, -1), 6),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+])
+
+SIGNATURE_LINE_STYLE = TableStyle([
+    ('LINEBELOW', (0, 0), (0, 0), 1, black),
+])
+
+
+@lru_cache(maxsize=None)
+def get_invoice_styles():
+    """Feuille de styles des factures, construite une seule fois par processus"""
+    styles = getSampleStyleSheet()
+    
+    # Style pour le titre principal
+    styles.add(ParagraphStyle(
+        name='InvoiceTitle',
+        parent=styles['Title'],
+        fontSize=24,
+        textColor=GOLD_PRIMARY,
+        spaceAfter=12,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    ))
+    
+    # Style pour les sous-titres
+    styles.add(ParagraphStyle(
+        name='SectionTitle',
+        parent=styles['Heading2'],
+        fontSize=14,
+        textColor=GOLD_DARK,
+        spaceAfter=6,
+        fontName='Helvetica-Bold'
+    ))
+    
+    # Style pour les informations de l'entreprise
+    styles.add(ParagraphStyle(
+        name='CompanyInfo',
+        parent=styles['Normal'],
+        fontSize=10,
+        textColor=GRAY_DARK,
+        spaceAfter=3,
+        fontName='Helvetica'
+    ))
+    
+    # Style pour les informations du client
+    styles.add(ParagraphStyle(
+        name='CustomerInfo',
+        parent=styles['Normal'],
+        fontSize=10,
+        textColor=black,
+        spaceAfter=3,
+        fontName='Helvetica'
+    ))
+    
+    # Style pour les détails de facture
+    styles.add(ParagraphStyle(
+        name='InvoiceDetails',
+        parent=styles['Normal'],
+        fontSize=9,
+        textColor=GRAY_DARK,
+        spaceAfter=2,
+        fontName='Helvetica'
+    ))
+    
+    return styles
+
+
+@lru_cache(maxsize=None)
+def get_logo_bytes():
+    """Contenu du logo (lu une seule fois par processus), ou None"""
+    logo_path = os.path.join(settings.STATIC_ROOT or '', 'logo.png')
+    if not os.path.exists(logo_path):
+        return None
+    with open(logo_path, 'rb') as f:
+        return f.read()
+
+
 class InvoicePDFGenerator:
     """Générateur de factures PDF avec design Calmness Trading"""
     
@@ -34,68 +180,14 @@ class InvoicePDFGenerator:
             topMargin=20*mm,
             bottomMargin=20*mm
         )
-        self.styles = getSampleStyleSheet()
-        self._setup_styles()
-    
-    def _setup_styles(self):
-        """Configure les styles personnalisés"""
-        # Style pour le titre principal
-        self.styles.add(ParagraphStyle(
-            name='InvoiceTitle',
-            parent=self.styles['Title'],
-            fontSize=24,
-            textColor=GOLD_PRIMARY,
-            spaceAfter=12,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Style pour les sous-titres
-        self.styles.add(ParagraphStyle(
-            name='SectionTitle',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            textColor=GOLD_DARK,
-            spaceAfter=6,
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Style pour les informations de l'entreprise
-        self.styles.add(ParagraphStyle(
-            name='CompanyInfo',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            textColor=GRAY_DARK,
-            spaceAfter=3,
-            fontName='Helvetica'
-        ))
-        
-        # Style pour les informations du client
-        self.styles.add(ParagraphStyle(
-            name='CustomerInfo',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            textColor=black,
-            spaceAfter=3,
-            fontName='Helvetica'
-        ))
-        
-        # Style pour les détails de facture
-        self.styles.add(ParagraphStyle(
-            name='InvoiceDetails',
-            parent=self.styles['Normal'],
-            fontSize=9,
-            textColor=GRAY_DARK,
-            spaceAfter=2,
-            fontName='Helvetica'
-        ))
+        self.styles = get_invoice_styles()
     
     def _add_header(self, story):
         """Ajoute l'en-tête avec logo et informations de l'entreprise"""
         # Logo (si disponible)
-        logo_path = os.path.join(settings.STATIC_ROOT, 'logo.png')
-        if os.path.exists(logo_path):
-            logo = Image(logo_path, width=60*mm, height=20*mm)
+        logo_bytes = get_logo_bytes()
+        if logo_bytes:
+            logo = Image(BytesIO(logo_bytes), width=60*mm, height=20*mm)
             logo.hAlign = 'LEFT'
             story.append(logo)
             story.append(Spacer(1, 10*mm))
@@ -135,12 +227,7 @@ class InvoicePDFGenerator:
         ]
         
         info_table = Table(info_data, colWidths=[90*mm, 90*mm])
-        info_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 0),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-        ]))
+        info_table.setStyle(INFO_TABLE_STYLE)
         
         story.append(info_table)
         story.append(Spacer(1, 15*mm))
@@ -160,18 +247,7 @@ class InvoicePDFGenerator:
             details_data.append(['Référence transaction', self.invoice.transaction_reference])
         
         details_table = Table(details_data, colWidths=[60*mm, 60*mm])
-        details_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 0), (0, -1), GRAY_DARK),
-            ('TEXTCOLOR', (1, 0), (1, -1), black),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 0),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-            ('TOPPADDING', (0, 0), (-1, -1), 3),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-        ]))
+        details_table.setStyle(DETAILS_TABLE_STYLE)
         
         story.append(details_table)
         story.append(Spacer(1, 15*mm))
@@ -199,36 +275,7 @@ class InvoicePDFGenerator:
         
         # Style du tableau
         table = Table(table_data, colWidths=[80*mm, 25*mm, 30*mm, 30*mm])
-        table.setStyle(TableStyle([
-            # En-tête
-            ('BACKGROUND', (0, 0), (-1, 0), GOLD_PRIMARY),
-            ('TEXTCOLOR', (0, 0), (-1, 0), white),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
-            
-            # Corps du tableau
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('ALIGN', (0, 1), (0, -1), 'LEFT'),  # Description
-            ('ALIGN', (1, 1), (1, -1), 'CENTER'),  # Quantité
-            ('ALIGN', (2, 1), (3, -1), 'RIGHT'),  # Prix
-            ('VALIGN', (0, 1), (-1, -1), 'TOP'),
-            
-            # Bordures
-            ('GRID', (0, 0), (-1, -1), 0.5, black),
-            ('LINEBELOW', (0, 0), (-1, 0), 2, GOLD_DARK),
-            
-            # Alternance des couleurs
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, GRAY_LIGHT]),
-            
-            # Padding
-            ('LEFTPADDING', (0, 0), (-1, -1), 6),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
+        table.setStyle(ITEMS_TABLE_STYLE)
         
         story.append(table)
         story.append(Spacer(1, 10*mm))
@@ -243,20 +290,7 @@ class InvoicePDFGenerator:
         ]
         
         totals_table = Table(totals_data, colWidths=[120*mm, 60*mm])
-        totals_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -2), 10),
-            ('FONTSIZE', (0, -1), (-1, -1), 14),  # Total TTC plus grand
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),  # Total TTC en gras
-            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('TEXTCOLOR', (0, -1), (-1, -1), GOLD_PRIMARY),  # Total TTC en gold
-            ('BACKGROUND', (0, -1), (-1, -1), GOLD_LIGHT),  # Fond gold pour le total
-            ('LEFTPADDING', (0, 0), (-1, -1), 6),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
+        totals_table.setStyle(TOTALS_TABLE_STYLE)
         
         story.append(totals_table)
         story.append(Spacer(1, 15*mm))
@@ -295,9 +329,7 @@ class InvoicePDFGenerator:
         
         # Ligne de signature
         signature_line = Table([['']], colWidths=[180*mm])
-        signature_line.setStyle(TableStyle([
-            ('LINEBELOW', (0, 0), (0, 0), 1, black),
-        ]))
+        signature_line.setStyle(SIGNATURE_LINE_STYLE)
         story.append(signature_line)
     
     def generate_pdf(self):
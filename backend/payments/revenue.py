@@ -0,0 +1,196 @@
+"""
+Statistiques de revenus (tableaux de bord support et admin)
+
+Les statistiques sont calculées par agrégats SQL sur la table pré-agrégée
+DailyRevenue (une ligne par jour, offre et devise) et non plus en chargeant
+tous les paiements en Python.
+
+DailyRevenue est recalculée à partir de Payment :
+- pour le jour courant après chaque validation de paiement (après commit)
+- chaque nuit sur les REFRESH_DAYS derniers jours (remboursements, paiements
+  créés ou modifiés hors validation)
+- intégralement via `manage.py rebuild_daily_revenue`
+"""
+import logging
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from .models import Payment
+from .models_revenue import DailyRevenue
+
+logger = logging.getLogger(__name__)
+
+REFRESH_DAYS = 35
+REBUILD_WINDOW_DAYS = 31
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def refresh_daily_revenue(dates):
+    """Recalculer les lignes DailyRevenue des jours donnés depuis Payment"""
+    dates = sorted(set(dates))
+    if not dates:
+        return 0
+
+    rows = (
+        Payment.objects
+        .filter(
+            status='completed',
+            paid_at__gte=_day_start(dates[0]),
+            paid_at__lt=_day_start(dates[-1] + timedelta(days=1))
+        )
+        .annotate(day=TruncDate('paid_at'))
+        .values('day', 'offer', 'currency')
+        .annotate(payment_count=Count('id'), amount=Sum('amount'))
+        .order_by()
+    )
+    wanted = set(dates)
+    aggregates = [
+        DailyRevenue(
+            date=row['day'],
+            offer_id=row['offer'],
+            currency=row['currency'],
+            payment_count=row['payment_count'],
+            amount=row['amount'],
+        )
+        for row in rows if row['day'] in wanted
+    ]
+
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                DailyRevenue.objects.filter(date__in=dates).delete()
+                DailyRevenue.objects.bulk_create(aggregates)
+            break
+        except IntegrityError:
+            # Recalcul concurrent des mêmes jours : le suivant l'emporte
+            if attempt:
+                raise
+    return len(aggregates)
+
+
+def refresh_revenue_after_commit(day):
+    """Planifier le recalcul d'un jour après le commit de la transaction courante"""
+    def refresh():
+        try:
+            refresh_daily_revenue([day])
+        except Exception as e:
+            logger.error(f"❌ Erreur recalcul des revenus du {day} : {e}")
+
+    transaction.on_commit(refresh)
+
+
+def refresh_recent_revenue(days=REFRESH_DAYS):
+    today = timezone.localdate()
+    return refresh_daily_revenue([today - timedelta(days=offset) for offset in range(days)])
+
+
+def rebuild_daily_revenue(since=None):
+    """Reconstruire DailyRevenue depuis `since` (par défaut le premier paiement)"""
+    if since is None:
+        first_payment = Payment.objects.order_by('paid_at').values_list('paid_at', flat=True).first()
+        if first_payment is None:
+            DailyRevenue.objects.all().delete()
+            return 0
+        since = timezone.localdate(first_payment)
+
+    today = timezone.localdate()
+    rows = 0
+    start = since
+    while start <= today:
+        end = min(start + timedelta(days=REBUILD_WINDOW_DAYS - 1), today)
+        rows += refresh_daily_revenue([start + timedelta(days=offset) for offset in range((end - start).days + 1)])
+        start = end + timedelta(days=1)
+    return rows
+
+
+def _amount(value):
+    return float(value or 0)
+
+
+def get_revenue_stats(months=12):
+    """
+    Totaux, comparaison mois courant / mois précédent, séries mensuelles et
+    répartitions par offre et par devise
+    """
+    today = timezone.localdate()
+    current_month = today.replace(day=1)
+    last_month = (current_month - timedelta(days=1)).replace(day=1)
+    first_month = current_month
+    for _ in range(months - 1):
+        first_month = (first_month - timedelta(days=1)).replace(day=1)
+
+    totals = DailyRevenue.objects.aggregate(
+        total_revenue=Sum('amount'),
+        total_transactions=Sum('payment_count'),
+        this_month=Sum('amount', filter=Q(date__gte=current_month)),
+        last_month=Sum('amount', filter=Q(date__gte=last_month, date__lt=current_month)),
+    )
+    this_month = _amount(totals['this_month'])
+    last_month_revenue = _amount(totals['last_month'])
+
+    growth = 0
+    if last_month_revenue > 0:
+        growth = ((this_month - last_month_revenue) / last_month_revenue) * 100
+
+    monthly = (
+        DailyRevenue.objects
+        .filter(date__gte=first_month)
+        .annotate(month=TruncMonth('date'))
+        .values('month', 'currency')
+        .annotate(revenue=Sum('amount'), count=Sum('payment_count'))
+        .order_by('month', 'currency')
+    )
+    by_offer = (
+        DailyRevenue.objects
+        .values('offer', 'offer__name', 'currency')
+        .annotate(revenue=Sum('amount'), count=Sum('payment_count'))
+        .order_by('-revenue')
+    )
+    by_currency = (
+        DailyRevenue.objects
+        .values('currency')
+        .annotate(revenue=Sum('amount'), count=Sum('payment_count'))
+        .order_by('-revenue')
+    )
+
+    return {
+        'total_revenue': _amount(totals['total_revenue']),
+        'this_month': this_month,
+        'last_month': last_month_revenue,
+        'growth': growth,
+        'total_transactions': totals['total_transactions'] or 0,
+        'offer_stats': [
+            {
+                'offer_id': row['offer'],
+                'name': row['offer__name'] or 'Offre inconnue',
+                'count': row['count'],
+                'revenue': _amount(row['revenue']),
+                'currency': row['currency'],
+            }
+            for row in by_offer
+        ],
+        'currency_stats': [
+            {'currency': row['currency'], 'count': row['count'], 'revenue': _amount(row['revenue'])}
+            for row in by_currency
+        ],
+        'monthly': [
+            {
+                'month': row['month'].strftime('%Y-%m'),
+                'currency': row['currency'],
+                'count': row['count'],
+                'revenue': _amount(row['revenue']),
+            }
+            for row in monthly
+        ],
+    }
+
+
+def get_total_revenue():
+    return _amount(DailyRevenue.objects.aggregate(total=Sum('amount'))['total'])
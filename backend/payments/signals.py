@@ -0,0 +1,13 @@
+"""Signaux de l'application payments"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .cache_offers import offers_cache
+from .models import Offer
+
+
+@receiver([post_save, post_delete], sender=Offer)
+def invalidate_offers_cache(sender, **kwargs):
+    """Le catalogue public est reconstruit après le commit de la modification"""
+    transaction.on_commit(offers_cache.invalidate)
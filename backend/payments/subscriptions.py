@@ -0,0 +1,179 @@
+"""
+État des abonnements
+
+Point d'entrée unique pour les requêtes « actif à l'instant t », « expire
+dans la fenêtre » et « expiré depuis », avec les mêmes prédicats partout
+(index (status, end_date) et index partiel sur end_date des abonnements
+actifs).
+
+Les changements d'état passent par ce module (change_status,
+record_created, expire_due_subscriptions) et sont journalisés une seule fois
+dans SubscriptionTransition. Les traitements en aval consomment ce journal
+depuis leur curseur (consume_transitions) au lieu de rebalayer les
+abonnements : le retrait des canaux privés (manage_channel_members) ne lit
+que les transitions vers 'expired' / 'cancelled' survenues depuis son
+dernier passage.
+"""
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Subscription
+from .models_subscription import SubscriptionTransition, SubscriptionTransitionCursor
+
+logger = logging.getLogger(__name__)
+
+EXPIRE_BATCH_SIZE = 500
+TRANSITION_BATCH_SIZE = 500
+# Transitions qui mettent fin à l'accès (retrait des canaux privés)
+ENDED_STATUSES = ('expired', 'cancelled')
+
+
+def _base(queryset):
+    return Subscription.objects.all() if queryset is None else queryset
+
+
+def active_at(t=None, queryset=None):
+    """Abonnements actifs à l'instant t"""
+    t = t or timezone.now()
+    return _base(queryset).filter(status='active', start_date__lte=t, end_date__gt=t)
+
+
+def expiring_within(window, t=None, queryset=None):
+    """Abonnements actifs dont la fin tombe dans ]t, t + window]"""
+    t = t or timezone.now()
+    return _base(queryset).filter(status='active', end_date__gt=t, end_date__lte=t + window)
+
+
+def expired_since(since, t=None, queryset=None):
+    """Abonnements arrivés à échéance dans ]since, t] (hors annulations)"""
+    t = t or timezone.now()
+    return _base(queryset).filter(status__in=['active', 'expired'], end_date__gt=since, end_date__lte=t)
+
+
+def due_for_expiry(t=None, queryset=None):
+    """Abonnements encore marqués actifs mais arrivés à échéance"""
+    t = t or timezone.now()
+    return _base(queryset).filter(status='active', end_date__lte=t)
+
+
+def record_created(subscriptions, reason='payment_validated'):
+    """Journaliser la création d'abonnements (déjà enregistrés)"""
+    SubscriptionTransition.objects.bulk_create([
+        SubscriptionTransition(
+            subscription=subscription,
+            user_id=subscription.user_id,
+            from_status='',
+            to_status=subscription.status,
+            reason=reason,
+        )
+        for subscription in subscriptions
+    ])
+
+
+def change_status(subscription, to_status, reason='', extra_fields=()):
+    """
+    Changer le statut d'un abonnement. L'UPDATE conditionnel sur l'ancien
+    statut garantit une seule transition journalisée même en concurrence.
+    Retourne True si la transition a eu lieu.
+    """
+    from_status = subscription.status
+    if from_status == to_status:
+        return False
+
+    with transaction.atomic():
+        updated = Subscription.objects.filter(id=subscription.id, status=from_status).update(
+            status=to_status,
+            updated_at=timezone.now(),
+            **{field: getattr(subscription, field) for field in extra_fields}
+        )
+        if not updated:
+            return False
+        SubscriptionTransition.objects.create(
+            subscription=subscription,
+            user_id=subscription.user_id,
+            from_status=from_status,
+            to_status=to_status,
+            reason=reason,
+        )
+
+    subscription.status = to_status
+    return True
+
+
+def expire_due_subscriptions(t=None, batch_size=EXPIRE_BATCH_SIZE):
+    """
+    Passer en 'expired' les abonnements actifs arrivés à échéance, par lots,
+    en journalisant une transition par abonnement. Retourne le nombre expiré.
+    """
+    t = t or timezone.now()
+    expired = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                due_for_expiry(t)
+                .select_for_update(skip_locked=True)
+                .order_by('id')
+                .values('id', 'user_id')[:batch_size]
+            )
+            if not batch:
+                break
+
+            Subscription.objects.filter(
+                id__in=[row['id'] for row in batch], status='active'
+            ).update(status='expired', updated_at=timezone.now())
+            SubscriptionTransition.objects.bulk_create([
+                SubscriptionTransition(
+                    subscription_id=row['id'],
+                    user_id=row['user_id'],
+                    from_status='active',
+                    to_status='expired',
+                    reason='end_date_reached',
+                )
+                for row in batch
+            ])
+        expired += len(batch)
+
+    if expired:
+        logger.info(f"⏰ {expired} abonnement(s) expiré(s)")
+    return expired
+
+
+
+# ==================== CONSOMMATION DU JOURNAL ====================
+
+def transitions_since(last_id=0, to_statuses=None, limit=TRANSITION_BATCH_SIZE):
+    """Transitions postérieures à `last_id`, par id croissant (consommation incrémentale)"""
+    transitions = SubscriptionTransition.objects.filter(id__gt=last_id)
+    if to_statuses:
+        transitions = transitions.filter(to_status__in=to_statuses)
+    return transitions.select_related('subscription', 'subscription__offer', 'user').order_by('id')[:limit]
+
+
+def transition_cursor(consumer):
+    """Dernier id traité par `consumer` (0 s'il n'a jamais consommé le journal)"""
+    cursor = SubscriptionTransitionCursor.objects.filter(consumer=consumer).first()
+    return cursor.last_id if cursor else 0
+
+
+def consume_transitions(consumer, handle, to_statuses=None, batch_size=TRANSITION_BATCH_SIZE):
+    """
+    Passer à `handle(transitions)` les transitions postérieures au curseur de
+    `consumer`, par lots ; le curseur avance dans la même transaction que le
+    traitement du lot (verrou sur la ligne du curseur : un seul consommateur
+    de ce nom à la fois). Retourne le nombre de transitions traitées.
+    """
+    SubscriptionTransitionCursor.objects.get_or_create(consumer=consumer)
+    consumed = 0
+    while True:
+        with transaction.atomic():
+            cursor = SubscriptionTransitionCursor.objects.select_for_update().get(consumer=consumer)
+            batch = list(transitions_since(cursor.last_id, to_statuses, limit=batch_size))
+            if not batch:
+                break
+            handle(batch)
+            cursor.last_id = batch[-1].id
+            cursor.save(update_fields=['last_id', 'updated_at'])
+        consumed += len(batch)
+    return consumed
@@ -0,0 +1,217 @@
+"""
+Tasks Celery du post-traitement des paiements validés
+"""
+from celery import shared_task, group, chain
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from datetime import timedelta
+import logging
+
+from .models_validation import PaymentValidationStep
+
+logger = logging.getLogger(__name__)
+
+# Une étape 'running' depuis plus longtemps est considérée comme abandonnée (worker arrêté)
+STALE_RUNNING_AFTER = timedelta(minutes=15)
+STEP_RETRY_KWARGS = {'max_retries': 3, 'countdown': 30}
+
+
+def _claim_step(payment_id, step):
+    """
+    Passer l'étape en 'running' si elle n'est ni terminée ni déjà en cours.
+    L'UPDATE conditionnel garantit qu'un seul worker l'exécute.
+    """
+    stale = timezone.now() - STALE_RUNNING_AFTER
+    claimed = PaymentValidationStep.objects.filter(
+        Q(status__in=['pending', 'failed']) | Q(status='running', started_at__lt=stale),
+        payment_id=payment_id,
+        step=step,
+    ).update(status='running', attempts=F('attempts') + 1, started_at=timezone.now())
+    if not claimed:
+        return None
+    return PaymentValidationStep.objects.select_related(
+        'payment', 'payment__user', 'payment__offer', 'payment__invoice', 'payment__pending_payment'
+    ).get(payment_id=payment_id, step=step)
+
+
+def _run_step(task, payment_id, step_name, action):
+    step = _claim_step(payment_id, step_name)
+    if step is None:
+        return f"{step_name} #{payment_id}: skipped"
+
+    try:
+        action(step.payment)
+    except Exception as e:
+        step.mark_failed(e)
+        logger.error(f"❌ Étape {step_name} du paiement #{payment_id} : {e}")
+        if task.request.retries < STEP_RETRY_KWARGS['max_retries']:
+            raise task.retry(exc=e, **STEP_RETRY_KWARGS)
+        return f"{step_name} #{payment_id}: failed"
+
+    step.mark_done()
+    return f"{step_name} #{payment_id}: done"
+
+
+# ==================== ÉTAPES ====================
+
+def _render_invoice_pdf(payment):
+    from .pdf_cache import get_invoice_pdf_path
+
+    if payment.invoice is not None:
+        get_invoice_pdf_path(payment.invoice)
+
+
+def _send_invoice_email(payment):
+    from .pdf_cache import get_invoice_pdf_bytes
+    from .utils import send_invoice_email
+
+    invoice = payment.invoice
+    if invoice is None:
+        return
+    user_info = payment.pending_payment.user_info if payment.pending_payment else {}
+    user_email = user_info.get('email') or payment.user.email
+    if not user_email:
+        return
+
+    pdf_content = get_invoice_pdf_bytes(invoice)
+    if not send_invoice_email(invoice, user_email, pdf_content=pdf_content):
+        raise RuntimeError(f"Échec de l'envoi de la facture à {user_email}")
+
+
+def _issue_telegram_token(payment):
+    from accounts.models_telegram import TelegramBotToken, TelegramNotification
+
+    # Idempotence : un seul token par paiement
+    if TelegramBotToken.objects.filter(payment_id=payment.id).exists():
+        return
+
+    bot_token = TelegramBotToken.generate_token(
+        user=payment.user,
+        payment_id=payment.id,
+        transaction_id=payment.transaction_id,
+        expiry_hours=24
+    )
+
+    bot_username = settings.TELEGRAM_BOT_USERNAME
+    if bot_username:
+        bot_link = f"https://t.me/{bot_username}?start={bot_token.token}"
+        TelegramNotification.objects.create(
+            user=payment.user,
+            notification_type='payment_verified',
+            title='🎉 Paiement validé !',
+            message=f'Votre paiement a été validé avec succès. Cliquez sur le lien ci-dessous pour accéder à votre canal Telegram privé : {settings.TELEGRAM_CHANNEL_NAME}',
+            action_url=bot_link,
+            metadata={
+                'payment_id': payment.id,
+                'token': bot_token.token,
+                'expires_at': bot_token.expires_at.isoformat(),
+                'offer_name': payment.offer.name
+            }
+        ).mark_as_sent(via_site=True)
+        logger.info(f"✅ Token Telegram généré pour {payment.user.username}")
+
+
+def _send_telegram_message(payment):
+    from .utils import send_invoice_telegram
+
+    invoice = payment.invoice
+    user_info = payment.pending_payment.user_info if payment.pending_payment else {}
+    telegram_username = user_info.get('telegram_username')
+    if invoice is None or not telegram_username:
+        return
+    if not send_invoice_telegram(invoice, telegram_username):
+        raise RuntimeError(f"Échec de l'envoi Telegram à {telegram_username}")
+
+
+@shared_task(bind=True)
+def render_invoice_pdf(self, payment_id):
+    """Générer et stocker le PDF de la facture du paiement"""
+    return _run_step(self, payment_id, 'invoice_pdf', _render_invoice_pdf)
+
+
+@shared_task(bind=True)
+def send_invoice_email_step(self, payment_id):
+    """Envoyer la facture par email (après génération du PDF)"""
+    return _run_step(self, payment_id, 'invoice_email', _send_invoice_email)
+
+
+@shared_task(bind=True)
+def issue_telegram_token(self, payment_id):
+    """Générer le token d'accès au canal et la notification"""
+    return _run_step(self, payment_id, 'telegram_token', _issue_telegram_token)
+
+
+@shared_task(bind=True)
+def send_telegram_message(self, payment_id):
+    """Envoyer la confirmation de paiement par Telegram"""
+    return _run_step(self, payment_id, 'telegram_message', _send_telegram_message)
+
+
+def build_post_validation_graph(payment_ids):
+    """
+    Graphe des étapes pour un lot de paiements :
+    PDF → email, en parallèle du token Telegram et du message Telegram
+    """
+    signatures = []
+    for payment_id in payment_ids:
+        signatures.append(chain(render_invoice_pdf.si(payment_id), send_invoice_email_step.si(payment_id)))
+        signatures.append(issue_telegram_token.si(payment_id))
+        signatures.append(send_telegram_message.si(payment_id))
+    return group(signatures)
+
+
+@shared_task
+def resume_validation_steps():
+    """
+    Reprendre les étapes post-validation non terminées (broker indisponible
+    au moment de la validation, worker arrêté en cours d'étape...)
+    À exécuter toutes les 10 minutes
+    """
+    stale = timezone.now() - STALE_RUNNING_AFTER
+    payment_ids = list(
+        PaymentValidationStep.objects.filter(
+            Q(status='pending', created_at__lt=timezone.now() - timedelta(minutes=5)) |
+            Q(status='running', started_at__lt=stale)
+        ).values_list('payment_id', flat=True).distinct()[:500]
+    )
+    if payment_ids:
+        build_post_validation_graph(payment_ids).apply_async()
+    logger.info(f"🔁 {len(payment_ids)} paiement(s) avec étapes en attente replanifiés")
+    return f"Resumed {len(payment_ids)} payments"
+
+
+@shared_task
+def refresh_recent_revenue():
+    """
+    Recalculer les revenus journaliers des derniers jours (remboursements,
+    paiements modifiés hors validation)
+    À exécuter tous les jours
+    """
+    from .revenue import refresh_recent_revenue as refresh, REFRESH_DAYS
+
+    rows = refresh()
+    logger.info(f"📊 Revenus journaliers recalculés sur {REFRESH_DAYS} jours ({rows} lignes)")
+    return f"Refreshed {rows} daily revenue rows"
+
+
+@shared_task
+def expire_subscriptions():
+    """
+    Passer en 'expired' les abonnements arrivés à échéance (transitions journalisées)
+    À exécuter toutes les 15 minutes
+    """
+    from .subscriptions import expire_due_subscriptions
+
+    expired = expire_due_subscriptions()
+    return f"Expired {expired} subscriptions"
+
+
+@shared_task
+def render_invoice_pdfs(invoice_ids):
+    """Rendre (et mettre en cache) les PDF d'un lot de factures avant un export d'archive"""
+    from .archive import render_invoices
+
+    rendered = render_invoices(invoice_ids)
+    logger.info(f"🗜️ {rendered} PDF de facture(s) rendus pour l'export d'archive")
+    return rendered
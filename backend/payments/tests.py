@@ -1,3 +1,138 @@
+import io
+import smtplib
+import threading
+from datetime import timedelta
+
+from django.core.mail import EmailMessage
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import User
+from backend.mail import MailService
+from payments.models import Offer, Payment, Subscription
+from payments.models_subscription import SubscriptionTransition
+from payments.subscriptions import (
+    ENDED_STATUSES, change_status, consume_transitions, expire_due_subscriptions, transition_cursor,
+)
+
+
+class SubscriptionTransitionTests(TestCase):
+    """Journal des transitions et consommation par curseur"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='u@example.com', username='u', password='x')
+        self.user.telegram_username = 'tg'
+        self.user.save()
+        self.offer = Offer.objects.create(name='Signaux', offer_type='subscription', price=10, telegram_channel_id='-100')
+        self.payment = Payment.objects.create(user=self.user, offer=self.offer, amount=10)
+
+    def subscription(self, ends_in, **fields):
+        now = timezone.now()
+        return Subscription.objects.create(
+            user=self.user, offer=self.offer, payment=self.payment,
+            start_date=now - timedelta(days=30), end_date=now + ends_in, **fields
+        )
+
+    def manage_channel_members(self):
+        out = io.StringIO()
+        call_command('manage_channel_members', stdout=out)
+        return out.getvalue()
+
+    def test_consumer_reads_each_transition_once(self):
+        due = self.subscription(timedelta(hours=-1))
+        cancelled = self.subscription(timedelta(days=10))
+        expire_due_subscriptions()
+        change_status(cancelled, 'cancelled', reason='test')
+
+        seen = []
+        self.assertEqual(consume_transitions('test', seen.extend, to_statuses=ENDED_STATUSES), 2)
+        self.assertEqual(sorted(t.subscription_id for t in seen), sorted([due.id, cancelled.id]))
+        self.assertEqual(consume_transitions('test', seen.extend, to_statuses=ENDED_STATUSES), 0)
+        self.assertEqual(transition_cursor('test'), SubscriptionTransition.objects.latest('id').id)
+
+    def test_manage_channel_members_removes_ended_subscriptions_from_transitions(self):
+        due = self.subscription(timedelta(hours=-1), telegram_added=True)
+        already_expired = self.subscription(timedelta(hours=-2), telegram_added=True)
+        expire_due_subscriptions()
+        active = self.subscription(timedelta(days=10), telegram_added=True)
+
+        output = self.manage_channel_members()
+
+        self.assertIn('Membres retirés: 2', output)
+        for subscription, added in ((due, False), (already_expired, False), (active, True)):
+            subscription.refresh_from_db()
+            self.assertEqual(subscription.telegram_added, added)
+
+        # Deuxième passage : aucune nouvelle transition, rien à retirer
+        self.assertIn('Membres retirés: 0', self.manage_channel_members())
+
+    def test_renewed_subscription_keeps_channel_access(self):
+        subscription = self.subscription(timedelta(hours=-1), telegram_added=True)
+        expire_due_subscriptions()
+        subscription.refresh_from_db()
+        subscription.end_date = timezone.now() + timedelta(days=30)
+        subscription.save(update_fields=['end_date'])
+        change_status(subscription, 'active', reason='renewed')
+
+        self.manage_channel_members()
+
+        subscription.refresh_from_db()
+        self.assertTrue(subscription.telegram_added)
+
+
+class FakeSMTPConnection:
+    """Connexion d'envoi factice ; `drop` messages échouent comme une connexion fermée par le serveur"""
+
+    def __init__(self, drop=0):
+        self.drop = drop
+        self.sent = []
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        if self.drop:
+            self.drop -= 1
+            raise smtplib.SMTPServerDisconnected('fermée')
+        self.sent.extend(messages)
+        return len(messages)
+
+
+class MailServiceTests(TestCase):
+    """Connexion SMTP réutilisée par thread"""
+
+    def service(self, drop=0):
+        self.connections = []
+
+        def factory(fail_silently=False):
+            self.connections.append(FakeSMTPConnection(drop if not self.connections else 0))
+            return self.connections[-1]
+
+        return MailService(connection_factory=factory)
+
+    def message(self, i=0):
+        return EmailMessage(subject=f'Test {i}', body='corps', to=[f'c{i}@example.com'])
+
+    def test_connection_is_reused_and_reopened_after_disconnect(self):
+        service = self.service(drop=1)
+
+        self.assertEqual(service.send_messages([self.message(i) for i in range(3)]), 3)
+
+        self.assertEqual(len(self.connections), 2)
+        self.assertEqual(len(self.connections[1].sent), 3)
+        self.assertEqual(service.stats, {'sent': 3, 'connections': 2, 'reconnections': 1})
+
+    def test_each_thread_uses_its_own_connection(self):
+        service = self.service()
+        service.send(self.message())
+        thread = threading.Thread(target=service.send, args=(self.message(1),))
+        thread.start()
+        thread.join()
+        service.send(self.message(2))
 
-# Create your tests here.
+        self.assertEqual([len(c.sent) for c in self.connections], [2, 1])
+        self.assertEqual(service.stats['connections'], 2)
@@ -30,10 +30,13 @@ urlpatterns = [
     path('admin/pending-payments/', views.AdminPendingPaymentListView.as_view(), name='admin_pending_payments'),
     path('admin/pending-payments/<int:pk>/', views.AdminPendingPaymentDetailView.as_view(), name='admin_pending_payment_detail'),
     path('admin/pending-payments/validate/', views.validate_pending_payment, name='validate_pending_payment'),
+    path('admin/pending-payments/validate-bulk/', views.validate_pending_payments_bulk, name='validate_pending_payments_bulk'),
     path('admin/pending-payments/<int:pk>/cancel/', views.cancel_pending_payment, name='cancel_pending_payment'),
     
     # ==================== ADMIN - PAIEMENTS ====================
     path('admin/payments/', views.PaymentListView.as_view(), name='admin_payments'),
+    path('admin/payments/<int:pk>/validation-status/', views.payment_validation_status, name='payment_validation_status'),
+    path('admin/payments/<int:pk>/validation-retry/', views.retry_payment_validation, name='retry_payment_validation'),
     
     # ==================== ADMIN - ABONNEMENTS ====================
     path('admin/subscriptions/', views.SubscriptionListView.as_view(), name='admin_subscriptions'),
@@ -2,109 +2,48 @@
 Fonctions utilitaires pour le système de paiement
 Envoi de factures par email et Telegram
 """
-from django.core.mail import EmailMessage
 from django.conf import settings
-from django.template.loader import render_to_string
 import os
 import requests
 
+from backend.mail import build_email, mail_service
 
-def send_invoice_email(invoice, recipient_email):
+
+def send_invoice_email(invoice, recipient_email, pdf_content=None):
     """
     Envoie la facture par email avec le PDF en pièce jointe
+    Le PDF déjà généré peut être fourni via `pdf_content`
     """
-    from .pdf_generator import generate_invoice_pdf
-    from .models_invoice import InvoiceItem
+    from .pdf_cache import get_invoice_pdf_bytes
     
     # Récupérer les articles de la facture
     items = invoice.items.all()
     
-    # Informations de l'entreprise
-    company_info = {
-        'name': "Calmness Trading",
-        'address': "123 Rue du Trading, 75001 Paris, France",
-        'phone': "+33 1 23 45 67 89",
-        'email': "contact@calmnesstrading.com",
-        'siret': "123 456 789 00012",
-        'tva_intra': "FRXX123456789",
-        'logo_path': os.path.join(settings.STATIC_ROOT or settings.BASE_DIR / 'static', 'img', 'logo.png')
-    }
-    
     # Générer le PDF
-    try:
-        pdf_content = generate_invoice_pdf(invoice, items, company_info)
-    except Exception as e:
-        print(f"Erreur génération PDF: {e}")
-        pdf_content = None
+    if pdf_content is None:
+        try:
+            pdf_content = get_invoice_pdf_bytes(invoice)
+        except Exception as e:
+            print(f"Erreur génération PDF: {e}")
+            pdf_content = None
     
-    # Sujet de l'email
-    subject = f"Votre facture Calmness Trading - {invoice.invoice_number}"
-    
-    # Corps de l'email (HTML)
-    html_message = f"""
-    <html>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                <div style="text-align: center; margin-bottom: 30px;">
-                    <h1 style="color: #D4AF37;">Calmness Trading</h1>
-                </div>
-                
-                <h2 style="color: #D4AF37;">Merci pour votre paiement !</h2>
-                
-                <p>Bonjour {invoice.user.first_name or invoice.user.username},</p>
-                
-                <p>Nous avons bien reçu votre paiement pour <strong>{items.first().description if items.exists() else 'votre commande'}</strong>.</p>
-                
-                <div style="background-color: #f5f5f5; padding: 15px; border-radius: 5px; margin: 20px 0;">
-                    <h3 style="margin-top: 0;">Détails de la facture</h3>
-                    <p><strong>Numéro de facture :</strong> {invoice.invoice_number}</p>
-                    <p><strong>Date :</strong> {invoice.issue_date.strftime('%d/%m/%Y')}</p>
-                    <p><strong>Montant :</strong> {invoice.total_amount} {invoice.currency}</p>
-                    <p><strong>Transaction ID :</strong> {invoice.transaction_id}</p>
-                </div>
-                
-                <p>Vous trouverez votre facture en pièce jointe de cet email.</p>
-                
-                <p>Votre accès au service sera activé dans les prochaines minutes.</p>
-                
-                <p style="margin-top: 30px;">
-                    Si vous avez des questions, n'hésitez pas à nous contacter :<br>
-                    📧 Email : <a href="mailto:support@calmnesstrading.com">support@calmnesstrading.com</a><br>
-                    📱 Telegram : @calmnesstrading<br>
-                    💬 WhatsApp : +33 1 23 45 67 89
-                </p>
-                
-                <hr style="margin: 30px 0; border: none; border-top: 1px solid #e0e0e0;">
-                
-                <p style="font-size: 12px; color: #666; text-align: center;">
-                    © 2024 Calmness Trading. Tous droits réservés.<br>
-                    123 Rue du Trading, 75001 Paris, France
-                </p>
-            </div>
-        </body>
-    </html>
-    """
-    
-    # Créer l'email
-    email = EmailMessage(
-        subject=subject,
-        body=html_message,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=[recipient_email]
+    first_item = items.first()
+    email = build_email(
+        subject=f"Votre facture Calmness Trading - {invoice.invoice_number}",
+        to=[recipient_email],
+        template='invoice',
+        context={
+            'invoice': invoice,
+            'customer_name': invoice.customer.first_name or invoice.customer.username,
+            'item_description': first_item.description if first_item else 'votre commande',
+        },
+        # Ajouter le PDF en pièce jointe si généré
+        attachments=[(f'facture_{invoice.invoice_number}.pdf', pdf_content, 'application/pdf')] if pdf_content else None,
     )
-    email.content_subtype = "html"
-    
-    # Ajouter le PDF en pièce jointe si généré
-    if pdf_content:
-        email.attach(
-            f'facture_{invoice.invoice_number}.pdf',
-            pdf_content,
-            'application/pdf'
-        )
     
-    # Envoyer l'email
+    # Envoyer l'email (connexion SMTP réutilisée par le processus)
     try:
-        email.send()
+        mail_service.send(email)
         print(f"Facture {invoice.invoice_number} envoyée à {recipient_email}")
         return True
     except Exception as e:
@@ -130,8 +69,8 @@ def send_invoice_telegram(invoice, telegram_username):
 Bonjour ! Nous avons bien reçu votre paiement.
 
 📄 *Facture :* {invoice.invoice_number}
-💰 *Montant :* {invoice.total_amount} {invoice.currency}
-🔖 *Transaction ID :* {invoice.transaction_id}
+💰 *Montant :* {invoice.total_ttc:.2f} €
+🔖 *Transaction ID :* {invoice.transaction_reference or '-'}
 📅 *Date :* {invoice.issue_date.strftime('%d/%m/%Y')}
 
 Votre facture a également été envoyée par email.
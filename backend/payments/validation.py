@@ -0,0 +1,304 @@
+"""
+Validation des paiements en attente
+
+La validation est découpée en deux temps :
+1. un noyau court et atomique (Payment, PendingPayment, Subscription,
+   PaymentHistory, Invoice, InvoiceItem et les lignes d'étapes), écrit en
+   bulk_create / bulk_update : la validation unitaire est un lot d'un seul
+   paiement, la validation groupée traite des lots de BULK_CHUNK_SIZE
+2. un graphe de tâches Celery lancé après le commit : PDF de facture puis
+   email, token/notification Telegram, message Telegram
+
+Chaque étape est suivie dans PaymentValidationStep ; les étapes restées en
+attente (broker indisponible, worker arrêté) sont reprises par la tâche
+périodique `resume_validation_steps`.
+"""
+import logging
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import PendingPayment, Payment, Subscription, PaymentHistory
+from .models_invoice import Invoice, InvoiceItem, InvoiceNumberCounter
+from .models_validation import PaymentValidationStep
+from .revenue import refresh_revenue_after_commit
+from .subscriptions import record_created
+
+logger = logging.getLogger(__name__)
+
+VALIDABLE_STATUSES = ['pending', 'transaction_submitted', 'contacted']
+POST_VALIDATION_STEPS = [step for step, _ in PaymentValidationStep.STEP_CHOICES]
+# Nombre de paiements validés par transaction en validation groupée
+BULK_CHUNK_SIZE = 100
+
+
+class ValidationError(Exception):
+    """Paiement en attente impossible à valider (déjà traité, introuvable...)"""
+
+
+def subscription_end_date(offer, start_date):
+    """Date de fin d'abonnement selon la durée de l'offre, ou None"""
+    if offer.offer_type != 'subscription':
+        return None
+    if offer.duration_days:
+        return start_date + timedelta(days=offer.duration_days)
+    if offer.duration_hours:
+        return start_date + timedelta(hours=offer.duration_hours)
+    if offer.duration_minutes:
+        return start_date + timedelta(minutes=offer.duration_minutes)
+    return None
+
+
+def _build_invoice(pending_payment, invoice_number, transaction_id, validated_by, now):
+    """Facture déjà payée (TVA et TTC calculés ici : bulk_create n'appelle pas save())"""
+    invoice = Invoice(
+        invoice_number=invoice_number,
+        customer=pending_payment.user,
+        issue_date=now.date(),
+        due_date=now.date(),
+        payment_date=now.date(),
+        subtotal_ht=pending_payment.amount,
+        tax_rate=Decimal('20.00'),
+        status='paid',
+        payment_method='bank_transfer',
+        transaction_reference=transaction_id or None,
+        created_by=validated_by,
+        notes=f"Facture pour le paiement de {pending_payment.offer.name}",
+    )
+    invoice.tax_amount = invoice.subtotal_ht * (invoice.tax_rate / 100)
+    invoice.total_ttc = invoice.subtotal_ht + invoice.tax_amount
+    return invoice
+
+
+def _validate_chunk(pending_payment_ids, validated_by, admin_notes='', transaction_ids=None):
+    """
+    Valider un lot de paiements en attente dans une seule transaction.
+    Toutes les lignes sont écrites par bulk_create / bulk_update (un INSERT
+    ou UPDATE par table). Retourne {pending_payment_id: (payment, subscription)
+    ou ValidationError}.
+    """
+    transaction_ids = transaction_ids or {}
+    outcomes = {}
+
+    with transaction.atomic():
+        pending_payments = {
+            pp.id: pp for pp in (
+                PendingPayment.objects
+                .select_for_update()
+                .select_related('user', 'offer')
+                .filter(id__in=pending_payment_ids)
+            )
+        }
+
+        valid = []
+        for pending_payment_id in pending_payment_ids:
+            pending_payment = pending_payments.get(pending_payment_id)
+            if pending_payment is None:
+                outcomes[pending_payment_id] = ValidationError('Paiement en attente non trouvé')
+            elif pending_payment.status not in VALIDABLE_STATUSES:
+                outcomes[pending_payment_id] = ValidationError('Ce paiement a déjà été traité')
+            else:
+                valid.append(pending_payment)
+
+        if not valid:
+            return outcomes
+
+        now = timezone.now()
+        for pending_payment in valid:
+            pending_payment.transaction_id = transaction_ids.get(pending_payment.id) or pending_payment.transaction_id
+
+        # Factures (numéros consécutifs) et leurs articles
+        invoice_numbers = InvoiceNumberCounter.allocate(len(valid))
+        invoices = Invoice.objects.bulk_create([
+            _build_invoice(pp, invoice_number, pp.transaction_id, validated_by, now)
+            for pp, invoice_number in zip(valid, invoice_numbers)
+        ])
+        InvoiceItem.objects.bulk_create([
+            InvoiceItem(
+                invoice=invoice,
+                description=pp.offer.name[:200],
+                detailed_description=pp.offer.description,
+                quantity=Decimal('1.00'),
+                unit_price_ht=pp.amount,
+                total_ht=pp.amount,
+            )
+            for pp, invoice in zip(valid, invoices)
+        ])
+
+        # Paiements validés
+        payments = Payment.objects.bulk_create([
+            Payment(
+                user=pp.user,
+                offer=pp.offer,
+                pending_payment=pp,
+                amount=pp.amount,
+                currency=pp.currency,
+                payment_method='manual',
+                status='completed',
+                transaction_id=pp.transaction_id,
+                validated_by=validated_by,
+                admin_notes=admin_notes,
+                invoice=invoice,
+            )
+            for pp, invoice in zip(valid, invoices)
+        ])
+
+        # Paiements en attente confirmés (updated_at explicite : bulk_update ignore auto_now)
+        for pp in valid:
+            pp.status = 'confirmed'
+            pp.validated_by = validated_by
+            pp.validated_at = now
+            pp.admin_notes = admin_notes
+            pp.updated_at = now
+        PendingPayment.objects.bulk_update(
+            valid, ['status', 'transaction_id', 'validated_by', 'validated_at', 'admin_notes', 'updated_at']
+        )
+
+        # Abonnements pour les offres de type abonnement
+        subscriptions = {}
+        for payment in payments:
+            end_date = subscription_end_date(payment.offer, now)
+            if end_date:
+                subscriptions[payment.pending_payment_id] = Subscription(
+                    user=payment.user,
+                    offer=payment.offer,
+                    payment=payment,
+                    start_date=now,
+                    end_date=end_date,
+                    status='active'
+                )
+        Subscription.objects.bulk_create(list(subscriptions.values()))
+        record_created(subscriptions.values())
+
+        PaymentHistory.objects.bulk_create([
+            PaymentHistory(
+                payment=payment,
+                pending_payment=payment.pending_payment,
+                action='validated',
+                description=f"Paiement validé pour {payment.offer.name}",
+                created_by=validated_by
+            )
+            for payment in payments
+        ])
+
+        PaymentValidationStep.objects.bulk_create([
+            PaymentValidationStep(payment=payment, step=step)
+            for payment in payments
+            for step in POST_VALIDATION_STEPS
+        ])
+
+        refresh_revenue_after_commit(timezone.localdate(now))
+
+    for payment in payments:
+        outcomes[payment.pending_payment_id] = (payment, subscriptions.get(payment.pending_payment_id))
+    return outcomes
+
+
+def validate_pending_payment_core(pending_payment_id, validated_by, transaction_id='', admin_notes=''):
+    """
+    Noyau transactionnel de la validation. Retourne (payment, subscription).
+    Les effets lents sont planifiés après le commit.
+    """
+    outcome = _validate_chunk(
+        [pending_payment_id], validated_by, admin_notes=admin_notes,
+        transaction_ids={pending_payment_id: transaction_id}
+    )[pending_payment_id]
+    if isinstance(outcome, ValidationError):
+        raise outcome
+
+    payment, subscription = outcome
+    transaction.on_commit(lambda: enqueue_post_validation([payment.id]))
+    return payment, subscription
+
+
+def parse_pending_payment_ids(raw_ids):
+    """
+    Identifiants entiers positifs, sans doublons, dans l'ordre reçu.
+    Lève ValueError si une valeur n'est ni un entier ni une chaîne d'entier.
+    """
+    ids = []
+    invalid = []
+    for raw_id in raw_ids:
+        try:
+            if isinstance(raw_id, bool) or not isinstance(raw_id, (int, str)):
+                raise ValueError
+            pending_payment_id = int(raw_id)
+            if pending_payment_id <= 0:
+                raise ValueError
+        except ValueError:
+            invalid.append(raw_id)
+            continue
+        ids.append(pending_payment_id)
+    if invalid:
+        raise ValueError(f"Identifiants invalides : {', '.join(repr(i) for i in invalid[:10])}")
+    return list(dict.fromkeys(ids))
+
+
+def validate_pending_payments_bulk(pending_payment_ids, validated_by, admin_notes='', chunk_size=BULK_CHUNK_SIZE):
+    """
+    Valider plusieurs paiements en attente, par lots de `chunk_size` (une
+    transaction par lot). Le post-traitement de tous les paiements validés
+    est planifié en un seul envoi. Retourne un résultat par identifiant.
+    Lève ValueError (avant toute écriture) si un identifiant est invalide.
+    """
+    ids = parse_pending_payment_ids(pending_payment_ids)
+    results = dict.fromkeys(ids)
+
+    payment_ids = []
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        try:
+            outcomes = _validate_chunk(chunk, validated_by, admin_notes=admin_notes)
+        except Exception as e:
+            logger.error(f"❌ Erreur lors de la validation du lot {chunk} : {e}")
+            outcomes = {i: ValidationError(f'Erreur lors de la validation: {e}') for i in chunk}
+
+        for pending_payment_id, outcome in outcomes.items():
+            if isinstance(outcome, ValidationError):
+                results[pending_payment_id] = {'success': False, 'error': str(outcome)}
+                continue
+            payment, subscription = outcome
+            payment_ids.append(payment.id)
+            results[pending_payment_id] = {
+                'success': True,
+                'payment_id': payment.id,
+                'invoice_number': payment.invoice.invoice_number,
+                'subscription_id': subscription.id if subscription else None,
+            }
+
+    transaction.on_commit(lambda: enqueue_post_validation(payment_ids))
+    logger.info(f"✅ Validation groupée : {len(payment_ids)}/{len(ids)} paiement(s) validé(s)")
+    return [{'pending_payment_id': i, **results[i]} for i in ids]
+
+
+def enqueue_post_validation(payment_ids):
+    """
+    Planifier le graphe post-validation de plusieurs paiements en un seul envoi.
+    En cas d'échec (broker indisponible), les étapes restent en attente et
+    seront reprises par `resume_validation_steps`.
+    """
+    from .tasks import build_post_validation_graph
+
+    if not payment_ids:
+        return
+    try:
+        build_post_validation_graph(payment_ids).apply_async()
+    except Exception as e:
+        logger.error(f"❌ Impossible de planifier le post-traitement de {payment_ids} : {e}")
+
+
+def get_validation_steps(payment_ids):
+    """Statut des étapes par paiement : {payment_id: [{step, status, ...}]}"""
+    steps = {}
+    for step in PaymentValidationStep.objects.filter(payment_id__in=payment_ids).order_by('id'):
+        steps.setdefault(step.payment_id, []).append({
+            'step': step.step,
+            'label': step.get_step_display(),
+            'status': step.status,
+            'attempts': step.attempts,
+            'last_error': step.last_error,
+            'finished_at': step.finished_at,
+        })
+    return steps
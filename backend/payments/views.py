@@ -1,8 +1,12 @@
 """Vues principales pour l'application payments"""
 from rest_framework import generics, permissions
+from rest_framework.exceptions import NotFound
+
+from backend.versioned_cache import cached_response
 
 from .models import Offer, ContactChannel
 from .serializers import OfferSerializer, ContactChannelSerializer
+from .cache_offers import offers_cache
 
 # Importer les vues des autres modules
 from .views_user import *
@@ -19,6 +23,10 @@ class OfferListView(generics.ListAPIView):
     
     def get_queryset(self):
         return Offer.objects.filter(is_active=True)
+    
+    def list(self, request, *args, **kwargs):
+        # Catalogue servi depuis le cache (aucune requête SQL, 304 si inchangé)
+        return cached_response(request, offers_cache)
 
 
 class OfferDetailView(generics.RetrieveAPIView):
@@ -26,6 +34,13 @@ class OfferDetailView(generics.RetrieveAPIView):
     serializer_class = OfferSerializer
     permission_classes = [permissions.AllowAny]
     queryset = Offer.objects.filter(is_active=True)
+    
+    def retrieve(self, request, *args, **kwargs):
+        offers, _ = offers_cache.get()
+        offer = next((o for o in offers if o['id'] == int(kwargs['pk'])), None)
+        if offer is None:
+            raise NotFound('Offre non trouvée')
+        return cached_response(request, offers_cache, transform=lambda _: offer)
 
 
 # ==================== CANAUX DE CONTACT ====================
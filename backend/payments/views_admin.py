@@ -8,12 +8,22 @@ from django.db.models import Sum
 from datetime import timedelta
 
 from .models import PendingPayment, Payment, Subscription, PaymentHistory
+from .models_validation import PaymentValidationStep
+from .subscriptions import active_at, expiring_within
+from .validation import (
+    ValidationError, validate_pending_payment_core, enqueue_post_validation, get_validation_steps,
+    validate_pending_payments_bulk as validate_pending_payments_bulk_core
+)
 from .serializers import (
     PendingPaymentSerializer, PendingPaymentUpdateSerializer,
     PaymentSerializer, SubscriptionSerializer, ValidatePaymentSerializer
 )
 
 
+# Nombre maximum de paiements par requête de validation groupée
+MAX_BULK_VALIDATION = 1000
+
+
 # ==================== PAIEMENTS EN ATTENTE (ADMIN) ====================
 
 class AdminPendingPaymentListView(generics.ListAPIView):
@@ -57,177 +67,114 @@ class AdminPendingPaymentDetailView(generics.RetrieveUpdateDestroyAPIView):
 @api_view(['POST'])
 @permission_classes([IsAdminUser])
 def validate_pending_payment(request):
-    """Valider un paiement en attente et créer un paiement validé + abonnement si applicable"""
+    """
+    Valider un paiement en attente et créer un paiement validé + abonnement si applicable
+    La facture PDF, l'email et les messages Telegram sont traités en arrière-plan
+    """
     
     serializer = ValidatePaymentSerializer(data=request.data)
     if not serializer.is_valid():
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    pending_payment_id = serializer.validated_data['pending_payment_id']
-    transaction_id = serializer.validated_data.get('transaction_id', '') or pending_payment.transaction_id
-    admin_notes = serializer.validated_data.get('admin_notes', '')
-    
     try:
-        pending_payment = PendingPayment.objects.select_related('user', 'offer').get(id=pending_payment_id)
-        
-        # Vérifier que le paiement est en attente ou transaction soumise
-        if pending_payment.status not in ['pending', 'transaction_submitted', 'contacted']:
-            return Response(
-                {'error': 'Ce paiement a déjà été traité'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Créer le paiement validé
-        payment = Payment.objects.create(
-            user=pending_payment.user,
-            offer=pending_payment.offer,
-            pending_payment=pending_payment,
-            amount=pending_payment.amount,
-            currency=pending_payment.currency,
-            payment_method='manual',
-            status='completed',
-            transaction_id=transaction_id,
-            validated_by=request.user,
-            admin_notes=admin_notes
-        )
-        
-        # Mettre à jour le paiement en attente
-        pending_payment.status = 'confirmed'
-        pending_payment.transaction_id = transaction_id
-        pending_payment.validated_by = request.user
-        pending_payment.validated_at = timezone.now()
-        pending_payment.admin_notes = admin_notes
-        pending_payment.save()
-        
-        # 🤖 GÉNÉRATION AUTOMATIQUE DU TOKEN TELEGRAM
-        try:
-            from accounts.models_telegram import TelegramBotToken, TelegramNotification
-            from django.conf import settings
-            
-            # Générer le token Telegram (valide 24h)
-            bot_token = TelegramBotToken.generate_token(
-                user=pending_payment.user,
-                payment_id=payment.id,
-                transaction_id=transaction_id,
-                expiry_hours=24
-            )
-            
-            # Générer le lien vers le bot
-            bot_username = settings.TELEGRAM_BOT_USERNAME
-            if bot_username:
-                bot_link = f"https://t.me/{bot_username}?start={bot_token.token}"
-                
-                # Créer une notification Telegram
-                TelegramNotification.objects.create(
-                    user=pending_payment.user,
-                    notification_type='payment_verified',
-                    title='🎉 Paiement validé !',
-                    message=f'Votre paiement a été validé avec succès. Cliquez sur le lien ci-dessous pour accéder à votre canal Telegram privé : {settings.TELEGRAM_CHANNEL_NAME}',
-                    action_url=bot_link,
-                    metadata={
-                        'payment_id': payment.id,
-                        'token': bot_token.token,
-                        'expires_at': bot_token.expires_at.isoformat(),
-                        'offer_name': pending_payment.offer.name
-                    }
-                ).mark_as_sent(via_site=True)
-                
-                print(f"✅ Token Telegram généré pour {pending_payment.user.username}")
-                print(f"🔗 Lien: {bot_link}")
-        except Exception as e:
-            # Ne pas bloquer la validation si la génération du token échoue
-            print(f"⚠️ Erreur génération token Telegram : {e}")
-            import traceback
-            traceback.print_exc()
-        
-        # Si c'est un abonnement, créer l'abonnement
-        subscription = None
-        if pending_payment.offer.offer_type == 'subscription' and pending_payment.offer.duration_days:
-            start_date = timezone.now()
-            end_date = start_date + timedelta(days=pending_payment.offer.duration_days)
-            
-            subscription = Subscription.objects.create(
-                user=pending_payment.user,
-                offer=pending_payment.offer,
-                payment=payment,
-                start_date=start_date,
-                end_date=end_date,
-                status='active'
-            )
-        
-        # Créer une entrée dans l'historique
-        PaymentHistory.objects.create(
-            payment=payment,
-            pending_payment=pending_payment,
-            action='validated',
-            description=f"Paiement validé pour {pending_payment.offer.name}",
-            created_by=request.user
-        )
-        
-        # Générer et envoyer la facture automatiquement
-        try:
-            from .models_invoice import Invoice, InvoiceItem
-            from .utils import send_invoice_email, send_invoice_telegram
-            
-            # Créer la facture
-            invoice = Invoice.objects.create(
-                user=pending_payment.user,
-                total_amount=pending_payment.amount,
-                currency=pending_payment.currency,
-                transaction_id=transaction_id,
-                status='paid',
-                created_by=request.user
-            )
-            
-            # Créer l'article de facture
-            InvoiceItem.objects.create(
-                invoice=invoice,
-                description=f"{pending_payment.offer.name} - {pending_payment.offer.description}",
-                quantity=1,
-                unit_price=pending_payment.amount,
-                total_price=pending_payment.amount
-            )
-            
-            # Lier la facture au paiement
-            payment.invoice = invoice
-            payment.save()
-            
-            # Envoyer la facture par email
-            user_email = pending_payment.user_info.get('email') or pending_payment.user.email
-            if user_email:
-                send_invoice_email(invoice, user_email)
-            
-            # Envoyer par Telegram si disponible
-            telegram_username = pending_payment.user_info.get('telegram_username')
-            if telegram_username:
-                send_invoice_telegram(invoice, telegram_username)
-                
-        except Exception as e:
-            # Ne pas bloquer si l'envoi échoue, juste logger
-            print(f"Erreur envoi facture: {e}")
-        
-        # Préparer la réponse
-        response_data = {
-            'message': 'Paiement validé avec succès. Facture envoyée au client.',
-            'payment': PaymentSerializer(payment).data,
-            'pending_payment': PendingPaymentSerializer(pending_payment).data
-        }
-        
-        if subscription:
-            response_data['subscription'] = SubscriptionSerializer(subscription).data
-        
-        return Response(response_data, status=status.HTTP_201_CREATED)
-        
-    except PendingPayment.DoesNotExist:
-        return Response(
-            {'error': 'Paiement en attente non trouvé'},
-            status=status.HTTP_404_NOT_FOUND
+        payment, subscription = validate_pending_payment_core(
+            serializer.validated_data['pending_payment_id'],
+            request.user,
+            transaction_id=serializer.validated_data.get('transaction_id', ''),
+            admin_notes=serializer.validated_data.get('admin_notes', '')
         )
+    except ValidationError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response(
             {'error': f'Erreur lors de la validation: {str(e)}'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+    
+    # Préparer la réponse
+    response_data = {
+        'message': 'Paiement validé avec succès. La facture est en cours d\'envoi au client.',
+        'payment': PaymentSerializer(payment).data,
+        'pending_payment': PendingPaymentSerializer(payment.pending_payment).data,
+        'post_validation': get_validation_steps([payment.id]).get(payment.id, [])
+    }
+    
+    if subscription:
+        response_data['subscription'] = SubscriptionSerializer(subscription).data
+    
+    return Response(response_data, status=status.HTTP_201_CREATED)
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def validate_pending_payments_bulk(request):
+    """Valider plusieurs paiements en attente (résultat par paiement)"""
+    
+    pending_payment_ids = request.data.get('pending_payment_ids') or []
+    if not isinstance(pending_payment_ids, list) or not pending_payment_ids:
+        return Response(
+            {'error': 'pending_payment_ids doit être une liste non vide'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(pending_payment_ids) > MAX_BULK_VALIDATION:
+        return Response(
+            {'error': f'Maximum {MAX_BULK_VALIDATION} paiements par requête'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        results = validate_pending_payments_bulk_core(
+            pending_payment_ids,
+            request.user,
+            admin_notes=request.data.get('admin_notes', '')
+        )
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'validated': sum(1 for r in results if r['success']),
+        'failed': sum(1 for r in results if not r['success']),
+        'results': results
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def payment_validation_status(request, pk):
+    """Statut des étapes post-validation d'un paiement"""
+    
+    if not Payment.objects.filter(id=pk).exists():
+        return Response(
+            {'error': 'Paiement non trouvé'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    steps = get_validation_steps([pk]).get(pk, [])
+    return Response({
+        'payment_id': pk,
+        'completed': all(s['status'] == 'done' for s in steps),
+        'steps': steps
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def retry_payment_validation(request, pk):
+    """Relancer les étapes post-validation en échec d'un paiement"""
+    
+    retried = PaymentValidationStep.objects.filter(
+        payment_id=pk,
+        status='failed'
+    ).update(status='pending', last_error='')
+    
+    if retried:
+        enqueue_post_validation([pk])
+    
+    return Response({
+        'payment_id': pk,
+        'retried_steps': retried,
+        'steps': get_validation_steps([pk]).get(pk, [])
+    })
 
 
 @api_view(['POST'])
@@ -313,17 +260,10 @@ def admin_dashboard(request):
     total_revenue = completed_payments.aggregate(total=Sum('amount'))['total'] or 0
     
     # Abonnements actifs
-    active_subscriptions = Subscription.objects.filter(
-        status='active',
-        end_date__gt=timezone.now()
-    ).count()
+    active_subscriptions = active_at().count()
     
     # Abonnements expirant dans les 7 prochains jours
-    expiring_soon = Subscription.objects.filter(
-        status='active',
-        end_date__lte=timezone.now() + timedelta(days=7),
-        end_date__gt=timezone.now()
-    ).count()
+    expiring_soon = expiring_within(timedelta(days=7)).count()
     
     # Derniers paiements en attente
     recent_pending = PendingPayment.objects.filter(
@@ -1,7 +1,7 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.utils import timezone
 from django.db import transaction
 from django.core.exceptions import ValidationError
@@ -15,6 +15,11 @@ import uuid
 from datetime import datetime, timedelta
 
 from .models_invoice import Invoice, InvoiceItem, InvoiceTemplate
+from .pdf_cache import invoice_pdf_response
+from .archive import (
+    ARCHIVE_FORMATS, HTTP_MAX_RENDERS, invoices_for_period, schedule_invoice_renders, stream_invoice_archive,
+    uncached_invoice_ids
+)
 from .models import Payment
 from accounts.models import User
 
@@ -90,14 +95,7 @@ def admin_create_invoice(request):
                     return redirect('admin_invoices_list')
                 
                 # Générer le numéro de facture séquentiel
-                last_invoice = Invoice.objects.order_by('-id').first()
-                if last_invoice:
-                    last_number = int(last_invoice.invoice_number.split('-')[1])
-                    new_number = last_number + 1
-                else:
-                    new_number = 1
-                
-                invoice_number = f"CT-{new_number:05d}"
+                invoice_number = Invoice.next_invoice_number()
                 
                 # Créer la facture
                 invoice = Invoice.objects.create(
@@ -178,24 +176,9 @@ def validate_transaction_reference(request):
 @login_required
 @user_passes_test(is_admin)
 def admin_invoice_pdf(request, invoice_id):
-    """Générer le PDF d'une facture"""
+    """Télécharger le PDF d'une facture (depuis le cache)"""
     invoice = get_object_or_404(Invoice, id=invoice_id)
-    
-    # TODO: Implémenter la génération PDF
-    # Pour l'instant, retourner les données JSON
-    data = {
-        'invoice': {
-            'number': invoice.invoice_number,
-            'customer': {
-                'name': invoice.customer.get_full_name(),
-                'email': invoice.customer.email,
-            },
-            'amount': float(invoice.total_ttc),
-            'date': invoice.issue_date.isoformat(),
-        }
-    }
-    
-    return JsonResponse(data)
+    return invoice_pdf_response(request, invoice)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -245,6 +228,55 @@ def admin_invoices_list_api(request):
     
     return Response(data)
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def admin_invoices_archive_api(request):
+    """Archive ZIP/tar des PDF des factures d'une période (export comptable)"""
+    # Vérifier que c'est admin ou service client
+    if not (request.user.is_staff or request.user.role in ['admin', 'customer_service']):
+        return Response({'error': 'Permission refusée'}, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        start_date = datetime.strptime(request.GET.get('start', ''), '%Y-%m-%d').date()
+        end_date = datetime.strptime(request.GET.get('end', ''), '%Y-%m-%d').date()
+    except ValueError:
+        return Response(
+            {'error': 'Paramètres start et end requis (format AAAA-MM-JJ)'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    archive_format = request.GET.get('format', 'zip')
+    if archive_format not in ARCHIVE_FORMATS:
+        return Response({'error': 'Format invalide (zip ou tar)'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    invoices = list(invoices_for_period(start_date, end_date))
+    if not invoices:
+        return Response({'error': 'Aucune facture sur cette période'}, status=status.HTTP_404_NOT_FOUND)
+    
+    # Trop de PDF à rendre pour une requête : rendu en tâche de fond, export à redemander
+    to_render = uncached_invoice_ids(invoices)
+    if len(to_render) > HTTP_MAX_RENDERS:
+        if not schedule_invoice_renders(to_render):
+            return Response(
+                {'error': 'Rendu des factures indisponible, utiliser la commande archive_invoices'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        return Response({
+            'status': 'rendering',
+            'message': f"{len(to_render)} facture(s) en cours de rendu, relancer l'export dans quelques minutes",
+            'invoice_count': len(invoices),
+            'to_render': len(to_render),
+        }, status=status.HTTP_202_ACCEPTED)
+    
+    content_type, extension = ARCHIVE_FORMATS[archive_format]
+    response = StreamingHttpResponse(
+        stream_invoice_archive(invoices, archive_format=archive_format, workers=1),
+        content_type=content_type
+    )
+    response['Content-Disposition'] = f'attachment; filename="factures_{start_date}_{end_date}.{extension}"'
+    response['X-Invoice-Count'] = str(len(invoices))
+    return response
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def user_invoices_list(request):
@@ -326,13 +358,7 @@ def user_invoice_pdf(request, invoice_id):
     """Télécharger le PDF d'une facture"""
     try:
         invoice = Invoice.objects.get(id=invoice_id, customer=request.user)
-        
-        # TODO: Implémenter la génération PDF
-        # Pour l'instant, retourner un message
-        return Response({
-            'message': f'PDF de la facture {invoice.invoice_number}',
-            'invoice_number': invoice.invoice_number,
-        })
+        return invoice_pdf_response(request, invoice)
         
     except Invoice.DoesNotExist:
         return Response(
@@ -7,6 +7,7 @@ from django.utils import timezone
 from django.db.models import Sum
 
 from .models import PendingPayment, Payment, Subscription, PaymentHistory
+from .subscriptions import active_at
 from .serializers import (
     PendingPaymentSerializer, PendingPaymentCreateSerializer,
     PaymentSerializer, SubscriptionSerializer
@@ -74,10 +75,8 @@ class UserSubscriptionListView(generics.ListAPIView):
 def user_active_subscriptions(request):
     """Récupérer les abonnements actifs de l'utilisateur"""
     
-    subscriptions = Subscription.objects.filter(
-        user=request.user,
-        status='active',
-        end_date__gt=timezone.now()
+    subscriptions = active_at(
+        queryset=Subscription.objects.filter(user=request.user)
     ).select_related('offer', 'payment')
     
     serializer = SubscriptionSerializer(subscriptions, many=True)
@@ -94,10 +93,8 @@ def user_dashboard(request):
     user = request.user
     
     # Abonnements actifs
-    active_subscriptions = Subscription.objects.filter(
-        user=user,
-        status='active',
-        end_date__gt=timezone.now()
+    active_subscriptions = active_at(
+        queryset=Subscription.objects.filter(user=user)
     ).select_related('offer', 'payment')
     
     # Historique des paiements
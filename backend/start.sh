@@ -39,6 +39,10 @@ python manage.py collectstatic --noinput
 echo "🏗️  Initialisation des données CMS..."
 python manage.py init_production_cms
 
+# Construire l'index de recherche s'il est vide (ensuite maintenu à chaque écriture)
+echo "🔎 Index de recherche..."
+python manage.py rebuild_search_index --if-empty
+
 # Synchroniser l'utilisateur admin (essentiel pour l'accès admin)
 echo "👤 Synchronisation de l'utilisateur admin..."
 python manage.py sync_admin_user
@@ -57,6 +61,12 @@ python manage.py create_test_offer_10min || echo "⚠️  Offre déjà existante
 
 # Note: Les données CMS sont gérées via l'interface d'administration
 
-# Démarrer l'application avec Gunicorn (production)
-echo "🌐 Démarrage du serveur Gunicorn..."
-gunicorn backend.wsgi:application --bind 0.0.0.0:$PORT
\ No newline at end of file
+# Démarrer l'application avec Gunicorn : WSGI par défaut, workers Uvicorn
+# (app ASGI : Django + webhook Telegram) seulement en mode webhook
+if [ "$TELEGRAM_BOT_MODE" = "webhook" ]; then
+    echo "🌐 Démarrage du serveur Gunicorn (ASGI, webhook Telegram)..."
+    gunicorn backend.asgi:application -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:$PORT
+else
+    echo "🌐 Démarrage du serveur Gunicorn..."
+    gunicorn backend.wsgi:application --bind 0.0.0.0:$PORT
+fi
@@ -2,6 +2,8 @@
 Bot Telegram pour gérer l'accès aux canaux privés
 """
 import os
+import sys
+import asyncio
 import logging
 import django
 from datetime import timedelta
@@ -16,6 +18,7 @@ from django.utils import timezone
 from django.conf import settings
 
 from accounts.models_telegram import TelegramBotToken, TelegramChannelInvite, TelegramChannelMember, TelegramNotification
+from accounts.cache_telegram import telegram_cache
 
 # Configuration du logging
 logging.basicConfig(
@@ -32,8 +35,12 @@ CHANNEL_NAME = settings.TELEGRAM_CHANNEL_NAME
 class CalmnessTradingBot:
     """Bot Telegram pour Calmness Trading"""
     
-    def __init__(self):
-        self.application = Application.builder().token(BOT_TOKEN).build()
+    def __init__(self, base_url=None):
+        builder = Application.builder().token(BOT_TOKEN)
+        if base_url:
+            # API Telegram alternative (serveur local de test)
+            builder = builder.base_url(base_url)
+        self.application = builder.build()
         self._setup_handlers()
     
     def _setup_handlers(self):
@@ -73,7 +80,7 @@ class CalmnessTradingBot:
         
         try:
             # Vérifier le token dans la base de données
-            bot_token = TelegramBotToken.objects.get(token=token)
+            bot_token = telegram_cache.get_token(token)
             
             # Vérifier si le token est valide
             if not bot_token.is_valid():
@@ -100,7 +107,7 @@ class CalmnessTradingBot:
             # Mettre à jour le telegram_username de l'utilisateur si nécessaire
             if user.username and bot_token.user.telegram_username != f"@{user.username}":
                 bot_token.user.telegram_username = f"@{user.username}"
-                bot_token.user.save()
+                bot_token.user.save(update_fields=['telegram_username'])
             
             # Envoyer un message de bienvenue
             await update.message.reply_text(
@@ -219,14 +226,10 @@ class CalmnessTradingBot:
         user = update.effective_user
         
         try:
-            # Chercher les memberships de l'utilisateur
-            memberships = TelegramChannelMember.objects.filter(
-                telegram_user_id=user.id,
-                status='active'
-            )
+            # Chercher le membership actif de l'utilisateur (cache read-through)
+            membership = telegram_cache.get_active_membership(user.id)
             
-            if memberships.exists():
-                membership = memberships.first()
+            if membership:
                 days_remaining = (membership.subscription_end_date - timezone.now()).days
                 
                 status_emoji = "✅" if days_remaining > 7 else "⚠️" if days_remaining > 0 else "❌"
@@ -360,6 +363,10 @@ class CalmnessTradingBot:
             except Exception as e:
                 logger.error(f"❌ Erreur track_member_update (leave) : {e}")
     
+    def cache_stats(self):
+        """Statistiques du cache de lecture (hit rate des commandes fréquentes)"""
+        return telegram_cache.stats()
+    
     async def unknown_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Gérer les messages non reconnus"""
         await update.message.reply_text(
@@ -367,15 +374,40 @@ class CalmnessTradingBot:
             "Utilisez /help pour voir les commandes disponibles."
         )
     
-    def run(self):
-        """Lancer le bot"""
-        logger.info("🤖 Démarrage du bot Calmness Trading...")
+    async def set_webhook(self):
+        """Enregistrer l'URL du webhook auprès de Telegram"""
+        async with self.application.bot:
+            await self.application.bot.set_webhook(
+                url=settings.TELEGRAM_WEBHOOK_URL,
+                secret_token=settings.TELEGRAM_WEBHOOK_SECRET,
+                allowed_updates=Update.ALL_TYPES,
+            )
+        logger.info(f"✅ Webhook enregistré : {settings.TELEGRAM_WEBHOOK_URL}")
+    
+    def run(self, mode=None):
+        """
+        Lancer le bot
+        - polling : ce process récupère lui-même les updates (un seul process)
+        - webhook : enregistre le webhook, les updates sont servies par l'app ASGI
+        """
+        mode = mode or settings.TELEGRAM_BOT_MODE
+        logger.info(f"🤖 Démarrage du bot Calmness Trading (mode {mode})...")
+        
+        if mode == 'webhook':
+            if not settings.TELEGRAM_WEBHOOK_URL:
+                raise ValueError("TELEGRAM_WEBHOOK_URL doit être défini en mode webhook")
+            if not settings.TELEGRAM_WEBHOOK_SECRET:
+                raise ValueError("TELEGRAM_WEBHOOK_SECRET doit être défini en mode webhook")
+            asyncio.run(self.set_webhook())
+            return
+        
         self.application.run_polling()
 
 def main():
     """Point d'entrée principal"""
+    mode = sys.argv[1] if len(sys.argv) > 1 else None
     bot = CalmnessTradingBot()
-    bot.run()
+    bot.run(mode)
 
 if __name__ == '__main__':
     main()
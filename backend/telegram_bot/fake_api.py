@@ -0,0 +1,241 @@
+"""
+Fausse API Telegram pour les tests locaux
+
+Serveur HTTP minimal qui imite les méthodes de la Bot API utilisées par le
+projet (getMe, getChat, getChatMemberCount, getChatAdministrators,
+getChatMember, banChatMember, unbanChatMember, createChatInviteLink,
+sendMessage, setWebhook). L'état des canaux est gardé en mémoire.
+
+Utilisation :
+    python -m telegram_bot.fake_api --port 8081 --state canal.json
+
+puis pointer le bot dessus avec `base_url='http://127.0.0.1:8081/bot'`
+(ex: `manage.py sync_telegram_members --base-url ...`). Les tests démarrent
+le serveur dans un thread avec `serve(api)` (voir accounts/tests.py).
+
+Format de l'état (JSON) :
+    {"chats": {"-1001": {"title": "Canal", "members": {"42": "member"}, "admins": [1]}}}
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+BOT_USER = {
+    'id': 1,
+    'is_bot': True,
+    'first_name': 'Fake Bot',
+    'username': 'fake_calmness_bot',
+    'can_join_groups': True,
+    'can_read_all_group_messages': False,
+    'supports_inline_queries': False,
+}
+
+ADMIN_RIGHTS = {
+    'can_be_edited': False,
+    'is_anonymous': False,
+    'can_manage_chat': True,
+    'can_delete_messages': True,
+    'can_manage_video_chats': True,
+    'can_restrict_members': True,
+    'can_promote_members': False,
+    'can_change_info': True,
+    'can_invite_users': True,
+}
+
+
+class FakeTelegramAPIError(Exception):
+    def __init__(self, description, error_code=400):
+        super().__init__(description)
+        self.description = description
+        self.error_code = error_code
+
+
+class FakeTelegramAPI:
+    """État en mémoire des canaux et implémentation des méthodes de la Bot API"""
+
+    def __init__(self, chats=None):
+        self.lock = threading.Lock()
+        self.chats = {}
+        self.calls = []
+        self.webhook = {}
+        self._message_id = 0
+        self._invite_id = 0
+        for chat_id, chat in (chats or {}).items():
+            self.add_chat(int(chat_id), chat.get('title', 'Canal'), chat.get('members'), chat.get('admins'))
+
+    def add_chat(self, chat_id, title, members=None, admins=None):
+        self.chats[chat_id] = {
+            'title': title,
+            'members': {int(user_id): status for user_id, status in (members or {}).items()},
+            'admins': [int(user_id) for user_id in (admins or [])],
+        }
+
+    def set_member_status(self, chat_id, user_id, status):
+        with self.lock:
+            self._chat(chat_id)['members'][int(user_id)] = status
+
+    def _chat(self, chat_id):
+        try:
+            return self.chats[int(chat_id)]
+        except (KeyError, ValueError):
+            raise FakeTelegramAPIError('Bad Request: chat not found')
+
+    @staticmethod
+    def _user(user_id):
+        return {'id': int(user_id), 'is_bot': False, 'first_name': f'User {user_id}'}
+
+    def _member(self, chat, user_id):
+        user_id = int(user_id)
+        if user_id in chat['admins']:
+            return {'status': 'administrator', 'user': self._user(user_id), **ADMIN_RIGHTS}
+        status = chat['members'].get(user_id, 'left')
+        member = {'status': status, 'user': self._user(user_id)}
+        if status == 'kicked':
+            member['until_date'] = 0
+        return member
+
+    def call(self, method, params):
+        with self.lock:
+            self.calls.append((method, params))
+            handler = getattr(self, f'api_{method}', None)
+            if handler is None:
+                raise FakeTelegramAPIError(f'Not Found: method {method} not supported', 404)
+            return handler(params)
+
+    # ==================== MÉTHODES DE LA BOT API ====================
+
+    def api_getMe(self, params):
+        return BOT_USER
+
+    def api_setWebhook(self, params):
+        self.webhook = params
+        return True
+
+    def api_deleteWebhook(self, params):
+        self.webhook = {}
+        return True
+
+    def api_getChat(self, params):
+        chat = self._chat(params['chat_id'])
+        return {'id': int(params['chat_id']), 'type': 'channel', 'title': chat['title']}
+
+    def api_getChatMemberCount(self, params):
+        chat = self._chat(params['chat_id'])
+        present = [s for s in chat['members'].values() if s in ('member', 'administrator', 'creator', 'restricted')]
+        return len(present) + len(chat['admins'])
+
+    def api_getChatAdministrators(self, params):
+        chat = self._chat(params['chat_id'])
+        return [self._member(chat, user_id) for user_id in chat['admins']]
+
+    def api_getChatMember(self, params):
+        chat = self._chat(params['chat_id'])
+        return self._member(chat, params['user_id'])
+
+    def api_banChatMember(self, params):
+        chat = self._chat(params['chat_id'])
+        chat['members'][int(params['user_id'])] = 'kicked'
+        return True
+
+    def api_unbanChatMember(self, params):
+        chat = self._chat(params['chat_id'])
+        chat['members'][int(params['user_id'])] = 'left'
+        return True
+
+    def api_createChatInviteLink(self, params):
+        self._chat(params['chat_id'])
+        self._invite_id += 1
+        return {
+            'invite_link': f'https://t.me/+fake{self._invite_id}',
+            'creator': BOT_USER,
+            'creates_join_request': False,
+            'is_primary': False,
+            'is_revoked': False,
+            'member_limit': params.get('member_limit'),
+        }
+
+    def api_sendMessage(self, params):
+        self._message_id += 1
+        chat_id = int(params['chat_id'])
+        return {
+            'message_id': self._message_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'text': params.get('text', ''),
+        }
+
+
+def make_handler(api):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            # Chemin : /bot<token>/<méthode>
+            method = self.path.rstrip('/').rsplit('/', 1)[-1]
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length).decode() if length else ''
+
+            if self.headers.get('Content-Type', '').startswith('application/json'):
+                params = json.loads(body or '{}')
+            else:
+                params = {}
+                for key, value in parse_qsl(body):
+                    try:
+                        params[key] = json.loads(value)
+                    except ValueError:
+                        params[key] = value
+
+            try:
+                payload = {'ok': True, 'result': api.call(method, params)}
+                status = 200
+            except FakeTelegramAPIError as e:
+                payload = {'ok': False, 'error_code': e.error_code, 'description': e.description}
+                status = e.error_code
+
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_GET = do_POST
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(api, host='127.0.0.1', port=0):
+    """Démarrer le serveur dans un thread. Retourne (server, base_url)"""
+    server = ThreadingHTTPServer((host, port), make_handler(api))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f'http://{host}:{server.server_address[1]}/bot'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fausse API Telegram pour les tests locaux')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--state', help='Fichier JSON décrivant les canaux et leurs membres')
+    args = parser.parse_args()
+
+    chats = {}
+    if args.state:
+        with open(args.state, encoding='utf-8') as f:
+            chats = json.load(f).get('chats', {})
+
+    api = FakeTelegramAPI(chats)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(api))
+    print(f"🧪 Fausse API Telegram sur http://{args.host}:{args.port}/bot")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+"""
+Mode webhook du bot Telegram
+
+Application ASGI légère qui reçoit les updates poussées par Telegram et les
+transmet à l'`Application` python-telegram-bot du `CalmnessTradingBot`.
+Plusieurs réplicas peuvent tourner derrière le même webhook :
+- le header `X-Telegram-Bot-Api-Secret-Token` est vérifié à chaque requête
+  (TELEGRAM_WEBHOOK_SECRET est obligatoire : sans secret, l'app refuse de
+  démarrer)
+- chaque `update_id` n'est traité qu'une seule fois grâce au cache partagé
+- à l'arrêt, le réplica refuse les nouvelles updates (503, Telegram réessaie
+  ailleurs) et termine celles en cours avant de fermer le bot
+- un GET sur le même chemin renvoie l'état du réplica (sonde de vivacité) ;
+  les compteurs internes (updates en cours, hit rate du cache) ne sont
+  ajoutés qu'avec le secret token
+"""
+import asyncio
+import hmac
+import json
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from telegram import Update
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = b'x-telegram-bot-api-secret-token'
+
+
+class UpdateDedupStore:
+    """Registre des update_id déjà pris en charge, partagé via le cache Django"""
+
+    def __init__(self, cache_backend=None, ttl=None, prefix='telegram:update:'):
+        self.cache = cache_backend or cache
+        self.ttl = ttl or settings.TELEGRAM_WEBHOOK_DEDUP_TTL
+        self.prefix = prefix
+
+    def _key(self, update_id):
+        return f"{self.prefix}{update_id}"
+
+    def claim(self, update_id):
+        """Réserver un update_id. Retourne False s'il a déjà été pris par un réplica"""
+        return self.cache.add(self._key(update_id), 1, timeout=self.ttl)
+
+    def release(self, update_id):
+        """Libérer un update_id pour que Telegram puisse le renvoyer"""
+        self.cache.delete(self._key(update_id))
+
+
+class TelegramWebhookApp:
+    """Endpoint ASGI du webhook Telegram"""
+
+    def __init__(self, bot, fallback_app=None, path=None, secret_token=None, dedup_store=None, drain_timeout=None):
+        self.bot = bot
+        self.fallback_app = fallback_app
+        self.path = path or settings.TELEGRAM_WEBHOOK_PATH
+        self.secret_token = secret_token if secret_token is not None else settings.TELEGRAM_WEBHOOK_SECRET
+        if not self.secret_token:
+            raise ImproperlyConfigured("TELEGRAM_WEBHOOK_SECRET doit être défini en mode webhook")
+        self.dedup_store = dedup_store or UpdateDedupStore()
+        self.drain_timeout = drain_timeout if drain_timeout is not None else settings.TELEGRAM_WEBHOOK_DRAIN_TIMEOUT
+
+        self.draining = False
+        self._initialized = False
+        self._init_lock = None
+        self._in_flight = 0
+        self._idle = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._handle_lifespan(receive, send)
+        elif scope['type'] == 'http' and scope['path'] == self.path:
+            await self._handle_update(scope, receive, send)
+        elif self.fallback_app is not None:
+            await self.fallback_app(scope, receive, send)
+        else:
+            await self._respond(send, 404, {'error': 'Not found'})
+
+    # ==================== CYCLE DE VIE ====================
+
+    async def startup(self):
+        """Initialiser l'application du bot (une seule fois par process)"""
+        if self._init_lock is None:
+            self._init_lock = asyncio.Lock()
+        async with self._init_lock:
+            if not self._initialized:
+                await self.bot.application.initialize()
+                self._initialized = True
+                logger.info("🤖 Bot initialisé en mode webhook")
+
+    async def shutdown(self):
+        """Drainer les updates en cours puis fermer le bot"""
+        self.draining = True
+        logger.info(f"🛑 Arrêt du webhook : {self._in_flight} update(s) en cours")
+
+        if self._in_flight and self._idle is not None:
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout=self.drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"⚠️ Drainage interrompu, {self._in_flight} update(s) non terminée(s)")
+
+        if self._initialized:
+            await self.bot.application.shutdown()
+            self._initialized = False
+        logger.info("✅ Webhook arrêté")
+
+    async def _handle_lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await self.startup()
+                except Exception as e:
+                    logger.error(f"❌ Erreur initialisation webhook : {e}")
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    # ==================== TRAITEMENT DES UPDATES ====================
+
+    async def _handle_update(self, scope, receive, send):
+        if scope['method'] == 'GET':
+            await self._respond_health(scope, send)
+            return
+
+        if scope['method'] != 'POST':
+            await self._respond(send, 405, {'error': 'Méthode non autorisée'})
+            return
+
+        if not self._check_secret(scope):
+            logger.warning("⚠️ Webhook Telegram : secret token invalide")
+            await self._respond(send, 401, {'error': 'Secret token invalide'})
+            return
+
+        if self.draining:
+            await self._respond(send, 503, {'error': 'Réplica en cours d\'arrêt'})
+            return
+
+        try:
+            data = json.loads(await self._read_body(receive))
+            update_id = data['update_id']
+        except (ValueError, KeyError, TypeError):
+            await self._respond(send, 400, {'error': 'Update invalide'})
+            return
+
+        if not self.dedup_store.claim(update_id):
+            logger.info(f"↩️ Update {update_id} déjà traitée, ignorée")
+            await self._respond(send, 200, {'ok': True, 'duplicate': True})
+            return
+
+        self._enter()
+        try:
+            await self.startup()
+            update = Update.de_json(data, self.bot.application.bot)
+            await self.bot.application.process_update(update)
+        except Exception as e:
+            # Laisser Telegram renvoyer l'update (potentiellement à un autre réplica)
+            self.dedup_store.release(update_id)
+            logger.error(f"❌ Erreur traitement update {update_id} : {e}")
+            await self._respond(send, 500, {'error': 'Erreur de traitement'})
+            return
+        finally:
+            self._exit()
+
+        await self._respond(send, 200, {'ok': True, 'duplicate': False})
+
+    async def _respond_health(self, scope, send):
+        """
+        État du réplica pour le load balancer (503 pendant le drainage) ;
+        compteurs internes seulement avec le secret token
+        """
+        payload = {'status': 'draining' if self.draining else 'ok'}
+        if self._check_secret(scope):
+            payload.update({
+                'in_flight': self._in_flight,
+                'cache': self.bot.cache_stats(),
+            })
+        await self._respond(send, 503 if self.draining else 200, payload)
+
+    def _check_secret(self, scope):
+        received = dict(scope.get('headers') or []).get(SECRET_HEADER, b'')
+        return hmac.compare_digest(received, self.secret_token.encode())
+
+    def _enter(self):
+        if self._idle is None:
+            self._idle = asyncio.Event()
+        self._in_flight += 1
+        self._idle.clear()
+
+    def _exit(self):
+        self._in_flight -= 1
+        if self._in_flight == 0:
+            self._idle.set()
+
+    @staticmethod
+    async def _read_body(receive):
+        body = b''
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+        return body
+
+    @staticmethod
+    async def _respond(send, status, payload):
+        body = json.dumps(payload).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+async def replay_updates(app, payloads, secret_token=None):
+    """
+    Rejouer des updates enregistrées contre l'application webhook, en process.
+    Retourne la liste des (update_id, status, réponse).
+    """
+    results = []
+    token = app.secret_token if secret_token is None else secret_token
+    headers = [(b'content-type', b'application/json')]
+    if token:
+        headers.append((SECRET_HEADER, token.encode()))
+
+    for payload in payloads:
+        body = json.dumps(payload).encode()
+        scope = {
+            'type': 'http',
+            'method': 'POST',
+            'path': app.path,
+            'headers': headers,
+        }
+        sent = []
+        received = [{'type': 'http.request', 'body': body, 'more_body': False}]
+
+        async def receive():
+            return received.pop(0) if received else {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+
+        await app(scope, receive, send)
+        status = sent[0]['status']
+        response = json.loads(sent[1]['body'])
+        results.append((payload.get('update_id'), status, response))
+
+    return results
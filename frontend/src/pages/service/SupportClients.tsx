@@ -1,4 +1,4 @@
-import { useEffect, useState } from "react";
+import { useEffect, useRef, useState } from "react";
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
 import { Badge } from "@/components/ui/badge";
@@ -60,6 +60,13 @@ interface Client {
   support_tickets: number;
 }
 
+interface ClientTotals {
+  count: number;
+  active: number;
+  inactive: number;
+  total_revenue: number;
+}
+
 interface Payment {
   id: number;
   amount: number;
@@ -76,7 +83,12 @@ const SupportClients = () => {
   const { fetchWithAuth } = useAuth();
   
   const [clients, setClients] = useState<Client[]>([]);
+  const [totals, setTotals] = useState<ClientTotals | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // Identifiant de la dernière requête : les réponses d'une recherche précédente sont ignorées
+  const requestId = useRef(0);
   const [selectedClient, setSelectedClient] = useState<Client | null>(null);
   const [viewDialogOpen, setViewDialogOpen] = useState(false);
   const [searchTerm, setSearchTerm] = useState("");
@@ -86,17 +98,32 @@ const SupportClients = () => {
     loadClients();
   }, [searchTerm, statusFilter]);
 
-  const loadClients = async () => {
-    setLoading(true);
+  const loadClients = async (cursor?: string) => {
+    const currentRequest = ++requestId.current;
+    if (cursor) {
+      setLoadingMore(true);
+    } else {
+      setLoading(true);
+    }
     try {
       const params = new URLSearchParams();
       if (searchTerm) params.append('search', searchTerm);
       if (statusFilter !== 'all') params.append('status', statusFilter);
+      if (cursor) params.append('cursor', cursor);
       
       const response = await fetchWithAuth(`${API_CONFIG.BASE_URL}/api/support/clients/?${params.toString()}`);
+      if (currentRequest !== requestId.current) return;
       if (response.ok) {
         const data = await response.json();
-        setClients(data);
+        if (currentRequest !== requestId.current) return;
+        // Première page : totaux de la sélection ; pages suivantes : ajoutées à la liste
+        if (cursor) {
+          setClients(prev => [...prev, ...data.results]);
+        } else {
+          setClients(data.results);
+          setTotals(data.totals ?? null);
+        }
+        setNextCursor(data.has_more ? data.next_cursor : null);
       } else {
         throw new Error('Erreur lors du chargement des clients');
       }
@@ -108,13 +135,30 @@ const SupportClients = () => {
         variant: "destructive"
       });
     } finally {
-      setLoading(false);
+      if (currentRequest === requestId.current) {
+        setLoading(false);
+        setLoadingMore(false);
+      }
     }
   };
 
-  const handleViewClient = (client: Client) => {
+  const handleViewClient = async (client: Client) => {
     setSelectedClient(client);
     setViewDialogOpen(true);
+
+    // Historique des paiements chargé à la demande
+    try {
+      const response = await fetchWithAuth(`${API_CONFIG.BASE_URL}/api/support/clients/${client.id}/payments/`);
+      if (response.ok) {
+        const data = await response.json();
+        // Ignorer la réponse si un autre client a été ouvert entre-temps
+        setSelectedClient(current =>
+          current?.id === client.id ? { ...current, payment_history: data.results } : current
+        );
+      }
+    } catch (error) {
+      console.error('Error loading client payments:', error);
+    }
   };
 
   const getStatusBadge = (client: Client) => {
@@ -155,11 +199,12 @@ const SupportClients = () => {
     return matchesSearch && matchesStatus;
   });
 
+  // Totaux calculés par le backend sur toute la sélection (pas seulement les pages chargées)
   const stats = {
-    total: clients.length,
-    active: clients.filter(c => c.is_active && c.subscription?.status === 'active').length,
-    inactive: clients.filter(c => !c.is_active).length,
-    totalRevenue: clients.reduce((sum, c) => sum + c.total_spent, 0)
+    total: totals?.count ?? 0,
+    active: totals?.active ?? 0,
+    inactive: totals?.inactive ?? 0,
+    totalRevenue: totals?.total_revenue ?? 0
   };
 
   return (
@@ -321,6 +366,18 @@ const SupportClients = () => {
               </TableBody>
             </Table>
           )}
+          {!loading && nextCursor && (
+            <div className="flex justify-center mt-4">
+              <Button
+                variant="outline"
+                onClick={() => loadClients(nextCursor)}
+                disabled={loadingMore}
+              >
+                {loadingMore && <Loader2 className="h-4 w-4 mr-2 animate-spin" />}
+                Charger plus de clients ({clients.length} / {stats.total})
+              </Button>
+            </div>
+          )}
         </CardContent>
       </Card>
 